@@ -0,0 +1,117 @@
+"""
+Benchmark: matching entries against many keyword rules.
+
+Compares checking every keyword separately (a substring search per
+keyword, confirmed as a whole word, as a naive filter would), a plain
+regex alternation of all keywords and `filters.EntryFilter`, on generated
+summaries where one entry in ten mentions a keyword. All three must agree
+on which entries match.
+With `--phrases`, keywords are two words long, which `EntryFilter` merges
+into a trie-shaped pattern instead of looking them up as words.
+
+Usage:
+    python benchmarks/filters.py [--keywords 500] [--entries 1000] [--phrases]
+"""
+
+import argparse
+import random
+import re
+import string
+import time
+from types import SimpleNamespace
+
+from discord_rss_bot.filters import compile_filter
+from discord_rss_bot.models import FilterRule
+
+
+def make_words(rng: random.Random, count: int) -> list:
+    """Random lowercase words of 5 to 10 letters."""
+    return [
+        "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10)))
+        for _ in range(count)
+    ]
+
+
+def make_summaries(rng: random.Random, words: list, count: int) -> list:
+    """Summaries of 300 words; one in ten mentions one of `words`."""
+    vocabulary = make_words(rng, 2000)
+    return [
+        " ".join(
+            rng.choices(vocabulary, k=300)
+            + ([rng.choice(words)] if index % 10 == 0 else [])
+        )
+        for index in range(count)
+    ]
+
+
+def separate_match(separate: list, text: str) -> bool:
+    """Checks every keyword on its own: a substring, then a whole word."""
+    lower = text.lower()
+    return any(
+        word in lower and pattern.search(text) for word, pattern in separate
+    )
+
+
+def make_strategies(words: list, summaries: list) -> tuple:
+    """The three strategies, each returning which summaries matched."""
+    items = [
+        SimpleNamespace(title="", summary=text, author=None, link=None)
+        for text in summaries
+    ]
+    separate = [
+        (word.lower(), re.compile(rf"(?<!\w){re.escape(word)}(?!\w)", re.I))
+        for word in words
+    ]
+    alternation = re.compile(
+        rf"(?<!\w)(?:{'|'.join(map(re.escape, words))})(?!\w)",
+        re.IGNORECASE,
+    )
+    # As exclude rules, `check` names the keyword an entry matched
+    entry_filter = compile_filter(
+        (), tuple(FilterRule(keyword=word) for word in words)
+    )
+    assert entry_filter is not None
+    return (
+        (
+            "separate",
+            lambda: [separate_match(separate, t) for t in summaries],
+        ),
+        (
+            "alternation",
+            lambda: [alternation.search(t) is not None for t in summaries],
+        ),
+        (
+            "filter",
+            lambda: [entry_filter.check(item) is not None for item in items],
+        ),
+    )
+
+
+def main(keywords: int, entries: int, phrases: bool) -> None:
+    """Times the three strategies and prints a table."""
+    rng = random.Random(1)
+    words = make_words(rng, keywords)
+    if phrases:
+        words = [f"{word} {other}" for word, other in zip(words, words[1:])]
+    summaries = make_summaries(rng, words, entries)
+
+    kind = "phrases" if phrases else "keywords"
+    print(f"{len(words)} {kind}, {entries} entries")
+    print(f"{'strategy':<12} {'seconds':>9} {'matched':>8}")
+    results = []
+    for label, run in make_strategies(words, summaries):
+        start = time.perf_counter()
+        matched = run()
+        elapsed = time.perf_counter() - start
+        results.append(matched)
+        print(f"{label:<12} {elapsed:>9.3f} {sum(matched):>8}")
+    assert all(result == results[0] for result in results)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keywords", type=int, default=500)
+    parser.add_argument("--entries", type=int, default=1000)
+    parser.add_argument("--phrases", action="store_true")
+    args = parser.parse_args()
+    main(args.keywords, args.entries, args.phrases)
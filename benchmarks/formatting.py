@@ -0,0 +1,162 @@
+"""
+Benchmark: rendering entry summaries for Discord.
+
+Compares the previous three-parse pipeline (`truncate_html`, then
+`extract_images_from_html`, then `convert_html_to_markdown`, kept here as
+the baseline) with the single-parse `render_summary`, and checks that both produce the same
+Markdown and image list for every summary in the corpus.
+
+The corpus is generated from templates that mirror the feeds in the
+example configuration: link digests (Hacker News daily/weekly),
+image-heavy repository cards (GitHub trending) and long articles that hit
+the truncation limit.
+
+Usage:
+    python benchmarks/formatting.py [--entries 500] [--rounds 3]
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List, Tuple
+
+from bs4 import BeautifulSoup
+from markdownify import markdownify as md
+
+from discord_rss_bot.message import SUMMARY_RENDER_CHARS, render_summary
+
+WORDS = (
+    "rust python sqlite kernel latency cache compiler async network "
+    "database memory release benchmark feed parser protocol design"
+).split()
+
+
+def sentence(rng: random.Random, words: int = 12) -> str:
+    """Returns a random sentence."""
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def digest(rng: random.Random) -> str:
+    """A link digest, like Hacker News daily."""
+    items = "".join(
+        f'<li><a href="https://example.com/{i}">{sentence(rng, 6)}</a> '
+        f'(<a href="https://news.ycombinator.com/item?id={i}">comments</a>)'
+        "</li>"
+        for i in range(rng.randint(5, 30))
+    )
+    return f"<ul>{items}</ul>"
+
+
+def repository_card(rng: random.Random) -> str:
+    """An image-heavy repository card, like GitHub trending."""
+    images = "".join(
+        f'<p><img src="https://img.example.com/{rng.randint(1, 9999)}.png" '
+        f'alt="{sentence(rng, 3)}"></p>'
+        for _ in range(rng.randint(1, 6))
+    )
+    return (
+        f"<h1>{sentence(rng, 3)}</h1>{images}"
+        f"<p>{sentence(rng, 40)}</p>"
+        f"<p>⭐ {rng.randint(1, 50000)} stars</p>"
+    )
+
+
+def article(rng: random.Random) -> str:
+    """A long article with headings, code and images, often truncated."""
+    parts = []
+    for _ in range(rng.randint(3, 15)):
+        parts.append(f"<h2>{sentence(rng, 4)}</h2>")
+        parts.append(f"<p>{sentence(rng, 80)} <em>{sentence(rng, 5)}</em></p>")
+        parts.append(f"<pre><code>{sentence(rng, 20)}</code></pre>")
+        if rng.random() < 0.5:
+            parts.append(
+                f'<img src="https://cdn.example.com/{rng.randint(1, 999)}.jpg">'
+            )
+        parts.append(f"<blockquote>{sentence(rng, 15)}</blockquote>")
+    return "".join(parts)
+
+
+def make_corpus(size: int, seed: int = 0) -> List[str]:
+    """Generates `size` summaries with a fixed seed."""
+    rng = random.Random(seed)
+    templates = (digest, repository_card, article)
+    return [rng.choice(templates)(rng) for _ in range(size)]
+
+
+def truncate_html(html: str, length: int = SUMMARY_RENDER_CHARS):
+    """Safely truncates provided HTML string."""
+    if len(html) <= length:
+        return html
+
+    soup = BeautifulSoup(html[:length], "html.parser")
+    # Append a truncation indicator inside a <strong> tag
+    truncated_tag = soup.new_tag("strong")
+    truncated_tag.string = " ... (truncated)"
+    soup.append(truncated_tag)
+    return str(soup)
+
+
+def extract_images_from_html(html: str):
+    """Extracts image URLs from an HTML string."""
+    soup = BeautifulSoup(html, "html.parser")
+    images = [
+        img.attrs["src"]  # pyright: ignore[reportAttributeAccessIssue]
+        for img in soup.find_all("img")
+        if "src" in img.attrs  # pyright: ignore[reportAttributeAccessIssue]
+    ]
+    return images
+
+
+def convert_html_to_markdown(html: str) -> str:
+    """Converts an HTML string into Markdown format."""
+    markdown_text = md(html, heading_style="ATX").strip()
+    formatted_text = "\n".join(
+        f"> {line}" for line in markdown_text.splitlines() if line.strip()
+    )
+    return formatted_text
+
+
+def three_parses(html: str) -> Tuple[str, List[str]]:
+    """The previous formatting pipeline, parsing the HTML three times."""
+    truncated = truncate_html(html)
+    return convert_html_to_markdown(truncated), extract_images_from_html(
+        truncated
+    )
+
+
+def measure(
+    func: Callable[[str], Tuple[str, List[str]]],
+    corpus: List[str],
+    rounds: int,
+) -> float:
+    """Returns the best time over `rounds` runs across the corpus."""
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for html in corpus:
+            func(html)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main(entries: int, rounds: int) -> None:
+    """Checks output equivalence and prints timings."""
+    corpus = make_corpus(entries)
+    mismatches = sum(
+        three_parses(html) != render_summary(html) for html in corpus
+    )
+    print(f"corpus: {entries} summaries, {mismatches} output mismatches")
+
+    old = measure(three_parses, corpus, rounds)
+    new = measure(render_summary, corpus, rounds)
+    print(f"three parses:  {old:.3f}s ({entries / old:,.0f} entries/s)")
+    print(f"single parse:  {new:.3f}s ({entries / new:,.0f} entries/s)")
+    print(f"speedup:       {old / new:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    main(args.entries, args.rounds)
@@ -0,0 +1,403 @@
+"""
+Benchmark: end-to-end load test without network access.
+
+Serves generated feeds from a local aiohttp server and drives `RSSReader`
+and `DiscordBot.check_feeds` against them, delivering to stand-in
+channels whose `send` enforces Discord's rate limits (5 messages per
+5 seconds per channel, 50 requests per second overall) and answers with
+`discord.RateLimited` when they are exceeded.
+
+The first check delivers the initial backlog of every feed; each
+following round publishes new entries to every feed and checks again.
+For every phase it reports delivered entries per second, p50/p99
+publish-to-post latency, rate-limited sends and SQLite write statements
+and transactions, followed by the peak RSS of the process.
+
+Usage:
+    python benchmarks/load_test.py [--feeds 20] [--entries 10]
+        [--html-bytes 2000] [--channels 20] [--rounds 3] [--new 2]
+        [--batch-embeds] [--format-workers 0]
+"""
+
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import resource
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+from email.utils import formatdate
+from typing import Dict, List, Optional, Tuple
+
+import discord
+from aiohttp import web
+
+from discord_rss_bot.bot import DiscordBot
+from discord_rss_bot.models import ConfigFile, FeedConfig
+from discord_rss_bot.rss import RSSReader
+
+WORDS = (
+    "rust python sqlite kernel latency cache compiler async network "
+    "database memory release benchmark feed parser protocol design"
+).split()
+
+
+def html_summary(rng: random.Random, size: int) -> str:
+    """Generates an HTML summary of about `size` characters."""
+    parts: List[str] = []
+    length = 0
+    while length < size:
+        words = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 30)))
+        part = rng.choice(
+            (
+                f"<p>{words.capitalize()}.</p>",
+                f'<p><a href="https://example.com/{rng.randint(1, 9999)}">'
+                f"{words}</a></p>",
+                f"<ul><li>{words}</li><li><code>{words[:20]}</code></li></ul>",
+                f'<p><img src="https://img.example.com/{rng.randint(1, 99)}'
+                f'.png" alt="{words[:20]}"></p>',
+            )
+        )
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+class FeedServer:  # pylint: disable=too-many-instance-attributes
+    """Local HTTP server publishing generated RSS feeds."""
+
+    def __init__(self, feeds: int, html_bytes: int, seed: int = 1) -> None:
+        self.rng = random.Random(seed)
+        self.html_bytes = html_bytes
+        # Per feed: (entry number, publish time) of every published entry
+        self.entries: List[List[Tuple[int, float]]] = [[] for _ in range(feeds)]
+        self.summaries: Dict[Tuple[int, int], str] = {}
+        self.documents: Dict[int, Tuple[str, bytes]] = {}
+        # Publish time of every entry link, for the latency measurement
+        self.published: Dict[str, float] = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.runner: Optional[web.AppRunner] = None
+        self.base_url = ""
+
+    async def start(self) -> None:
+        """Starts serving on a free local port."""
+        app = web.Application()
+        app.router.add_get("/feed/{index}.xml", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.base_url = f"http://127.0.0.1:{port}"
+
+    async def stop(self) -> None:
+        """Stops the server."""
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+    def feed_url(self, index: int) -> str:
+        """URL of a feed."""
+        return f"{self.base_url}/feed/{index}.xml"
+
+    def entry_link(self, index: int, number: int) -> str:
+        """Link of an entry, unique across feeds."""
+        return f"https://example.com/feed-{index}/entry-{number}"
+
+    def publish(self, count: int) -> None:
+        """Publishes `count` new entries to every feed."""
+        now = time.time()
+        for index, entries in enumerate(self.entries):
+            for number in range(len(entries), len(entries) + count):
+                entries.append((number, now))
+                self.summaries[index, number] = html_summary(
+                    self.rng, self.html_bytes
+                )
+                self.published[self.entry_link(index, number)] = now
+            self.documents.pop(index, None)
+
+    def document(self, index: int) -> Tuple[str, bytes]:
+        """ETag and body of a feed, rendered once per publication."""
+        if index not in self.documents:
+            items = "".join(
+                f"<item><title>Entry {number} of feed {index}</title>"
+                f"<link>{self.entry_link(index, number)}</link>"
+                f"<guid>feed-{index}-entry-{number}</guid>"
+                f"<pubDate>{formatdate(published, usegmt=True)}</pubDate>"
+                "<description><![CDATA["
+                f"{self.summaries[index, number]}]]></description></item>"
+                for number, published in reversed(self.entries[index])
+            )
+            body = (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<rss version="2.0"><channel>'
+                f"<title>Feed {index}</title>"
+                f"<link>https://example.com/feed-{index}</link>"
+                f"<description>Generated feed {index}</description>"
+                f"{items}</channel></rss>"
+            ).encode()
+            etag = f'"{hashlib.sha1(body).hexdigest()}"'
+            self.documents[index] = (etag, body)
+        return self.documents[index]
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Serves a feed, answering conditional requests with 304."""
+        self.requests += 1
+        index = int(request.match_info["index"])
+        if not 0 <= index < len(self.entries):
+            raise web.HTTPNotFound()
+        etag, body = self.document(index)
+        if request.headers.get("If-None-Match") == etag:
+            self.not_modified += 1
+            return web.Response(status=304, headers={"ETag": etag})
+        return web.Response(
+            body=body,
+            content_type="application/rss+xml",
+            headers={"ETag": etag},
+        )
+
+
+class RateWindow:  # pylint: disable=too-few-public-methods
+    """Non-blocking token bucket: `capacity` requests per `period`."""
+
+    def __init__(self, capacity: int, period: float) -> None:
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Takes a token; returns 0, or the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+        # Small tolerance for timer jitter between both buckets
+        if self.tokens >= 1 - 1e-3:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class FakeDiscord:
+    """Stand-in for Discord's message endpoint with its rate limits."""
+
+    def __init__(self, latency: float) -> None:
+        self.latency = latency
+        self.global_window = RateWindow(50, 1.0)
+        self.windows: Dict[int, RateWindow] = {}
+        self.channels: Dict[int, "FakeChannel"] = {}
+        # Post time of every delivered entry link
+        self.posted: Dict[str, float] = {}
+        self.messages = 0
+        self.rate_limited = 0
+
+    def channel(self, channel_id: int | str) -> "FakeChannel":
+        """Returns the stand-in of a channel."""
+        channel_id = int(channel_id)
+        if channel_id not in self.channels:
+            self.channels[channel_id] = FakeChannel(self, channel_id)
+            self.windows[channel_id] = RateWindow(5, 5.0)
+        return self.channels[channel_id]
+
+    async def post(self, channel_id: int, embeds: List[discord.Embed]) -> None:
+        """Accepts a message or raises `discord.RateLimited`."""
+        retry_after = max(
+            self.windows[channel_id].take(), self.global_window.take()
+        )
+        if retry_after:
+            self.rate_limited += 1
+            raise discord.RateLimited(retry_after)
+        await asyncio.sleep(self.latency)
+        now = time.time()
+        self.messages += 1
+        for embed in embeds:
+            if embed.url:
+                self.posted.setdefault(embed.url, now)
+
+
+class FakeChannel:  # pylint: disable=too-few-public-methods
+    """Channel whose `send` goes to the fake Discord backend."""
+
+    def __init__(self, backend: FakeDiscord, channel_id: int) -> None:
+        self.backend = backend
+        self.id = channel_id
+
+    async def send(
+        self,
+        content: Optional[str] = None,
+        *,
+        embed: Optional[discord.Embed] = None,
+        embeds: Optional[List[discord.Embed]] = None,
+    ) -> None:
+        """Posts a message with one or more embeds."""
+        del content
+        await self.backend.post(
+            self.id, embeds or ([embed] if embed is not None else [])
+        )
+
+
+class SQLiteWrites:
+    """Counts write statements and transactions on every connection."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.statements = 0
+        self.transactions = 0
+        self.connect = sqlite3.connect
+
+    def install(self) -> None:
+        """Traces every connection opened from now on."""
+
+        def connect(*args, **kwargs) -> sqlite3.Connection:
+            db = self.connect(*args, **kwargs)
+            db.set_trace_callback(self.trace)
+            return db
+
+        sqlite3.connect = connect
+
+    def trace(self, statement: str) -> None:
+        """Counts a traced statement if it writes."""
+        verb = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+        with self.lock:
+            if verb in ("INSERT", "UPDATE", "DELETE", "REPLACE"):
+                self.statements += 1
+            elif verb in ("COMMIT", "END"):
+                self.transactions += 1
+
+    def snapshot(self) -> Tuple[int, int]:
+        """Returns the statements and transactions counted so far."""
+        with self.lock:
+            return self.statements, self.transactions
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Returns a percentile of non-empty `values`."""
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[
+        round(fraction * 100) - 1
+    ]
+
+
+async def run_phase(
+    phase: str,
+    bot: DiscordBot,
+    server: FeedServer,
+    backend: FakeDiscord,
+    writes: SQLiteWrites,
+) -> None:
+    """Runs one check and reports the entries published since the last."""
+    links = [link for link in server.published if link not in backend.posted]
+    statements, transactions = writes.snapshot()
+    rate_limited = backend.rate_limited
+    start = time.perf_counter()
+    await bot.check_feeds()
+    elapsed = time.perf_counter() - start
+
+    latencies = [
+        (backend.posted[link] - server.published[link]) * 1000
+        for link in links
+        if link in backend.posted
+    ]
+    p50 = percentile(latencies, 0.5) if latencies else 0.0
+    p99 = percentile(latencies, 0.99) if latencies else 0.0
+    print(
+        f"{phase:<8} {len(latencies):>7}/{len(links):<7} {elapsed:>8.2f} "
+        f"{len(latencies) / elapsed:>10.1f} {p50:>9.0f} {p99:>9.0f} "
+        f"{backend.rate_limited - rate_limited:>6} "
+        f"{writes.statements - statements:>8} "
+        f"{writes.transactions - transactions:>6}"
+    )
+
+
+def make_config(
+    db_path: str, server: FeedServer, args: argparse.Namespace
+) -> ConfigFile:
+    """Builds the bot configuration for the generated feeds."""
+    return ConfigFile(
+        db_path=db_path,
+        format_workers=args.format_workers,
+        format_executor="thread",
+        feeds=[
+            FeedConfig(
+                feed_url=server.feed_url(index),
+                channel_id=1000 + index % args.channels,
+                update_interval=1,
+                batch_embeds=args.batch_embeds,
+            )
+            for index in range(args.feeds)
+        ],
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Runs the initial backlog and the following rounds."""
+    writes = SQLiteWrites()
+    writes.install()
+    server = FeedServer(args.feeds, args.html_bytes)
+    await server.start()
+    backend = FakeDiscord(args.send_latency)
+    server.publish(args.entries)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = make_config(os.path.join(tmp, "load.sqlite3"), server, args)
+        rss_reader = RSSReader(config)
+        bot = DiscordBot(rss_reader, intents=discord.Intents.default())
+        # Deliver to the fake backend instead of the gateway's channels
+        bot._get_channel = backend.channel  # pylint: disable=protected-access
+        try:
+            start = time.perf_counter()
+            await rss_reader.setup()
+            print(
+                f"{args.feeds} feeds, {args.entries} entries each, "
+                f"{args.channels} channels; setup {time.perf_counter() - start:.2f}s"
+            )
+            print(
+                f"{'phase':<8} {'delivered':>15} {'seconds':>8} "
+                f"{'entries/s':>10} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+                f"{'429s':>6} {'writes':>8} {'txns':>6}"
+            )
+            await run_phase("backlog", bot, server, backend, writes)
+            for round_number in range(1, args.rounds + 1):
+                server.publish(args.new)
+                # Make every feed due, instead of waiting for its interval
+                with sqlite3.connect(config.db_path) as db:
+                    db.execute("UPDATE feeds SET update_after = NULL;")
+                await run_phase(
+                    f"round {round_number}", bot, server, backend, writes
+                )
+        finally:
+            await bot.close()
+            await rss_reader.close()
+            await server.stop()
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(
+        f"peak RSS {peak:.1f} MiB, {server.requests} feed requests "
+        f"({server.not_modified} not modified), "
+        f"{backend.messages} messages sent"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--feeds", type=int, default=20)
+    parser.add_argument("--entries", type=int, default=10)
+    parser.add_argument("--html-bytes", type=int, default=2000)
+    parser.add_argument("--channels", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--new", type=int, default=2)
+    parser.add_argument("--send-latency", type=float, default=0.05)
+    parser.add_argument("--batch-embeds", action="store_true")
+    parser.add_argument("--format-workers", type=int, default=0)
+    logging.basicConfig(level=logging.WARNING)
+    # feedparser complains about the content type of every local response
+    logging.getLogger("reader").setLevel(logging.ERROR)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,81 @@
+"""
+Benchmark: event-loop lag while formatting a large backlog.
+
+Formats a backlog of entries the way `DiscordBot._process_entries` does
+while a `LoopLagMonitor` samples the event loop, once with rendering on
+the loop and once per worker pool kind. High lag means discord.py
+heartbeats and the healthcheck handlers would have stalled.
+
+Usage:
+    python benchmarks/loop_lag.py [--entries 500] [--workers 2]
+"""
+
+import argparse
+import asyncio
+import time
+from types import SimpleNamespace
+
+from formatting import make_corpus
+
+from discord_rss_bot.formatter import EntryFormatter
+from discord_rss_bot.metrics import LoopLagMonitor
+
+
+def make_entries(size: int):
+    """Creates entry stand-ins carrying the fields the formatter reads."""
+    return [
+        SimpleNamespace(
+            title=f"Entry {i}",
+            link=f"https://example.com/{i}",
+            summary=summary,
+            published=None,
+            feed_url="https://example.com/feed.xml",
+        )
+        for i, summary in enumerate(make_corpus(size))
+    ]
+
+
+async def run(formatter: EntryFormatter, entries) -> None:
+    """Formats every entry, reporting duration and loop lag."""
+    # Start the workers beforehand
+    await asyncio.gather(*(formatter.format(entry) for entry in entries[:8]))
+    monitor = LoopLagMonitor(interval=0.01)
+    monitor.start()
+    await asyncio.sleep(0.05)  # Let the monitor take a baseline sample
+
+    start = time.perf_counter()
+    await asyncio.gather(*(formatter.format(entry) for entry in entries))
+    elapsed = time.perf_counter() - start
+
+    await asyncio.sleep(0.05)  # Let the monitor record the last stall
+    await monitor.stop()
+    formatter.shutdown()
+    stats = monitor.stats()
+    print(
+        f"{elapsed:>9.2f}s {stats['max'] * 1000:>12.1f} "
+        f"{stats['avg'] * 1000:>12.1f}"
+    )
+
+
+async def main(size: int, workers: int) -> None:
+    """Compares inline formatting with thread and process pools."""
+    entries = make_entries(size)
+    print(f"{size} entries")
+    print(
+        f"{'mode':<10} {'duration':>10} {'max lag (ms)':>12} {'avg (ms)':>12}"
+    )
+    for label, formatter in (
+        ("inline", EntryFormatter()),
+        ("thread", EntryFormatter(workers=workers, executor="thread")),
+        ("process", EntryFormatter(workers=workers, executor="process")),
+    ):
+        print(f"{label:<10}", end=" ", flush=True)
+        await run(formatter, entries)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entries", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    asyncio.run(main(args.entries, args.workers))
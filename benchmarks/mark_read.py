@@ -0,0 +1,82 @@
+"""
+Benchmark: marking entries as read.
+
+Compares the per-entry fan-out (one `asyncio.to_thread` call and one
+SQLite transaction per entry) with the batched `storage.mark_entries_read`
+(one writer call and one transaction per batch, as the outbox marks
+entries read) at several backlog sizes.
+
+Usage:
+    python benchmarks/mark_read.py [--sizes 10 100 1000]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+from reader import make_reader
+
+from discord_rss_bot import storage
+from discord_rss_bot.models import ConfigFile
+from discord_rss_bot.rss import RSSReader
+
+FEED_URL = "http://bench.invalid/feed.xml"
+
+
+def make_rss_reader(db_path: str, size: int) -> RSSReader:
+    """Creates a reader database holding `size` unread entries."""
+    seed = make_reader(db_path)
+    seed.add_feed(FEED_URL)
+    for i in range(size):
+        seed.add_entry({"feed_url": FEED_URL, "id": f"entry-{i}"})
+    seed.close()
+    return RSSReader(ConfigFile(db_path=db_path, feeds=[]))
+
+
+async def fan_out(rss_reader: RSSReader) -> float:
+    """Marks entries read with one thread hop per entry (previous code)."""
+    entries = await rss_reader.get_unread_entries(FEED_URL)
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            asyncio.to_thread(rss_reader.reader.mark_entry_as_read, entry)
+            for entry in entries
+        )
+    )
+    return time.perf_counter() - start
+
+
+async def batched(rss_reader: RSSReader) -> float:
+    """Marks entries read in a single worker call and transaction."""
+    entries = await rss_reader.get_unread_entries(FEED_URL)
+    start = time.perf_counter()
+    missing = await rss_reader.task_executor.run_db(
+        storage.mark_entries_read,
+        [(entry.feed_url, entry.id) for entry in entries],
+    )
+    assert missing == [], missing
+    return time.perf_counter() - start
+
+
+async def main(sizes) -> None:
+    """Runs both strategies for every size and prints a table."""
+    print(f"{'entries':>8} {'fan-out (s)':>12} {'batched (s)':>12} {'x':>6}")
+    for size in sizes:
+        results = []
+        for strategy in (fan_out, batched):
+            with tempfile.TemporaryDirectory() as tmp:
+                rss_reader = make_rss_reader(
+                    os.path.join(tmp, "bench.sqlite3"), size
+                )
+                results.append(await strategy(rss_reader))
+                await rss_reader.close()
+        old, new = results[0], results[1]
+        print(f"{size:>8} {old:>12.4f} {new:>12.4f} {old / new:>6.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10, 100, 1000])
+    asyncio.run(main(parser.parse_args().sizes))
@@ -0,0 +1,107 @@
+"""
+Benchmark: memory held by loaded unread entries.
+
+Fills a reader database with unread entries carrying `--summary-bytes` of
+HTML summary and as much content each, then loads them in a fresh process
+per run and reports the growth of its peak RSS, for several backlog sizes:
+
+  - reader: `Reader.get_entries` objects, as the bot loaded them before
+  - slim: `storage.unread_entries` records of every unread entry
+  - slice: `storage.unread_entries` capped at `--limit` entries, as loaded
+    for a feed by default (`unread_entries_limit`) or with
+    `max_entries_per_tick`
+
+Usage:
+    python benchmarks/memory.py [--sizes 1000 4000] [--limit 100]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+
+from reader import make_reader
+
+from discord_rss_bot import storage
+from discord_rss_bot.rss import SUMMARY_CHARS
+
+FEED_URL = "http://bench.invalid/feed.xml"
+STRATEGIES = ("reader", "slim", "slice")
+
+
+def fill(db_path: str, size: int, summary_bytes: int) -> None:
+    """Creates a reader database holding `size` unread entries."""
+    seed = make_reader(db_path)
+    seed.add_feed(FEED_URL)
+    for i in range(size):
+        html = f"<p>{i} " + "x" * summary_bytes + "</p>"
+        seed.add_entry(
+            {
+                "feed_url": FEED_URL,
+                "id": f"entry-{i}",
+                "title": f"Entry {i}",
+                "link": f"http://bench.invalid/{i}",
+                "summary": html,
+                "content": [{"value": html, "type": "text/html"}],
+            }
+        )
+    seed.close()
+
+
+def peak_rss() -> int:
+    """Peak resident set size of this process, in bytes."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def load(db_path: str, strategy: str, limit: int) -> tuple[int, int]:
+    """Loads entries in a fresh process; returns their count and RSS growth."""
+    rss_reader = make_reader(db_path)
+    with closing(storage.connect(db_path)) as db:
+        baseline = peak_rss()
+        if strategy == "reader":
+            entries = list(rss_reader.get_entries(read=False))
+        else:
+            entries = list(
+                storage.unread_entries(
+                    db,
+                    SUMMARY_CHARS,
+                    FEED_URL,
+                    limit if strategy == "slice" else None,
+                )
+            )
+        grown = peak_rss() - baseline
+    rss_reader.close()
+    return len(entries), grown
+
+
+def main(sizes, limit: int, summary_bytes: int) -> None:
+    """Runs every size and strategy and prints a table."""
+    context = multiprocessing.get_context("spawn")
+    print(f"{'entries':>8} {'strategy':>9} {'loaded':>7} {'RSS MiB':>8}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "bench.sqlite3")
+            fill(db_path, size, summary_bytes)
+            for strategy in STRATEGIES:
+                with ProcessPoolExecutor(1, mp_context=context) as pool:
+                    loaded, grown = pool.submit(
+                        load, db_path, strategy, limit
+                    ).result()
+                print(
+                    f"{size:>8} {strategy:>9} {loaded:>7} "
+                    f"{grown / 2**20:>8.1f}"
+                )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[1000, 2000, 4000, 8000]
+    )
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--summary-bytes", type=int, default=8000)
+    args = parser.parse_args()
+    main(args.sizes, args.limit, args.summary_bytes)
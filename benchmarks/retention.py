@@ -0,0 +1,103 @@
+"""
+Benchmark: pruning read entries and shrinking the database.
+
+Fills a reader database with read entries carrying `--summary-bytes` of
+HTML each, switched to incremental vacuum as the `vacuum` command does,
+then runs `retention.Maintenance` with `retention_max_entries` set to
+`--keep`. Reports pruned entries per second over the whole run and the
+size of the database files before and after, for several backlog sizes.
+
+Usage:
+    python benchmarks/retention.py [--sizes 1000 10000] [--keep 100]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from contextlib import closing
+
+from reader import make_reader
+
+from discord_rss_bot import storage
+from discord_rss_bot.models import ConfigFile, FeedConfig
+from discord_rss_bot.retention import Maintenance
+from discord_rss_bot.rss import RSSReader
+
+FEED_URL = "http://bench.invalid/feed.xml"
+
+
+def fill(db_path: str, size: int, summary_bytes: int) -> None:
+    """
+    Creates a reader database holding `size` read entries, none of them
+    still listed by the feed.
+    """
+    seed = make_reader(db_path)
+    seed.add_feed(FEED_URL)
+    summary = "<p>" + "x" * summary_bytes + "</p>"
+    for i in range(size):
+        seed.add_entry(
+            {"feed_url": FEED_URL, "id": f"entry-{i}", "summary": summary}
+        )
+    seed.close()
+    with closing(storage.connect(db_path)) as db:
+        with db:
+            db.execute("UPDATE entries SET read = 1;")
+        storage.create_pruned(db)
+        storage.record_listing(db, FEED_URL, [])
+        storage.enable_incremental_vacuum(db)
+
+
+def file_size(db_path: str) -> int:
+    """Bytes of the database file and its WAL."""
+    wal = f"{db_path}-wal"
+    return os.path.getsize(db_path) + (
+        os.path.getsize(wal) if os.path.exists(wal) else 0
+    )
+
+
+async def run(size: int, keep: int, summary_bytes: int) -> None:
+    """Prunes one database and prints a table row."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.sqlite3")
+        fill(db_path, size, summary_bytes)
+        config = ConfigFile(
+            db_path=db_path,
+            retention_max_entries=keep,
+            feeds=[FeedConfig(feed_url=FEED_URL, channel_id=1)],
+        )
+        rss_reader = RSSReader(config)
+        maintenance = Maintenance(
+            rss_reader.task_executor, db_path, config.maintenance_interval
+        )
+        before = file_size(db_path)
+        start = time.perf_counter()
+        await maintenance.run(config, time.monotonic() + 3600)
+        elapsed = time.perf_counter() - start
+        after = file_size(db_path)
+        await rss_reader.close()
+    pruned = max(0, size - keep)
+    print(
+        f"{size:>8} {pruned / elapsed:>12.0f} {elapsed:>9.2f} "
+        f"{before / 1e6:>10.1f} {after / 1e6:>10.1f}"
+    )
+
+
+async def main(sizes, keep: int, summary_bytes: int) -> None:
+    """Runs every size and prints a table."""
+    print(
+        f"{'entries':>8} {'pruned/s':>12} {'seconds':>9} "
+        f"{'before MB':>10} {'after MB':>10}"
+    )
+    for size in sizes:
+        await run(size, keep, summary_bytes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--keep", type=int, default=100)
+    parser.add_argument("--summary-bytes", type=int, default=4000)
+    args = parser.parse_args()
+    asyncio.run(main(args.sizes, args.keep, args.summary_bytes))
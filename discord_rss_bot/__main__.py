@@ -16,7 +16,15 @@ import sys
 
 import discord
 
-from discord_rss_bot.utils import load_config, get_bot_token, get_arguments
+from discord_rss_bot.metrics import STARTUP
+from discord_rss_bot.utils import (
+    load_config,
+    get_bot_token,
+    get_arguments,
+    get_shard,
+    print_fetch_report,
+    vacuum_database,
+)
 from discord_rss_bot.rss import RSSReader
 from discord_rss_bot.bot import DiscordBot
 
@@ -31,23 +39,25 @@ async def initialize_bot(args: argparse.Namespace) -> None:
     logging.getLogger("discord").setLevel(log_level)
 
     try:
-        # Load bot token and configuration
-        bot_token = get_bot_token(args)
-        config = load_config(args.config)
+        # Load configuration, and the bot token unless only webhooks are used
+        config = get_shard(args, load_config(args.config))
+        bot_token = get_bot_token(args) if config.needs_gateway else None
 
         # Initialize RSS reader
         rss_reader = RSSReader(config)
         await rss_reader.setup()
+        STARTUP.mark("setup")
 
         # Initialize Discord bot with default intents
         intents = discord.Intents.default()
-        bot = DiscordBot(rss_reader, intents=intents, root_logger=True)
+        bot = DiscordBot(
+            rss_reader, args.config, intents=intents, root_logger=True
+        )
 
         logging.info("Bot is starting...")
         await bot.start(bot_token)
 
-    # pylint: disable=W0718
-    except Exception as e:
+    except Exception as e:  # pylint: disable=broad-exception-caught
         logging.critical(
             "An unrecoverable error occurred: %s", e, exc_info=True
         )
@@ -56,12 +66,18 @@ async def initialize_bot(args: argparse.Namespace) -> None:
 
 def main():
     """Main function to start the bot asynchronously."""
+    args = get_arguments()
+    if args.command == "report":
+        print_fetch_report(args)
+        return
+    if args.command == "vacuum":
+        vacuum_database(args)
+        return
     try:
-        asyncio.run(initialize_bot(get_arguments()))
+        asyncio.run(initialize_bot(args))
     except KeyboardInterrupt:
         logging.info("Bot shutting down gracefully.")
-    # pylint: disable=W0718
-    except Exception as e:
+    except Exception as e:  # pylint: disable=broad-exception-caught
         logging.critical(
             "Unexpected error in bot execution: %s", e, exc_info=True
         )
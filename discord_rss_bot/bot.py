@@ -1,37 +1,171 @@
 """
 DiscordBot: An Asynchronous Discord Bot for Posting RSS Feed Updates
 
-This bot periodically checks configured RSS feeds and posts new entries
-to designated Discord channels. Key features include:
-  - Asynchronous RSS feed updates via an RSSReader instance.
-  - Concurrent processing of multiple feeds and their entries.
+This bot checks configured RSS feeds as they become due and posts new
+entries to designated Discord channels. Key features include:
+  - Asynchronous, parallel RSS feed updates via an RSSReader instance.
+  - Adaptive per-feed polling that wakes up when the next feed is due.
+  - Configuration hot-reload without reconnecting to Discord.
+  - Streaming delivery of updated feeds while other feeds are fetched.
+  - Rate-limit-aware, ordered sending through per-channel queues.
+  - A durable outbox, so sends survive restarts and failures are retried.
+  - Fan-out of a feed to many channels with one query and formatting pass.
+  - Delivery to webhooks over a shared HTTP session; webhook-only
+    deployments skip the Discord gateway connection.
+  - Compiled include/exclude rules, applied before entries are formatted.
+  - Suppression of stories already posted to a channel by another feed.
+  - Per-feed caps on entries posted per check, with a backlog policy.
+  - Retention limits and database maintenance while the bot is idle.
+  - Optional formatting in a worker pool, keeping the event loop free.
   - Graceful error handling to avoid disruptions in execution.
   - Built-in healthcheck endpoints for liveness and readiness monitoring.
+  - Prometheus metrics of every pipeline stage on the `/metrics` endpoint.
 """
 
+import contextlib
 import logging
 import asyncio
-from typing import List, Optional
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
 from aiohttp import web
 
 import discord
 import reader
-from reader.types import Entry
-from discord.ext import tasks
+from reader.types import UpdatedFeed, UpdateResult
 
 from discord_rss_bot.rss import RSSReader
-from discord_rss_bot.message import format_entry_for_discord
-from discord_rss_bot.models import FeedConfig
+from discord_rss_bot.cache import SummaryCache
+from discord_rss_bot.dedup import SeenIndex
+from discord_rss_bot.formatter import EntryFormatter
+from discord_rss_bot.message import (
+    build_digest_embed,
+    pack_embeds,
+    summary_cache_key,
+)
+from discord_rss_bot.metrics import (
+    CHECK_SECONDS,
+    ENTRIES_DEAD_LETTERED,
+    ENTRIES_DELIVERED,
+    ENTRIES_DUPLICATE,
+    ENTRIES_FAILED,
+    ENTRIES_FILTERED,
+    ENTRIES_SKIPPED,
+    FEED_LABELS,
+    FORMAT_CACHE,
+    LOOP_LAG_SECONDS,
+    READER_QUEUE_DEPTH,
+    READER_QUEUE_WAIT_SECONDS,
+    REGISTRY,
+    SEND_QUEUE_DEPTH,
+    STARTUP,
+    LoopLagMonitor,
+)
+from discord_rss_bot.filters import EntryFilter, compile_filters, rules_filter
+from discord_rss_bot.models import ChannelConfig, ConfigFile, FeedConfig
+from discord_rss_bot.outbox import (
+    DRAIN_PAGE_SIZE,
+    Outbox,
+    OutboxMessage,
+    PendingMessage,
+)
+from discord_rss_bot.polling import PollScheduler
+from discord_rss_bot.reload import (
+    ConfigWatcher,
+    destinations,
+    diff_config,
+    group_feeds,
+    restart_settings,
+)
+from discord_rss_bot.retention import Maintenance
+from discord_rss_bot.scheduler import SendResult, SendScheduler
+from discord_rss_bot.sharding import shard_config
+from discord_rss_bot.storage import DeliveryEntry
+from discord_rss_bot.webhooks import WebhookPool
 
+# Shortest sleep between two checks, in seconds
+MIN_POLL_DELAY = 1.0
+# Sleep without any feeds, and longest wait before retrying failed sends
+IDLE_POLL_DELAY = 300.0
+# Older entries listed by name in the digest of a capped feed
+DIGEST_MAX_ENTRIES = 25
 
+# Feeds waiting for delivery (all configurations of a feed URL), with
+# their unread entries if already fetched
+DeliveryQueue = asyncio.Queue[
+    Tuple[List[FeedConfig], Optional[List[DeliveryEntry]]]
+]
+# A channel a feed is posted to, with the configuration listing it
+Target = Tuple[FeedConfig, ChannelConfig]
+
+
+# pylint: disable-next=too-many-instance-attributes
 class DiscordBot(discord.Client):
     """Custom Discord bot class for posting RSS updates."""
 
-    def __init__(self, rss_reader: RSSReader, **kwargs):
+    def __init__(
+        self,
+        rss_reader: RSSReader,
+        config_path: Optional[str] = None,
+        **kwargs,
+    ):
         """Initialize the bot."""
+        kwargs.setdefault(
+            "max_ratelimit_timeout", rss_reader.config.max_ratelimit_timeout
+        )
         super().__init__(**kwargs)
         self.rss_reader = rss_reader
+        self.sender = SendScheduler(rss_reader.config.send_max_in_flight)
+        self.webhooks = WebhookPool(
+            rss_reader.config.webhook_connections,
+            rss_reader.config.webhook_connections_per_host,
+        )
+        self.webhooks.configure(rss_reader.config.feeds)
+        self.destinations = destinations(rss_reader.config.feeds)
+        self.format_cache = SummaryCache.for_database(
+            rss_reader.config.db_path,
+            rss_reader.config.format_cache_bytes,
+            rss_reader.config.format_cache_persist,
+        )
+        self.outbox = Outbox(
+            rss_reader.task_executor, rss_reader.config.outbox_max_attempts
+        )
+        self.seen = SeenIndex(
+            rss_reader.task_executor, rss_reader.config.dedup_window
+        )
+        self.maintenance = Maintenance(
+            rss_reader.task_executor,
+            rss_reader.config.db_path,
+            rss_reader.config.maintenance_interval,
+        )
+        self.maintenance.configure(rss_reader.config)
+        self.formatter = EntryFormatter(
+            self.format_cache,
+            rss_reader.config.format_workers,
+            rss_reader.config.format_executor,
+        )
+        compile_filters(rss_reader.config.feeds)
+        self.loop_lag = LoopLagMonitor()
+        self.poller = PollScheduler(rss_reader.config.feeds)
+        self.poll_task: Optional["asyncio.Task[None]"] = None
+        self.poll_wakeup = asyncio.Event()
+        self.config_watcher = (
+            ConfigWatcher(
+                config_path,
+                self.reload_config,
+                rss_reader.config.config_reload_interval,
+            )
+            if config_path
+            else None
+        )
+        FEED_LABELS.configure(
+            rss_reader.config.metrics_feed_labels,
+            rss_reader.config.metrics_max_feed_labels,
+        )
         self.is_ready_flag = False
+        # Scan all feeds for unread entries on the first run
+        self.backlog_pending = True
+        # Capped feeds with entries left for the next checks
+        self.draining: Set[str] = set()
 
     async def on_ready(self):
         """Runs when the bot successfully connects to Discord."""
@@ -40,87 +174,635 @@ class DiscordBot(discord.Client):
             self.user,
             self.user.id,  # pyright: ignore[reportOptionalMemberAccess]
         )
+        self._start_polling()
+
+    def _start_polling(self) -> None:
+        """Marks the bot as ready and starts checking feeds."""
         self.is_ready_flag = True  # Mark bot as ready
-        self.check_feeds.start()  # Start the periodic task
+        STARTUP.mark("ready")
+        if self.poll_task is None or self.poll_task.done():
+            self.poll_task = asyncio.create_task(self.poll_feeds())
+
+    async def poll_feeds(self) -> None:
+        """Checks feeds, then sleeps until the next feed is due."""
+        while True:
+            self.poll_wakeup.clear()
+            try:
+                await self.check_feeds()
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logging.error("Error checking feeds: %s", e, exc_info=True)
+            delay = self.poller.delay(IDLE_POLL_DELAY)
+            if self.backlog_pending or self.draining:
+                delay = min(delay, IDLE_POLL_DELAY)
+            retry_at = await self.outbox.next_attempt()
+            if retry_at is not None:
+                delay = min(delay, retry_at - time.time())
+            delay = max(MIN_POLL_DELAY, delay)
+            logging.info("Next feed check in %.0f seconds", delay)
+            wake_at = time.monotonic() + delay
+            if self.maintenance.due():
+                await self.maintenance.run(self.rss_reader.config, wake_at)
+            try:
+                await asyncio.wait_for(
+                    self.poll_wakeup.wait(), max(0, wake_at - time.monotonic())
+                )
+            except asyncio.TimeoutError:
+                pass
+
+    async def reload_config(self, config: ConfigFile) -> None:
+        """
+        Applies the feeds of a reloaded configuration: only added, removed
+        and changed feeds are touched, and added feeds are checked at once.
+        Other settings only change after a restart.
+        """
+        current = self.rss_reader.config
+        config = shard_config(config, current.shard_index, current.shard_count)
+        for name in restart_settings(current, config):
+            logging.warning("Setting %s changes only after a restart", name)
+        changes = diff_config(current, config)
+        if not changes:
+            logging.info("Configuration reloaded, no feed changes")
+            return
+
+        logging.info(
+            "Configuration reloaded: %d feeds added, %d removed, %d changed",
+            len(changes.added),
+            len(changes.removed),
+            len(changes.changed),
+        )
+        config = current.model_copy(update={"feeds": config.feeds})
+        if config.needs_gateway and not current.needs_gateway:
+            logging.warning("Posting to channels requires a restart")
+        compile_filters(config.feeds)
+        self.webhooks.configure(config.feeds)
+        self.destinations = destinations(config.feeds)
+        await self.rss_reader.apply_config(config, changes)
+        self.maintenance.configure(config)
+        unchanged = {feed.feed_url for feed in config.feeds} - (
+            changes.added | changes.changed
+        )
+        self.poller.reconfigure(config.feeds, keep=unchanged)
+        self.draining &= {feed.feed_url for feed in config.feeds}
+        self.poller.load(await self.rss_reader.get_update_after())
+        self.poll_wakeup.set()
 
-    @tasks.loop(minutes=5)
     async def check_feeds(self):
-        """Fetches updates for all feeds and processes them."""
+        """
+        Fetches updates for the feeds that are due and streams the feeds
+        that received new entries into a bounded delivery queue, so delivery
+        overlaps with fetching the remaining feeds. Unchanged feeds are
+        skipped without querying the database. Afterwards, polling intervals
+        are adapted to the results.
+        """
         logging.info("Checking for new RSS updates...")
-        await self.rss_reader.update_feeds(scheduled=True)
+        with CHECK_SECONDS.time():
+            await self._check_feeds()
+        STARTUP.mark("first_check")
+        logging.debug("Reader executor: %s", self.rss_reader.executor_stats())
+        logging.debug("Send scheduler: %s", self.sender.stats())
+        logging.debug("Format cache: %s", self.format_cache.stats())
+        logging.debug("Event loop lag: %s", self.loop_lag.stats())
 
-        feeds = [
-            self._process_feed(feed) for feed in self.rss_reader.config.feeds
-        ]
-        await asyncio.gather(*feeds)  # Process all feeds concurrently
+    async def _check_feeds(self) -> None:
+        """Runs one feed check, see `check_feeds`."""
+        config = self.rss_reader.config
+        configs = group_feeds(config.feeds)
 
-    async def _process_feed(self, feed: FeedConfig) -> None:
-        """Processes a single RSS feed and posts updates to Discord."""
+        queue: DeliveryQueue = asyncio.Queue(maxsize=config.delivery_queue_size)
+        workers = [
+            asyncio.create_task(self._delivery_worker(queue))
+            for _ in range(config.delivery_workers)
+        ]
+        results: List[UpdateResult] = []
+        delivered: Set[str] = set()
         try:
-            unread_entries = await self.rss_reader.get_unread_entries(
-                feed.feed_url
+            await self._drain_outbox()
+            async for result in self.rss_reader.update_feeds_iter(
+                scheduled=True
+            ):
+                results.append(result)
+                if self._has_new_entries(result) and result.url in configs:
+                    delivered.add(result.url)
+                    await queue.put((configs[result.url], None))
+            await queue.join()  # Wait for all updated feeds to be delivered
+
+            if self.backlog_pending or self.draining:
+                await self._queue_backlog(queue, configs, delivered)
+                await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+        await self._reschedule(results)
+        await self.seen.prune()
+        await self._store_format_cache()
+
+    async def _store_format_cache(self) -> None:
+        """Writes the summaries rendered during a check to the disk cache."""
+        pending = self.format_cache.take_pending()
+        if pending:
+            await self.rss_reader.task_executor.run(
+                self.format_cache.store, pending
             )
 
-            if not unread_entries:
-                logging.info("No unread entries for feed %s", feed.feed_url)
-                return
+    async def _reschedule(self, results: List[UpdateResult]) -> None:
+        """Adapts polling intervals and reloads the feeds' due times."""
+        changed = self.poller.record(results)
+        if changed:
+            await self.rss_reader.set_update_intervals(changed)
+        self.poller.load(await self.rss_reader.get_update_after())
+
+    async def _queue_backlog(
+        self,
+        queue: "DeliveryQueue",
+        configs: Dict[str, List[FeedConfig]],
+        delivered: Set[str],
+    ) -> None:
+        """
+        Queues entries left unread by a previous run (or held back by the
+        per-feed limit), found with a single query across all feeds.
+        Capped feeds load their own slice instead, at most once per check
+        (`delivered` holds the feeds already delivered in this check).
+        """
+        capped = {
+            feed_url
+            for feed_url, feeds in configs.items()
+            if feeds[0].max_entries_per_tick is not None
+        }
+        if self.backlog_pending:
+            scan_capped = set(capped)
+            limit = self.rss_reader.config.unread_entries_limit
+            backlog = await self.rss_reader.get_all_unread_entries(
+                limit, exclude=capped
+            )
+            self.backlog_pending = limit is not None and any(
+                len(entries) >= limit for entries in backlog.values()
+            )
+            for feed_url, entries in backlog.items():
+                if feed_url in configs:
+                    await queue.put((configs[feed_url], entries))
+        else:
+            scan_capped = set(self.draining)
+
+        for feed_url in scan_capped - delivered:
+            await queue.put((configs[feed_url], None))
 
-            channel = self._get_channel(feed.channel_id)
-            if not channel:
+    @staticmethod
+    def _has_new_entries(result: UpdateResult) -> bool:
+        """Whether a feed update stored any new entries."""
+        return isinstance(result.value, UpdatedFeed) and result.value.new > 0
+
+    async def _delivery_worker(self, queue: "DeliveryQueue"):
+        """Delivers queued feeds until cancelled."""
+        while True:
+            feeds, entries = await queue.get()
+            try:
+                await self._process_feed(feeds, entries)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # Keep the worker alive so the queue can still be drained
                 logging.error(
-                    "Invalid channel ID %s for feed %s",
-                    feed.channel_id,
-                    feed.feed_url,
+                    "Unexpected error delivering feed %s: %s",
+                    feeds[0].feed_url,
+                    e,
+                    exc_info=True,
                 )
+            finally:
+                queue.task_done()
+
+    async def _process_feed(
+        self,
+        feeds: List[FeedConfig],
+        unread_entries: Optional[List[DeliveryEntry]] = None,
+    ) -> None:
+        """
+        Processes a single RSS feed and posts updates to every channel of
+        its configurations (`feeds`, all with the same URL). Queries the
+        feed's unread entries unless they are provided; capped feeds always
+        load their own slice. Entries are loaded and formatted only once,
+        however many channels they are posted to.
+        """
+        # The first configuration decides how unread entries are loaded
+        feed = feeds[0]
+        try:
+            digest: List[DeliveryEntry] = []
+            overflow = 0
+            if feed.max_entries_per_tick is not None:
+                unread_entries, digest, overflow = await self._load_capped(feed)
+            elif unread_entries is None:
+                unread_entries = await self._load_unread(feed)
+
+            if not unread_entries:
+                logging.info("No unread entries for feed %s", feed.feed_url)
+                self.draining.discard(feed.feed_url)
                 return
 
-            await self._process_entries(unread_entries, feed, channel)
+            targets = self._get_targets(feeds)
+            if not targets:
+                return
 
-            # Mark entries as read after successful processing
-            await self.rss_reader.mark_entries_as_read(unread_entries)
+            queued = await self._queue_entries(
+                targets, unread_entries, digest, overflow
+            )
+            if queued is None:
+                # The entries stay unread and are retried on the next run
+                self.backlog_pending = True
+                return
+            await self._handle_overflow(feed, unread_entries + digest, overflow)
+            await self._deliver(queued)
 
         except (reader.ReaderError, discord.DiscordException) as e:
             logging.error("Error processing feed %s: %s", feed.feed_url, e)
 
-    async def _process_entries(
+    def _get_targets(self, feeds: List[FeedConfig]) -> List[Target]:
+        """Returns the valid channels and webhooks of a feed's configurations."""
+        targets: Dict[str, Target] = {}
+        for feed in feeds:
+            for channel in feed.targets:
+                if channel.destination in targets:
+                    continue
+                if self._get_destination(channel.destination) is None:
+                    logging.error(
+                        "Invalid channel %s for feed %s",
+                        channel.destination,
+                        feed.feed_url,
+                    )
+                    continue
+                targets[channel.destination] = (feed, channel)
+        return list(targets.values())
+
+    async def _load_unread(self, feed: FeedConfig) -> List[DeliveryEntry]:
+        """
+        Loads the unread entries of an updated feed, at most the oldest
+        `unread_entries_limit` of them. The rest is left to the backlog
+        scan, which continues with them after this check's deliveries.
+        """
+        limit = self.rss_reader.config.unread_entries_limit
+        if limit is None:
+            return await self.rss_reader.get_unread_entries(feed.feed_url)
+        entries, total = await self.rss_reader.get_unread_slice(
+            feed.feed_url, limit, oldest=True
+        )
+        if total > len(entries):
+            self.backlog_pending = True
+        return entries
+
+    async def _load_capped(
+        self, feed: FeedConfig
+    ) -> Tuple[List[DeliveryEntry], List[DeliveryEntry], int]:
+        """
+        Loads a slice of a capped feed's unread entries according to its
+        backlog policy: the newest `max_entries_per_tick` ones (followed by
+        older ones to list in a digest), or the oldest ones when draining.
+        Returns the entries to post, the entries to list in a digest and
+        the number of unread entries beyond the cap.
+        """
+        cap = feed.max_entries_per_tick or 0
+        extra = DIGEST_MAX_ENTRIES if feed.backlog_policy == "digest" else 0
+        entries, total = await self.rss_reader.get_unread_slice(
+            feed.feed_url,
+            cap + extra,
+            oldest=feed.backlog_policy == "drain_slowly",
+        )
+        return entries[:cap], entries[cap:], max(0, total - cap)
+
+    async def _queue_entries(
         self,
-        entries: List["Entry"],
-        feed: FeedConfig,
-        channel: discord.TextChannel,
+        targets: List[Target],
+        entries: List[DeliveryEntry],
+        digest: List[DeliveryEntry],
+        overflow: int,
+    ) -> Optional[List[OutboxMessage]]:
+        """
+        Formats the entries each channel receives (once, whatever the
+        number of channels), and stores their messages, and the digest of
+        older entries if any, in the outbox. Digests only list the entries
+        passing the channel's filters that were not posted to it yet. All
+        loaded entries are marked as read in the same transaction,
+        including those no channel received. Returns the stored messages,
+        or None if storing failed.
+        """
+        feed_url = entries[0].feed_url
+        selected = await self._select_all(targets, entries)
+        embeds = await self._format_entries(entries, selected)
+        digests = (
+            await self._select_all(targets, digest)
+            if digest
+            else [[] for _ in targets]
+        )
+
+        messages: List[PendingMessage] = []
+        for (feed, channel), channel_entries, channel_digest in zip(
+            targets, selected, digests
+        ):
+            if channel_digest:
+                # Older than the entries posted individually, so it goes first
+                messages.append(
+                    self._digest_message(
+                        channel,
+                        channel_digest,
+                        overflow - len(digest) + len(channel_digest),
+                    )
+                )
+            messages.extend(
+                self._pack_messages(feed, channel, channel_entries, embeds)
+            )
+
+        queued = await self.outbox.enqueue(
+            feed_url, messages, entries + digest, self.seen.cutoff()
+        )
+        if queued is not None:
+            self._count_suppressed(feed_url, messages, queued)
+        return queued
+
+    @staticmethod
+    def _count_suppressed(
+        feed_url: str,
+        messages: List[PendingMessage],
+        queued: List[OutboxMessage],
+    ) -> None:
+        """Counts the entries the outbox dropped as posted concurrently."""
+        suppressed = sum(len(m.entries) for m in messages) - sum(
+            len(m.entry_ids) for m in queued
+        )
+        if suppressed:
+            ENTRIES_DUPLICATE.inc(suppressed, feed=FEED_LABELS(feed_url))
+
+    def _digest_message(
+        self, channel: ChannelConfig, entries: List[DeliveryEntry], total: int
+    ) -> PendingMessage:
+        """Builds a channel's digest of `total` entries not posted singly."""
+        return PendingMessage(
+            channel.destination,
+            entries,
+            [build_digest_embed(entries, total, entries[0].feed_url)],
+            self.seen.keys(entries),
+        )
+
+    async def _handle_overflow(
+        self, feed: FeedConfig, loaded: List[DeliveryEntry], overflow: int
     ) -> None:
-        """Sends RSS entries to the designated Discord channel."""
+        """
+        Applies a capped feed's backlog policy to the unread entries beyond
+        its cap: they are left for the next checks when draining, otherwise
+        marked as read in bulk without loading them.
+        """
+        if overflow and feed.backlog_policy == "drain_slowly":
+            logging.info(
+                "%d entries of %s left for the next checks",
+                overflow,
+                feed.feed_url,
+            )
+            self.draining.add(feed.feed_url)
+            return
+        self.draining.discard(feed.feed_url)
+        if not overflow:
+            return
+
+        # Entries added by a concurrent update are newer than the slice
+        skipped = await self.rss_reader.skip_unread_entries(
+            feed.feed_url, max(entry.added for entry in loaded)
+        )
+        ENTRIES_SKIPPED.inc(skipped, feed=FEED_LABELS(feed.feed_url))
         logging.info(
-            "Sending %d entries to channel %s", len(entries), feed.channel_id
+            "Skipped %d older entries of %s (%s)",
+            skipped,
+            feed.feed_url,
+            feed.backlog_policy,
+        )
+
+    async def _select_all(
+        self, targets: List[Target], entries: List[DeliveryEntry]
+    ) -> List[List[DeliveryEntry]]:
+        """
+        Returns the entries each channel receives. The rules of a feed
+        configuration are applied once, however many channels it lists.
+        """
+        passed: Dict[int, List[DeliveryEntry]] = {}
+        for feed, _ in targets:
+            if id(feed) not in passed:
+                passed[id(feed)] = self._filter_entries(
+                    rules_filter(feed), entries
+                )
+        return await asyncio.gather(
+            *(
+                self._select_entries(channel, passed[id(feed)])
+                for feed, channel in targets
+            )
+        )
+
+    async def _select_entries(
+        self, channel: ChannelConfig, entries: List[DeliveryEntry]
+    ) -> List[DeliveryEntry]:
+        """
+        Returns the entries a channel receives: those passing its filters
+        whose story was not posted to it yet.
+        """
+        entries = self._filter_entries(rules_filter(channel), entries)
+        fresh, duplicates = await self.seen.split(channel.destination, entries)
+        if duplicates:
+            logging.info(
+                "Skipping %d entries of %s already posted to channel %s",
+                len(duplicates),
+                duplicates[0].feed_url,
+                channel.destination,
+            )
+            ENTRIES_DUPLICATE.inc(
+                len(duplicates), feed=FEED_LABELS(duplicates[0].feed_url)
+            )
+        return fresh
+
+    @staticmethod
+    def _filter_entries(
+        entry_filter: Optional[EntryFilter], entries: List[DeliveryEntry]
+    ) -> List[DeliveryEntry]:
+        """Drops the entries rejected by a filter, counting them per rule."""
+        if entry_filter is None or not entries:
+            return entries
+        kept: List[DeliveryEntry] = []
+        dropped: Dict[str, int] = {}
+        for entry in entries:
+            rule = entry_filter.check(entry)
+            if rule is None:
+                kept.append(entry)
+            else:
+                dropped[rule] = dropped.get(rule, 0) + 1
+        feed_label = FEED_LABELS(entries[0].feed_url)
+        for rule, count in dropped.items():
+            ENTRIES_FILTERED.inc(count, feed=feed_label, rule=rule)
+        if dropped:
+            logging.info(
+                "Filtered out %d entries of %s: %s",
+                len(entries) - len(kept),
+                entries[0].feed_url,
+                dropped,
+            )
+        return kept
+
+    async def _format_entries(
+        self,
+        entries: List[DeliveryEntry],
+        selected: Sequence[List[DeliveryEntry]],
+    ) -> Dict[str, discord.Embed]:
+        """
+        Formats each of the entries selected for any channel once, and
+        returns their embeds by entry ID.
+        """
+        chosen = {entry.id for channel in selected for entry in channel}
+        entries = [entry for entry in entries if entry.id in chosen]
+        await self._load_format_cache(entries)
+        embeds = await asyncio.gather(
+            *(self.formatter.format(entry) for entry in entries)
         )
+        return {entry.id: embed for entry, embed in zip(entries, embeds)}
 
-        message_tasks = [
-            self._send_entry(entry, feed, channel)
-            for entry in reversed(entries)
+    async def _load_format_cache(self, entries: List[DeliveryEntry]) -> None:
+        """
+        Loads the rendered summaries of the entries that are only in the
+        disk tier of the formatting cache, in one query on the query pool.
+        """
+        keys = self.format_cache.missing(
+            summary_cache_key(entry) for entry in entries if entry.summary
+        )
+        if keys:
+            loaded = await self.rss_reader.task_executor.query(
+                self.format_cache.get_many, keys
+            )
+            self.format_cache.add_loaded(loaded or {})
+
+    def _pack_messages(
+        self,
+        feed: FeedConfig,
+        channel: ChannelConfig,
+        entries: List[DeliveryEntry],
+        embeds: Dict[str, discord.Embed],
+    ) -> List[PendingMessage]:
+        """
+        Groups formatted entries into messages for a Discord channel,
+        oldest first.
+        """
+        if not entries:
+            return []
+        logging.info(
+            "Sending %d entries of %s to channel %s",
+            len(entries),
+            feed.feed_url,
+            channel.destination,
+        )
+
+        ordered = list(reversed(entries))
+        ordered_embeds = [embeds[entry.id] for entry in ordered]
+        if feed.batch_embeds:
+            batches = pack_embeds(ordered_embeds)
+        else:
+            batches = [[index] for index in range(len(ordered))]
+        return [
+            PendingMessage(
+                channel.destination,
+                [ordered[i] for i in batch],
+                [ordered_embeds[i] for i in batch],
+                self.seen.keys([ordered[i] for i in batch]),
+            )
+            for batch in batches
         ]
-        await asyncio.gather(*message_tasks)  # Send all messages concurrently
 
-    async def _send_entry(
-        self, entry: "Entry", feed: FeedConfig, channel: discord.TextChannel
-    ) -> None:
-        """Formats and sends an RSS entry to a Discord channel."""
-        try:
-            message_embded = format_entry_for_discord(entry)
-            await channel.send(embed=message_embded)
+    async def _drain_outbox(self) -> None:
+        """
+        Sends the outbox messages left by a previous run or due a retry,
+        at most one page per check so that fetching is not held back; the
+        next check follows soon while messages are due.
+        """
+        messages = await self.outbox.due(DRAIN_PAGE_SIZE)
+        if messages:
+            logging.info("Sending %d messages from the outbox", len(messages))
+            await self._deliver(messages)
+
+    async def _deliver(self, messages: List[OutboxMessage]) -> None:
+        """Sends outbox messages, acknowledging each delivered one."""
+        await asyncio.gather(
+            *(self._send_message(message) for message in messages)
+        )
+
+    async def _send_message(self, message: OutboxMessage) -> bool:
+        """
+        Sends the embeds of one or more entries as a single message through
+        the send scheduler. Delivered messages are removed from the outbox,
+        failed ones are retried later, up to `outbox_max_attempts` times.
+        Messages Discord rejected, and messages to channels that are no
+        longer configured, are given up at once.
+        """
+        feed_label = FEED_LABELS(message.feed_url)
+        if message.channel_id not in self.destinations:
+            await self._give_up(message, "not configured")
+            return False
+
+        channel = self._get_destination(message.channel_id)
+        result: SendResult = "failed"
+        if channel is not None and len(message.embeds) == 1:
+            result = await self.sender.submit(channel, embed=message.embeds[0])
+        elif channel is not None:
+            result = await self.sender.submit(channel, embeds=message.embeds)
+
+        if result == "sent":
+            await self.outbox.ack(message)
+            ENTRIES_DELIVERED.inc(len(message.entry_ids), feed=feed_label)
             logging.info(
-                "Sent entry %s to channel %s", entry.link, feed.channel_id
+                "Sent %d entries of %s to channel %s",
+                len(message.entry_ids),
+                message.feed_url,
+                message.channel_id,
             )
+            return True
 
-        except discord.DiscordException as e:
-            logging.error(
-                "Error sending entry %s to channel %s: %s",
-                entry.link,
-                feed.channel_id,
-                e,
+        ENTRIES_FAILED.inc(len(message.entry_ids), feed=feed_label)
+        if result == "rejected":
+            await self._give_up(message, "rejected")
+            return False
+        delay = await self.outbox.retry(message)
+        if delay is None:
+            ENTRIES_DEAD_LETTERED.inc(
+                len(message.entry_ids),
+                feed=feed_label,
+                reason="too many attempts",
             )
-            error_message = (
-                f"❗ Failed to send entry [{entry.link}] due to an error: {e}"
+            logging.error(
+                "Giving up %d entries of %s for channel %s after %d attempts",
+                len(message.entry_ids),
+                message.feed_url,
+                message.channel_id,
+                message.attempts + 1,
             )
-            await channel.send(error_message)  # Notify in Discord channel
+            return False
+        logging.error(
+            "Error sending %d entries of %s to channel %s, retrying in %.0fs",
+            len(message.entry_ids),
+            message.feed_url,
+            message.channel_id,
+            delay,
+        )
+        return False
+
+    async def _give_up(self, message: OutboxMessage, reason: str) -> None:
+        """Moves a message that can never be delivered to the dead letters."""
+        await self.outbox.dead_letter(message, reason)
+        ENTRIES_DEAD_LETTERED.inc(
+            len(message.entry_ids),
+            feed=FEED_LABELS(message.feed_url),
+            reason=reason,
+        )
+        logging.error(
+            "Giving up %d entries of %s for channel %s: %s",
+            len(message.entry_ids),
+            message.feed_url,
+            message.channel_id,
+            reason,
+        )
+
+    def _get_destination(
+        self, destination: str
+    ) -> Optional[discord.TextChannel | discord.Webhook]:
+        """Retrieves the channel or webhook of an outbox destination."""
+        if destination.startswith("webhook:"):
+            return self.webhooks.get(destination)
+        return self._get_channel(destination)
 
     def _get_channel(
         self, channel_id: int | str
@@ -148,6 +830,7 @@ class DiscordBot(discord.Client):
         app = web.Application()
         app.router.add_get("/healthz", self.liveness_probe)
         app.router.add_get("/readyz", self.readiness_probe)
+        app.router.add_get("/metrics", self.metrics_endpoint)
         runner = web.AppRunner(app)
         await runner.setup()
         site = web.TCPSite(runner, "0.0.0.0", 8080)  # Expose healthcheck API
@@ -163,8 +846,49 @@ class DiscordBot(discord.Client):
             return web.Response(text="I'm ready!", status=200)
         return web.Response(text="I'm not ready yet.", status=503)
 
-    async def start(self, token: str, *_args, **_kwargs):
-        """Start the bot and healthcheck server in parallel."""
+    async def metrics_endpoint(self, _request):
+        """Metrics – Returns all metrics in the Prometheus text format."""
+        for lane, stats in self.rss_reader.executor_stats().items():
+            READER_QUEUE_DEPTH.set(stats["queue_depth"], lane=lane)
+            READER_QUEUE_WAIT_SECONDS.set(stats["max_wait"], lane=lane)
+        SEND_QUEUE_DEPTH.set(self.sender.stats()["queue_depth"])
+        for counter, value in self.format_cache.stats().items():
+            FORMAT_CACHE.set(value, counter=counter)
+        for stat, value in self.loop_lag.stats().items():
+            LOOP_LAG_SECONDS.set(value, stat=stat)
+        return web.Response(text=REGISTRY.expose(), content_type="text/plain")
+
+    async def close(self):
+        """Disconnects from Discord and releases the RSS reader."""
+        if self.poll_task is not None:
+            self.poll_task.cancel()
+        if self.config_watcher is not None:
+            await self.config_watcher.stop()
+        await super().close()
+        await self.sender.close()
+        await self.webhooks.close()
+        await self.loop_lag.stop()
+        self.formatter.shutdown()
+        await self.rss_reader.close()
+        self.format_cache.close()
+
+    async def start(self, token: Optional[str], *_args, **_kwargs):
+        """
+        Start the bot and healthcheck server in parallel. When every feed
+        posts to webhooks, the bot does not connect to Discord at all.
+        """
+        self.loop_lag.start()
+        if self.config_watcher is not None:
+            self.config_watcher.start()
+        if not self.rss_reader.config.needs_gateway:
+            logging.info("Only webhooks configured, not connecting to Discord")
+            await self.start_healthchecks()
+            self._start_polling()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.poll_task
+            return
+        if token is None:
+            raise ValueError("Bot token was not provided.")
         await asyncio.gather(
             # Start healthchecks
             self.start_healthchecks(),
@@ -0,0 +1,219 @@
+"""
+Content-addressed cache for rendered entry summaries.
+
+Rendering a summary (HTML to Markdown plus image extraction) is the most
+expensive part of formatting an entry. The same HTML is rendered again
+when a send is retried, when an entry is cross-posted, or when a feed
+re-publishes an unchanged entry under a new ID. This cache keys rendered
+summaries on a hash of their content instead of the entry ID:
+
+  - An in-memory LRU tier bounded by the approximate size of its values.
+  - An optional SQLite tier, stored next to the reader database, so the
+    cache survives restarts. Neither tier is read or written on the event
+    loop: the caller loads the values of a batch of entries missing from
+    memory with `get_many`, and stores the values queued by `put` in one
+    transaction with `store`, both from a worker thread.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Rendered summary: quoted Markdown and image URLs
+Rendered = Tuple[str, List[str]]
+
+CACHE_FILE_NAME = "format_cache.sqlite3"
+# Rows kept in the on-disk tier, newest first
+MAX_DISK_ENTRIES = 50_000
+# Keys looked up per query, below SQLite's limit of bound parameters
+LOOKUP_BATCH = 500
+
+
+def _size(value: Rendered) -> int:
+    """Approximate memory cost of a cached value, in characters."""
+    markdown, images = value
+    return len(markdown) + sum(len(url) for url in images)
+
+
+# pylint: disable-next=too-many-instance-attributes
+class SummaryCache:
+    """LRU cache of rendered summaries with an optional on-disk tier."""
+
+    def __init__(self, max_bytes: int, path: Optional[str] = None) -> None:
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Rendered]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.pending: Dict[str, Rendered] = {}
+        # Read by `get_many` from any worker thread, one at a time
+        self.db = self._open(path) if path else None
+        self.db_lock = threading.Lock()
+        # Separate connection for `store`, so reads never wait for writes
+        self.writer = (
+            self._connect(path, check_same_thread=False)
+            if path and self.db is not None
+            else None
+        )
+
+    @classmethod
+    def for_database(
+        cls, db_path: str, max_bytes: int, persist: bool
+    ) -> "SummaryCache":
+        """Creates a cache, persisted next to the reader database if asked."""
+        path = None
+        if persist:
+            path = os.path.join(os.path.dirname(db_path), CACHE_FILE_NAME)
+        return cls(max_bytes, path)
+
+    @staticmethod
+    def _connect(
+        path: str, check_same_thread: bool = True
+    ) -> sqlite3.Connection:
+        """Opens a connection to the on-disk tier."""
+        db = sqlite3.connect(path, check_same_thread=check_same_thread)
+        db.execute("PRAGMA journal_mode = WAL;")
+        db.execute("PRAGMA synchronous = NORMAL;")
+        return db
+
+    @classmethod
+    def _open(cls, path: str) -> Optional[sqlite3.Connection]:
+        """Opens the on-disk tier and drops its oldest rows."""
+        try:
+            db = cls._connect(path, check_same_thread=False)
+            with db:
+                db.execute(
+                    "CREATE TABLE IF NOT EXISTS summaries ("
+                    "key TEXT PRIMARY KEY, markdown TEXT NOT NULL, "
+                    "images TEXT NOT NULL, stored_at REAL NOT NULL);"
+                )
+                db.execute(
+                    "DELETE FROM summaries WHERE key NOT IN ("
+                    "SELECT key FROM summaries ORDER BY stored_at DESC LIMIT ?);",
+                    (MAX_DISK_ENTRIES,),
+                )
+            return db
+        except sqlite3.Error as error:
+            logging.error("Error opening format cache %s: %s", path, error)
+            return None
+
+    def get(self, key: str) -> Optional[Rendered]:
+        """Returns the value for the key from the memory tier, if any."""
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        return None
+
+    def missing(self, keys: Iterable[str]) -> List[str]:
+        """
+        Returns the keys worth looking up in the disk tier with
+        `get_many`: those not in memory, none without a disk tier.
+        """
+        if self.db is None:
+            return []
+        return list(dict.fromkeys(k for k in keys if k not in self.entries))
+
+    def get_many(self, keys: List[str]) -> Dict[str, Rendered]:
+        """
+        Reads the values of the keys found in the disk tier. Blocking, but
+        safe to call from a thread other than the event loop's; add the
+        result to memory with `add_loaded`.
+        """
+        found: Dict[str, Rendered] = {}
+        if self.db is None:
+            return found
+        try:
+            with self.db_lock:
+                for start in range(0, len(keys), LOOKUP_BATCH):
+                    batch = keys[start : start + LOOKUP_BATCH]
+                    rows = self.db.execute(
+                        "SELECT key, markdown, images FROM summaries "
+                        f"WHERE key IN ({', '.join('?' * len(batch))});",
+                        batch,
+                    )
+                    for key, markdown, images in rows:
+                        found[key] = (markdown, json.loads(images))
+        except sqlite3.Error as error:
+            logging.error("Error reading format cache: %s", error)
+        return found
+
+    def add_loaded(self, values: Dict[str, Rendered]) -> None:
+        """Adds values read by `get_many` to the memory tier."""
+        self.disk_hits += len(values)
+        for key, value in values.items():
+            self._remember(key, value)
+
+    def put(self, key: str, value: Rendered) -> None:
+        """
+        Stores a value in memory and, if enabled, queues it for the disk
+        tier (see `take_pending`).
+        """
+        self._remember(key, value)
+        if self.writer is not None:
+            self.pending[key] = value
+
+    def take_pending(self) -> Dict[str, Rendered]:
+        """Returns the values queued for the disk tier and clears the queue."""
+        pending, self.pending = self.pending, {}
+        return pending
+
+    def store(self, values: Dict[str, Rendered]) -> None:
+        """
+        Writes values to the disk tier in one transaction. Blocking, but
+        safe to call from a thread other than the event loop's.
+        """
+        if self.writer is None or not values:
+            return
+        now = time.time()
+        try:
+            with self.writer:
+                self.writer.executemany(
+                    "INSERT OR REPLACE INTO summaries VALUES (?, ?, ?, ?);",
+                    (
+                        (key, markdown, json.dumps(images), now)
+                        for key, (markdown, images) in values.items()
+                    ),
+                )
+        except sqlite3.Error as error:
+            logging.error("Error writing format cache: %s", error)
+
+    def _remember(self, key: str, value: Rendered) -> None:
+        """Adds a value to the memory tier, evicting the oldest entries."""
+        if key in self.entries:
+            self.size -= _size(self.entries.pop(key))
+        self.entries[key] = value
+        self.size += _size(value)
+        while self.size > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= _size(evicted)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns hit and miss counters and the memory tier's size. Values
+        loaded from disk count as disk hits, then as hits when used.
+        """
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": len(self.entries),
+            "size": self.size,
+        }
+
+    def close(self) -> None:
+        """Stores the queued values and closes the on-disk tier."""
+        self.store(self.take_pending())
+        for db in (self.db, self.writer):
+            if db is not None:
+                db.close()
+        self.db = self.writer = None
@@ -0,0 +1,122 @@
+"""
+SeenIndex: Cross-feed duplicate suppression.
+
+Aggregator feeds often carry the same story as the original site, or as
+each other, and posting it once per feed floods the channel. This module
+remembers what each channel received and drops repeats before they are
+formatted:
+
+  - Each entry is keyed on its normalized link (scheme, `www.`, fragment,
+    trailing slash and tracking parameters ignored), or on its ID if it
+    has no link. Keys are stored as 8-byte hashes per channel in the
+    `seen` table, a `WITHOUT ROWID` table whose primary key is the lookup.
+  - Keys expire after `dedup_window` days and are pruned once per check,
+    so the table stays bounded by the posting rate, not the history.
+  - Duplicates known before formatting are dropped for free; the check is
+    repeated in the outbox transaction (see `storage.enqueue_messages`),
+    so two feeds delivered concurrently cannot both post the same link.
+  - A key is held by its outbox message until the message is delivered;
+    if it is dead-lettered instead, the key is forgotten, so the story can
+    still reach the channel through another feed.
+"""
+
+import hashlib
+import time
+from typing import List, Optional, Sequence, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+from discord_rss_bot import storage
+from discord_rss_bot.rss import ReaderTaskExecutor
+from discord_rss_bot.storage import DeliveryEntry
+
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = {"fbclid", "gclid", "igshid", "mc_cid", "mc_eid", "ref"}
+TRACKING_PREFIXES = ("utm_",)
+
+
+def normalize_link(link: str) -> str:
+    """Reduces a link to the parts that identify the linked page."""
+    parts = urlsplit(link.strip())
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if parts.port:
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in TRACKING_PARAMS
+        and not name.lower().startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/")
+    return f"{host}{path}?{urlencode(query)}" if query else f"{host}{path}"
+
+
+def entry_key(entry: DeliveryEntry) -> bytes:
+    """Hashed key of the story an entry links to."""
+    if entry.link:
+        key = f"link:{normalize_link(entry.link)}"
+    else:
+        key = f"id:{entry.feed_url}\0{entry.id}"
+    return hashlib.blake2b(key.encode(), digest_size=8).digest()
+
+
+class SeenIndex:
+    """Per-channel set of recently posted stories."""
+
+    def __init__(
+        self,
+        executor: ReaderTaskExecutor,
+        window: Optional[float],
+    ) -> None:
+        self.executor = executor
+        self.window = window * 86400 if window else None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether duplicates are suppressed at all."""
+        return self.window is not None
+
+    def cutoff(self) -> float:
+        """Timestamp before which posted stories are forgotten."""
+        return time.time() - (self.window or 0.0)
+
+    def keys(self, entries: Sequence[DeliveryEntry]) -> List[bytes]:
+        """Keys to record for entries posted together, none if disabled."""
+        return [entry_key(entry) for entry in entries] if self.enabled else []
+
+    async def split(
+        self, channel_id: int | str, entries: List[DeliveryEntry]
+    ) -> Tuple[List[DeliveryEntry], List[DeliveryEntry]]:
+        """
+        Separates new stories from duplicates, preserving the order of
+        `entries`. Of several entries of the same story, the oldest is kept.
+        """
+        if not self.enabled or not entries:
+            return entries, []
+        keys = [entry_key(entry) for entry in entries]
+        seen: Set[bytes] = (
+            await self.executor.query_db(
+                storage.seen_keys, str(channel_id), keys, self.cutoff()
+            )
+            # The outbox transaction still catches the duplicates
+            or set()
+        )
+        fresh: List[DeliveryEntry] = []
+        duplicates: List[DeliveryEntry] = []
+        # Entries are newest first, so walk them oldest first
+        for entry, key in reversed(list(zip(entries, keys))):
+            if key in seen:
+                duplicates.append(entry)
+            else:
+                seen.add(key)
+                fresh.append(entry)
+        fresh.reverse()
+        duplicates.reverse()
+        return fresh, duplicates
+
+    async def prune(self) -> int:
+        """Forgets expired stories; returns how many."""
+        if not self.enabled:
+            return 0
+        return (
+            await self.executor.run_db(storage.prune_seen, self.cutoff()) or 0
+        )
@@ -0,0 +1,97 @@
+"""
+FetchRecorder: Per-feed fetch statistics.
+
+`reader` retrieves feeds on its own, so how each fetch went (status code,
+bytes transferred, response time, whether the conditional GET was
+answered with 304 Not Modified) is invisible to the bot. This module
+hooks into the HTTP session of the `reader` instance to observe every
+request and response, and pairs them with the feed's update result:
+
+  - The hooks only store a reference to the response, they never touch
+    the body that `reader` streams into the parser.
+  - Records are collected in memory during an update round and stored by
+    the caller in a single transaction (see `storage.record_fetches`).
+"""
+
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from reader import Reader
+from reader.types import UpdateResult
+
+from discord_rss_bot.storage import FetchRecord, utcnow
+
+CONDITIONAL_HEADERS = ("If-None-Match", "If-Modified-Since")
+
+
+def _response_bytes(response: requests.Response) -> int:
+    """Bytes received for the response body, as sent over the wire."""
+    tell = getattr(response.raw, "tell", None)
+    if tell is not None:
+        try:
+            return int(tell())
+        except (OSError, ValueError):
+            pass
+    try:
+        return int(response.headers.get("Content-Length", 0))
+    except ValueError:
+        return 0
+
+
+class FetchRecorder:
+    """Observes the HTTP requests of a reader to build fetch records."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._responses: Dict[str, requests.Response] = {}
+
+    def install(self, rss_reader: Reader) -> None:
+        """Registers the response hook on the reader's HTTP session."""
+        # The documented extension point, also used by reader's own plugins
+        # pylint: disable-next=protected-access
+        session_factory = rss_reader._parser.session_factory
+        session_factory.response_hooks.append(self._on_response)
+
+    def _on_response(
+        self,
+        _session: requests.Session,
+        response: requests.Response,
+        request: requests.Request,
+        **_kwargs: Any,
+    ) -> None:
+        """Remembers the last response received for a feed."""
+        with self._lock:
+            self._responses[str(request.url)] = response
+
+    def collect(self, result: UpdateResult) -> FetchRecord:
+        """Builds the fetch record of a feed from its update result."""
+        with self._lock:
+            response: Optional[requests.Response] = self._responses.pop(
+                result.url, None
+            )
+        value = result.value
+        new_entries = getattr(value, "new", 0)
+        if response is None:
+            return FetchRecord(
+                result.url,
+                utcnow(),
+                None,
+                0,
+                0.0,
+                False,
+                new_entries,
+                isinstance(value, Exception),
+            )
+
+        headers = response.request.headers
+        return FetchRecord(
+            result.url,
+            utcnow(),
+            response.status_code,
+            _response_bytes(response),
+            response.elapsed.total_seconds(),
+            any(header in headers for header in CONDITIONAL_HEADERS),
+            new_entries,
+            isinstance(value, Exception),
+        )
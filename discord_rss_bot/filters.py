@@ -0,0 +1,199 @@
+"""
+Entry filters: which entries a feed posts, and to which channels.
+
+Feeds and channels can drop entries with include and exclude rules, each
+a keyword or a regular expression matched case-insensitively against one
+field of the entry (or all of them). Filtering runs before formatting:
+
+  - The rules of a feed or channel are compiled once, when the
+    configuration is loaded. Keywords match whole words only: single-word
+    keywords are looked up in the set of words of the text, so hundreds
+    of them cost one pass over it, and phrases are merged into one
+    trie-shaped pattern per field. Regular expressions are compiled on
+    their own, so their group references keep working.
+  - An entry is dropped if an exclude rule matches it, or if include
+    rules are configured and none matches. The rule responsible is
+    reported, so drops can be counted per rule.
+  - Dropped entries are never formatted; they are marked as read together
+    with the rest of the feed's entries.
+"""
+
+import functools
+import re
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+)
+
+from discord_rss_bot.models import ChannelConfig, FeedConfig, FilterRule
+from discord_rss_bot.storage import DeliveryEntry
+
+# Rule label of entries dropped because no include rule matched them
+NOT_INCLUDED = "not included"
+
+FIELDS = ("title", "summary", "author", "link")
+
+# A keyword made of a single word, matched through the set of words
+WORD = re.compile(r"\w+")
+
+
+def trie_pattern(words: Iterable[str]) -> str:
+    """
+    Builds a regular expression matching any of `words`, shaped as a trie
+    so the regex engine never tries two keywords with a common prefix.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [
+            re.escape(char) + build(child)
+            for char, child in sorted(node.items())
+            if char
+        ]
+        if not branches:
+            return ""
+        body = (
+            branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        )
+        # A word ending here makes the rest optional
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def field_text(entry: DeliveryEntry, field: str) -> str:
+    """Text of an entry field rules are matched against."""
+    if field == "title":
+        return entry.title or ""
+    if field == "summary":
+        return entry.summary or ""
+    if field == "author":
+        return entry.author or ""
+    if field == "link":
+        return entry.link or ""
+    return "\n".join(field_text(entry, name) for name in FIELDS)
+
+
+class FieldRules(NamedTuple):
+    """Compiled rules matched against one field."""
+
+    field: str
+    # Single-word keywords, by lowercase word
+    words: Dict[str, FilterRule]
+    # Other keywords as one pattern, and the keywords by lowercase text
+    phrases: Optional[Pattern[str]]
+    phrase_rules: Dict[str, FilterRule]
+    regexes: List[Tuple[Pattern[str], FilterRule]]
+
+
+class RuleMatcher:  # pylint: disable=too-few-public-methods
+    """Rules of one kind compiled per field."""
+
+    def __init__(self, rules: Sequence[FilterRule]) -> None:
+        self.fields: List[FieldRules] = []
+        for field in ("any", *FIELDS):
+            field_rules = [rule for rule in rules if rule.field == field]
+            if not field_rules:
+                continue
+            keywords = {
+                rule.keyword.lower(): rule
+                for rule in field_rules
+                if rule.keyword
+            }
+            words = {
+                keyword: rule
+                for keyword, rule in keywords.items()
+                if WORD.fullmatch(keyword)
+            }
+            phrase_rules = {
+                keyword: rule
+                for keyword, rule in keywords.items()
+                if keyword not in words
+            }
+            phrases = (
+                re.compile(
+                    rf"(?<!\w)(?:{trie_pattern(phrase_rules)})(?!\w)",
+                    re.IGNORECASE,
+                )
+                if phrase_rules
+                else None
+            )
+            regexes = [
+                (re.compile(rule.regex, re.IGNORECASE), rule)
+                for rule in field_rules
+                if rule.regex
+            ]
+            self.fields.append(
+                FieldRules(field, words, phrases, phrase_rules, regexes)
+            )
+
+    def match(self, entry: DeliveryEntry) -> Optional[FilterRule]:
+        """Returns the first rule matching an entry, if any."""
+        for rules in self.fields:
+            text = field_text(entry, rules.field)
+            if rules.words:
+                for word in WORD.findall(text.lower()):
+                    if word in rules.words:
+                        return rules.words[word]
+            if rules.phrases is not None:
+                found = rules.phrases.search(text)
+                if found is not None:
+                    return rules.phrase_rules[found.group().lower()]
+            for pattern, rule in rules.regexes:
+                if pattern.search(text):
+                    return rule
+        return None
+
+
+class EntryFilter:  # pylint: disable=too-few-public-methods
+    """Compiled include and exclude rules of a feed or channel."""
+
+    def __init__(
+        self, include: Sequence[FilterRule], exclude: Sequence[FilterRule]
+    ) -> None:
+        self.include = RuleMatcher(include) if include else None
+        self.exclude = RuleMatcher(exclude) if exclude else None
+
+    def check(self, entry: DeliveryEntry) -> Optional[str]:
+        """Returns the label of the rule dropping an entry, None to keep it."""
+        if self.exclude is not None:
+            rule = self.exclude.match(entry)
+            if rule is not None:
+                return rule.label
+        if self.include is not None and self.include.match(entry) is None:
+            return NOT_INCLUDED
+        return None
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_filter(
+    include: Tuple[FilterRule, ...], exclude: Tuple[FilterRule, ...]
+) -> Optional[EntryFilter]:
+    """Compiles rules once per distinct rule set; None without rules."""
+    if not include and not exclude:
+        return None
+    return EntryFilter(include, exclude)
+
+
+def rules_filter(config: FeedConfig | ChannelConfig) -> Optional[EntryFilter]:
+    """Returns the compiled rules of a feed or channel."""
+    return compile_filter(tuple(config.include), tuple(config.exclude))
+
+
+def compile_filters(feeds: Iterable[FeedConfig]) -> None:
+    """Compiles the rules of every feed and channel ahead of their use."""
+    for feed in feeds:
+        rules_filter(feed)
+        for channel in feed.channels:
+            rules_filter(channel)
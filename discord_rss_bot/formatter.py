@@ -0,0 +1,103 @@
+"""
+EntryFormatter: Formats RSS entries off the event loop.
+
+Rendering a summary with BeautifulSoup and markdownify is CPU-bound and
+can take long enough on large summaries to stall discord.py heartbeats
+and the healthcheck handlers. This module runs the rendering step in a
+pool of worker processes (or threads) instead:
+
+  - Only the summary string is sent to a worker, and only the rendered
+    Markdown and image URLs come back, so both sides are cheap to pickle.
+  - The embed is assembled on the event loop, which takes microseconds.
+  - Rendered summaries are still looked up in and stored to the
+    `SummaryCache`, which lives in the bot process.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import time
+from concurrent.futures import (
+    BrokenExecutor,
+    Executor,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Optional
+
+import discord
+
+from discord_rss_bot.cache import Rendered, SummaryCache
+from discord_rss_bot.message import (
+    build_embed,
+    render_summary,
+    summary_cache_key,
+)
+from discord_rss_bot.metrics import FORMAT_SECONDS
+from discord_rss_bot.storage import DeliveryEntry
+
+
+class EntryFormatter:
+    """Formats entries into embeds, rendering summaries in a worker pool."""
+
+    def __init__(
+        self,
+        cache: Optional[SummaryCache] = None,
+        workers: int = 0,
+        executor: str = "process",
+    ) -> None:
+        self.cache = cache
+        self.executor = self._make_executor(workers, executor)
+
+    @staticmethod
+    def _make_executor(workers: int, kind: str) -> Optional[Executor]:
+        """Creates the worker pool; none means rendering on the event loop."""
+        if workers < 1:
+            return None
+        logging.info("Formatting entries with %d %s workers", workers, kind)
+        if kind == "thread":
+            return ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="formatter"
+            )
+        # Spawn instead of fork: the bot process runs reader threads
+        return ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    async def format(self, entry: DeliveryEntry) -> discord.Embed:
+        """Formats a single RSS entry into a discord.Embed."""
+        start = time.perf_counter()
+        cache_result = "none"
+        rendered: Rendered = ("", [])
+        if getattr(entry, "summary", None):
+            key = summary_cache_key(entry)
+            cached = self.cache.get(key) if self.cache is not None else None
+            cache_result = "miss" if cached is None else "hit"
+            if cached is None:
+                cached = await self._render(entry.summary)
+                if self.cache is not None:
+                    self.cache.put(key, cached)
+            rendered = cached
+
+        embed = build_embed(entry, rendered)
+        FORMAT_SECONDS.observe(time.perf_counter() - start, cache=cache_result)
+        return embed
+
+    async def _render(self, summary: str) -> Rendered:
+        """Renders a summary in the worker pool, or inline without one."""
+        if self.executor is None:
+            return render_summary(summary)
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(
+                self.executor, render_summary, summary
+            )
+        except BrokenExecutor as error:
+            logging.error("Formatting pool failed, rendering inline: %s", error)
+            return render_summary(summary)
+
+    def shutdown(self) -> None:
+        """Stops the worker pool."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
@@ -2,67 +2,90 @@
 Discord message formatting functions for RSS feed entries.
 
 This module provides functions to:
-- Convert HTML content to Markdown.
-- Extract and handle images in summaries.
-- Format RSS entries into `discord.Embed` messages for posting.
+- Render an HTML summary to Markdown and extract its images, from a
+  single parse.
+- Build the `discord.Embed` of an entry from its rendered summary
+  (see `formatter.EntryFormatter`).
+- Pack several embeds into as few messages as Discord allows.
+- Summarize the overflow of a large backlog in a single digest embed.
+
+BeautifulSoup and markdownify are imported on first use, so that they do
+not slow down the bot's startup.
 """
 
-import logging
+import hashlib
+from typing import TYPE_CHECKING, List, Sequence
 
-from reader.types import Entry
-from markdownify import markdownify as md
-from bs4 import BeautifulSoup
 import discord
 
+from discord_rss_bot.cache import Rendered
+from discord_rss_bot.storage import DeliveryEntry
 
-def truncate_html(html: str, length: int = 3000):
-    """Safely truncates provided HTML string."""
-    if len(html) <= length:
-        return html
+# Bump whenever rendering changes, to invalidate cached summaries
+FORMATTER_VERSION = 1
 
-    soup = BeautifulSoup(html[:length], "html.parser")
-    # Append a truncation indicator inside a <strong> tag
-    truncated_tag = soup.new_tag("strong")
-    truncated_tag.string = " ... (truncated)"
-    soup.append(truncated_tag)
-    return str(soup)
+# Discord limits for the embeds of a single message
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+MAX_EMBED_DESCRIPTION_CHARS = 4096
+# Characters of a summary rendered into an embed
+SUMMARY_RENDER_CHARS = 3000
 
+if TYPE_CHECKING:
+    from bs4 import BeautifulSoup
+
+
+def _parse_html(html: str) -> "BeautifulSoup":
+    """Parses an HTML string with the built-in parser."""
+    # pylint: disable-next=import-outside-toplevel
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(html, "html.parser")
+
+
+def render_summary(html: str, length: int = SUMMARY_RENDER_CHARS) -> Rendered:
+    """
+    Renders an HTML summary into quoted Markdown and its image URLs.
+    The HTML is parsed only once and the same tree is used for
+    truncation, images and Markdown.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from markdownify import MarkdownConverter
+
+    soup = _parse_html(html[:length])
+    if len(html) > length:
+        # Append a truncation indicator inside a <strong> tag
+        truncated_tag = soup.new_tag("strong")
+        truncated_tag.string = " ... (truncated)"
+        soup.append(truncated_tag)
 
-def extract_images_from_html(html: str):
-    """Extracts image URLs from an HTML string."""
-    soup = BeautifulSoup(html, features="html.parser")
     images = [
         img.attrs["src"]  # pyright: ignore[reportAttributeAccessIssue]
         for img in soup.find_all("img")
         if "src" in img.attrs  # pyright: ignore[reportAttributeAccessIssue]
     ]
-    return images
-
-
-def convert_html_to_markdown(html: str) -> str:
-    """Converts an HTML string into Markdown format."""
-    markdown_text = md(html, heading_style="ATX").strip()
+    markdown_text = (
+        MarkdownConverter(heading_style="ATX").convert_soup(soup).strip()
+    )
     formatted_text = "\n".join(
         f"> {line}" for line in markdown_text.splitlines() if line.strip()
     )
-    return formatted_text
+    return formatted_text, images
+
 
+def summary_cache_key(entry: DeliveryEntry) -> str:
+    """Content hash identifying an entry's rendered summary."""
+    digest = hashlib.sha256()
+    for part in (entry.title, entry.link, entry.summary, FORMATTER_VERSION):
+        digest.update(str(part).encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
 
-def format_entry_for_discord(entry: Entry) -> discord.Embed:
-    """Formats a single RSS entry into a discord.Embed."""
-    logging.debug("Formatting entry")
 
+def build_embed(entry: DeliveryEntry, rendered: Rendered) -> discord.Embed:
+    """Builds the discord.Embed of an entry from its rendered summary."""
+    summary_md, image_urls = rendered
     title = f"📰 {entry.title}"
-    summary_md = ""
-    image_urls = []
-    if hasattr(entry, "summary") and entry.summary:
-        truncated_summary = truncate_html(entry.summary)
-        image_urls = extract_images_from_html(
-            truncated_summary
-        )  # Extract images first
-        summary_md = convert_html_to_markdown(
-            truncated_summary
-        )  # Convert to Markdown
 
     embed = discord.Embed(
         title=title, url=entry.link, color=discord.Color.blue()
@@ -80,3 +103,52 @@ def format_entry_for_discord(entry: Entry) -> discord.Embed:
     if image_urls:
         embed.set_image(url=image_urls[0])
     return embed
+
+
+def pack_embeds(embeds: Sequence[discord.Embed]) -> List[List[int]]:
+    """
+    Groups consecutive embeds into messages within Discord's per-message
+    limits, keeping their order. Returns the embed indexes of each message.
+    """
+    batches: List[List[int]] = []
+    size = 0
+    for index, embed in enumerate(embeds):
+        length = len(embed)
+        if (
+            batches
+            and len(batches[-1]) < MAX_EMBEDS_PER_MESSAGE
+            and size + length <= MAX_EMBED_CHARS_PER_MESSAGE
+        ):
+            batches[-1].append(index)
+            size += length
+        else:
+            batches.append([index])
+            size = length
+    return batches
+
+
+def build_digest_embed(
+    entries: Sequence[DeliveryEntry], total: int, feed_url: str
+) -> discord.Embed:
+    """
+    Builds a single embed listing `entries` (newest first) out of `total`
+    entries of a feed that are not posted individually.
+    """
+    embed = discord.Embed(
+        title=f"🗞️ {total} more entries", color=discord.Color.blue()
+    )
+    lines: List[str] = []
+    size = 0
+    for entry in entries:
+        title = entry.title or entry.link or entry.id
+        line = f"• [{title}]({entry.link})" if entry.link else f"• {title}"
+        # Keep room for the closing line
+        if size + len(line) + 1 > MAX_EMBED_DESCRIPTION_CHARS - 64:
+            break
+        lines.append(line)
+        size += len(line) + 1
+    if total > len(lines):
+        lines.append(f"_… and {total - len(lines)} older entries_")
+    embed.description = "\n".join(lines)
+    embed.set_footer(text=f"🔗 {feed_url} 🔗")
+    return embed
@@ -0,0 +1,383 @@
+"""
+Runtime metrics for the bot.
+
+This module provides:
+- Lightweight counters, gauges and histograms, exposed in the Prometheus
+  text format on the healthcheck server's `/metrics` endpoint.
+- The metrics recorded around the hot paths: reader tasks, feed updates,
+  formatting, Discord sends, feed checks and database maintenance.
+- Control over the cardinality of per-feed labels.
+- Time-to-ready instrumentation of the startup phases.
+- Event-loop lag monitoring, to detect blocking work on the loop that
+  would stall discord.py heartbeats and the healthcheck handlers.
+"""
+
+import asyncio
+import bisect
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from discord_rss_bot.utils import cancel_task
+
+PREFIX = "discord_rss_bot_"
+
+# Latency buckets in seconds, from sub-millisecond queries to slow fetches
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    """Formats label pairs as `{name="value",...}`."""
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{_escape(value)}"' for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+def _escape(value: str) -> str:
+    """Escapes a label value for the text exposition format."""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\n", "\\n")
+        .replace('"', '\\"')
+    )
+
+
+class Metric:
+    """Base class of a metric family with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional["Registry"] = None,
+    ) -> None:
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        """Orders label values by the metric's label names."""
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> List[str]:
+        """Returns the exposition lines of the metric's samples."""
+        raise NotImplementedError
+
+    def expose(self) -> str:
+        """Returns the metric family in the text exposition format."""
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """A monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Increments the counter of the given labels."""
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+                for key, value in self.values.items()
+            ]
+
+
+class Gauge(Counter):
+    """A value that can go up and down per label set."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        """Sets the gauge of the given labels."""
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = value
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets per label set."""
+
+    kind = "histogram"
+
+    def __init__(
+        self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: count per bucket (plus +Inf), sum
+        self.values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Records one observation."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self.values.setdefault(
+                key, ([0] * (len(self.buckets) + 1), [0.0])
+            )
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observes the duration of the `with` block, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        lines = []
+        names = self.labelnames + ("le",)
+        with self._lock:
+            for key, (counts, total) in self.values.items():
+                cumulative = 0
+                bounds = [str(bound) for bound in self.buckets] + ["+Inf"]
+                for bound, count in zip(bounds, counts):
+                    cumulative += count
+                    labels = _format_labels(names, key + (bound,))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labelnames, key)
+                lines.append(f"{self.name}_sum{labels} {total[0]}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Collection of metrics exposed together."""
+
+    def __init__(self) -> None:
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> None:
+        """Adds a metric to the registry."""
+        self.metrics.append(metric)
+
+    def expose(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        return "\n".join(metric.expose() for metric in self.metrics) + "\n"
+
+
+class FeedLabels:
+    """
+    Maps feed URLs to label values with bounded cardinality. Disabled, all
+    feeds share one label value; enabled, the first `max_values` feeds get
+    their own value and the rest are reported as "other".
+    """
+
+    def __init__(self, enabled: bool = False, max_values: int = 50) -> None:
+        self.enabled = enabled
+        self.max_values = max_values
+        self.seen: Set[str] = set()
+
+    def configure(self, enabled: bool, max_values: int) -> None:
+        """Changes the labelling policy."""
+        self.enabled = enabled
+        self.max_values = max_values
+
+    def __call__(self, feed_url: str) -> str:
+        if not self.enabled:
+            return "all"
+        if feed_url in self.seen:
+            return feed_url
+        if len(self.seen) < self.max_values:
+            self.seen.add(feed_url)
+            return feed_url
+        return "other"
+
+
+REGISTRY = Registry()
+FEED_LABELS = FeedLabels()
+
+READER_TASK_SECONDS = Histogram(
+    "reader_task_seconds",
+    "Duration of blocking reader tasks, including time queued.",
+    ["lane", "task"],
+)
+READER_QUEUE_DEPTH = Gauge(
+    "reader_queue_depth", "Reader tasks waiting for a thread.", ["lane"]
+)
+READER_QUEUE_WAIT_SECONDS = Gauge(
+    "reader_queue_wait_seconds_max",
+    "Longest time a reader task waited for a thread.",
+    ["lane"],
+)
+FEED_UPDATES = Counter(
+    "feed_updates_total", "Feed update results.", ["feed", "result"]
+)
+CHECK_SECONDS = Histogram(
+    "check_feeds_seconds",
+    "Duration of a full feed check.",
+    buckets=(1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0),
+)
+FORMAT_SECONDS = Histogram(
+    "format_seconds", "Duration of formatting one entry.", ["cache"]
+)
+FORMAT_CACHE = Gauge(
+    "format_cache", "Formatted summary cache counters.", ["counter"]
+)
+SEND_SECONDS = Histogram(
+    "send_seconds", "Duration of one Discord send request.", ["result"]
+)
+SEND_QUEUE_DEPTH = Gauge(
+    "send_queue_depth", "Messages waiting in the send scheduler."
+)
+SEND_RATE_LIMITED = Counter(
+    "send_rate_limited_total", "Discord sends answered with a rate limit."
+)
+ENTRIES_DELIVERED = Counter(
+    "entries_delivered_total", "Entries delivered to Discord.", ["feed"]
+)
+ENTRIES_FAILED = Counter(
+    "entries_failed_total", "Entries that could not be delivered.", ["feed"]
+)
+ENTRIES_DEAD_LETTERED = Counter(
+    "entries_dead_lettered_total",
+    "Entries given up without being delivered, by reason.",
+    ["feed", "reason"],
+)
+ENTRIES_DUPLICATE = Counter(
+    "entries_duplicate_total",
+    "Entries not posted because their link was already posted to the channel.",
+    ["feed"],
+)
+ENTRIES_FILTERED = Counter(
+    "entries_filtered_total",
+    "Entries not posted because of an include or exclude rule.",
+    ["feed", "rule"],
+)
+ENTRIES_SKIPPED = Counter(
+    "entries_skipped_total",
+    "Entries marked as read without being posted by a backlog policy.",
+    ["feed"],
+)
+ENTRIES_PRUNED = Counter(
+    "entries_pruned_total",
+    "Read entries deleted from the database by retention limits.",
+    ["feed"],
+)
+MAINTENANCE_SECONDS = Histogram(
+    "maintenance_seconds", "Duration of database maintenance steps.", ["step"]
+)
+DATABASE_BYTES = Gauge(
+    "database_bytes", "Size of the reader database files.", ["part"]
+)
+LOOP_LAG_SECONDS = Gauge("event_loop_lag_seconds", "Event-loop lag.", ["stat"])
+STARTUP_SECONDS = Gauge(
+    "startup_seconds",
+    "Seconds from process start until each startup phase completed.",
+    ["phase"],
+)
+
+
+class StartupTimer:  # pylint: disable=too-few-public-methods
+    """
+    Records when each startup phase completes, relative to the moment
+    this module was first imported, early in the process startup.
+    """
+
+    def __init__(self) -> None:
+        self.started = time.monotonic()
+        self.phases: Dict[str, float] = {}
+
+    def mark(self, phase: str) -> None:
+        """Records the completion of a phase, the first time only."""
+        if phase in self.phases:
+            return
+        elapsed = time.monotonic() - self.started
+        self.phases[phase] = elapsed
+        STARTUP_SECONDS.set(elapsed, phase=phase)
+        logging.info("Startup: %s after %.2f seconds", phase, elapsed)
+
+
+STARTUP = StartupTimer()
+
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how much later than requested a short sleep
+    wakes up. Anything blocking the loop shows up as lag.
+    """
+
+    def __init__(self, interval: float = 0.25) -> None:
+        self.interval = interval
+        self.last = 0.0
+        self.max = 0.0
+        self.total = 0.0
+        self.samples = 0
+        self._task: Optional["asyncio.Task[None]"] = None
+
+    def start(self) -> None:
+        """Starts sampling in the background."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        """Samples the loop lag until stopped."""
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.record(max(0.0, time.monotonic() - expected))
+
+    def record(self, lag: float) -> None:
+        """Records one lag sample, in seconds."""
+        self.last = lag
+        self.max = max(self.max, lag)
+        self.total += lag
+        self.samples += 1
+
+    def stats(self) -> Dict[str, float]:
+        """Returns the last, maximum and average lag in seconds."""
+        return {
+            "last": self.last,
+            "max": self.max,
+            "avg": self.total / self.samples if self.samples else 0.0,
+        }
+
+    async def stop(self) -> None:
+        """Stops sampling."""
+        await cancel_task(self._task)
+        self._task = None
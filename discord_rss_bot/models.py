@@ -7,26 +7,339 @@ including RSS feed details and database settings.
 Uses Pydantic for data validation and structured parsing.
 """
 
-from typing import List, Optional
-from pydantic import BaseModel, Field
+import re
+from typing import Any, List, Literal, Optional, Set
+from pydantic import BaseModel, ConfigDict, Field, model_validator
+
+# Discord webhook URL, capturing the webhook ID
+WEBHOOK_URL = re.compile(
+    r"https://(?:\w+\.)?discord(?:app)?\.com/api(?:/v\d+)?/webhooks/"
+    r"(\d{17,20})/[\w.-]{60,}"
+)
+
+
+class FilterRule(BaseModel):
+    """
+    An include or exclude rule: a keyword or a regular expression, matched
+    case-insensitively. A plain string is read as a keyword.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    keyword: Optional[str] = Field(None, min_length=1)
+    regex: Optional[str] = Field(None, min_length=1)
+    field: Literal["any", "title", "summary", "author", "link"] = Field(
+        "any", description="Entry field the rule is matched against."
+    )
+    name: Optional[str] = Field(
+        None, description="Label of the rule in metrics (defaults to it)."
+    )
+
+    @model_validator(mode="before")
+    @classmethod
+    def from_keyword(cls, value: Any) -> Any:
+        """Reads a plain string as a keyword rule."""
+        return {"keyword": value} if isinstance(value, str) else value
+
+    @model_validator(mode="after")
+    def check_pattern(self) -> "FilterRule":
+        """Ensures the rule has exactly one valid pattern."""
+        if (self.keyword is None) == (self.regex is None):
+            raise ValueError("a filter rule needs either keyword or regex")
+        if self.regex is not None:
+            try:
+                re.compile(f"(?:{self.regex})")
+            except re.error as e:
+                raise ValueError(f"invalid regex {self.regex!r}: {e}") from e
+        return self
+
+    @property
+    def label(self) -> str:
+        """Name of the rule in metrics and logs."""
+        return self.name or self.keyword or self.regex or ""
+
+
+def webhook_destination(webhook_url: str) -> str:
+    """Key of a webhook in the outbox and the seen-set."""
+    match = WEBHOOK_URL.fullmatch(webhook_url)
+    if match is None:
+        # The URL holds the webhook's token, keep it out of the logs
+        raise ValueError("invalid Discord webhook URL")
+    return f"webhook:{match.group(1)}"
+
+
+class ChannelConfig(BaseModel):
+    """A Discord channel or webhook a feed is posted to."""
+
+    channel_id: Optional[int | str] = Field(
+        None, description="The Discord channel ID for posting updates."
+    )
+    webhook_url: Optional[str] = Field(
+        None, description="A Discord webhook URL, instead of a channel ID."
+    )
+    include: List[FilterRule] = Field(
+        default_factory=list,
+        description="Only post entries matching one of these rules.",
+    )
+    exclude: List[FilterRule] = Field(
+        default_factory=list,
+        description="Never post entries matching one of these rules.",
+    )
+
+    @model_validator(mode="after")
+    def check_destination(self) -> "ChannelConfig":
+        """Ensures exactly one of channel_id and webhook_url is set."""
+        if (self.channel_id is None) == (self.webhook_url is None):
+            raise ValueError("either channel_id or webhook_url is required")
+        if self.webhook_url is not None:
+            webhook_destination(self.webhook_url)
+        return self
+
+    @property
+    def destination(self) -> str:
+        """Key of the channel or webhook in the outbox and the seen-set."""
+        if self.webhook_url is not None:
+            return webhook_destination(self.webhook_url)
+        return str(self.channel_id)
 
 
 class FeedConfig(BaseModel):
     """Represents the configuration for a single RSS feed."""
 
     feed_url: str = Field(..., description="The URL of the RSS feed.")
-    channel_id: int | str = Field(
-        ..., description="The Discord channel ID for posting updates."
+    channel_id: Optional[int | str] = Field(
+        None, description="The Discord channel ID for posting updates."
+    )
+    webhook_url: Optional[str] = Field(
+        None,
+        description="A Discord webhook URL the feed is posted to, next to "
+        "or instead of channel_id.",
+    )
+    channels: List[ChannelConfig] = Field(
+        default_factory=list,
+        description="Further channels the feed is posted to, with filters.",
+    )
+    include: List[FilterRule] = Field(
+        default_factory=list,
+        description="Only post entries matching one of these rules.",
+    )
+    exclude: List[FilterRule] = Field(
+        default_factory=list,
+        description="Never post entries matching one of these rules.",
     )
     update_interval: Optional[int] = Field(
         None, description="Update interval in minutes (if set)."
     )
+    min_update_interval: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Shortest adaptive interval in minutes "
+        "(defaults to update_interval).",
+    )
+    max_update_interval: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Longest adaptive interval in minutes "
+        "(defaults to 4 times update_interval).",
+    )
+    batch_embeds: bool = Field(
+        False,
+        description="Pack up to 10 entries into a single Discord message.",
+    )
+    max_entries_per_tick: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Most entries posted per check; larger backlogs are "
+        "handled according to backlog_policy.",
+    )
+    backlog_policy: Literal["skip_old", "digest", "drain_slowly"] = Field(
+        "drain_slowly",
+        description="What happens to entries beyond max_entries_per_tick: "
+        "skipped, summarized in one digest message, or posted on later checks.",
+    )
+    retention_days: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Days read entries of the feed are kept "
+        "(defaults to the global retention_days).",
+    )
+    retention_max_entries: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Most entries of the feed kept "
+        "(defaults to the global retention_max_entries).",
+    )
+
+    @model_validator(mode="after")
+    def check_channels(self) -> "FeedConfig":
+        """
+        Ensures the feed is posted to at least one channel or webhook, and
+        to each of them only once.
+        """
+        if self.channel_id is None and self.webhook_url is None:
+            if not self.channels:
+                raise ValueError(
+                    "channel_id, webhook_url or channels is required"
+                )
+        if self.webhook_url is not None:
+            webhook_destination(self.webhook_url)
+        seen: Set[str] = set()
+        for target in self.targets:
+            if target.destination in seen:
+                raise ValueError(
+                    f"destination {target.destination} is listed more than once"
+                )
+            seen.add(target.destination)
+        return self
+
+    @property
+    def targets(self) -> List[ChannelConfig]:
+        """Every channel and webhook the feed is posted to."""
+        targets = list(self.channels)
+        if self.webhook_url is not None:
+            targets.insert(0, ChannelConfig(webhook_url=self.webhook_url))
+        if self.channel_id is not None:
+            targets.insert(0, ChannelConfig(channel_id=self.channel_id))
+        return targets
 
 
 class ConfigFile(BaseModel):
     """Represents the main configuration file for the bot."""
 
     db_path: str = Field(..., description="Path to the SQLite database file.")
+    reader_workers: int = Field(
+        4, ge=1, description="Number of threads for read-only reader queries."
+    )
+    update_workers: int = Field(
+        4, ge=1, description="Number of feeds retrieved concurrently."
+    )
+    update_timeout: float = Field(
+        30.0,
+        gt=0,
+        description="HTTP timeout in seconds for each feed request.",
+    )
+    delivery_workers: int = Field(
+        4, ge=1, description="Number of feeds delivered concurrently."
+    )
+    delivery_queue_size: int = Field(
+        100, ge=1, description="Maximum number of feeds waiting for delivery."
+    )
+    send_max_in_flight: int = Field(
+        8, ge=1, description="Maximum concurrent Discord send requests."
+    )
+    max_ratelimit_timeout: float = Field(
+        30.0,
+        ge=30.0,
+        description=(
+            "Longest rate limit in seconds discord.py waits out itself;"
+            " longer ones are retried by the send scheduler."
+        ),
+    )
+    outbox_max_attempts: int = Field(
+        10,
+        ge=1,
+        description="Delivery attempts of a message before it is given up.",
+    )
+    webhook_connections: int = Field(
+        20,
+        ge=1,
+        description="Connections of the HTTP session shared by webhooks.",
+    )
+    webhook_connections_per_host: int = Field(
+        10,
+        ge=1,
+        description="Connections of the webhook session per host.",
+    )
+    format_cache_bytes: int = Field(
+        8 * 1024 * 1024,
+        ge=0,
+        description="Approximate memory budget of the formatted summary cache.",
+    )
+    format_cache_persist: bool = Field(
+        False,
+        description="Keep formatted summaries on disk next to the database.",
+    )
+    format_workers: int = Field(
+        0,
+        ge=0,
+        description="Workers rendering summaries (0 renders on the event loop).",
+    )
+    format_executor: Literal["process", "thread"] = Field(
+        "process", description="Kind of worker pool used for formatting."
+    )
+    unread_entries_limit: Optional[int] = Field(
+        200,
+        ge=1,
+        description=(
+            "Maximum unread entries per feed loaded at once, the oldest"
+            " first; null loads them all."
+        ),
+    )
+    startup_window: Optional[float] = Field(
+        None,
+        ge=0,
+        description="Seconds over which the first update of due feeds is "
+        "spread at startup, instead of updating all feeds before connecting.",
+    )
+    config_reload_interval: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Seconds between checks of the config file for changes "
+        "(SIGHUP always reloads it).",
+    )
+    shard_index: int = Field(
+        0, ge=0, description="Index of this replica's shard of the feeds."
+    )
+    shard_count: int = Field(
+        1, ge=1, description="Number of shards the feeds are split into."
+    )
+    dedup_window: Optional[float] = Field(
+        7.0,
+        gt=0,
+        description="Days a posted link is remembered per channel, so the "
+        "same story from another feed is not posted again (null disables).",
+    )
+    retention_days: Optional[float] = Field(
+        None,
+        gt=0,
+        description="Days read entries are kept (null keeps them forever).",
+    )
+    retention_max_entries: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Most entries kept per feed; older read entries are "
+        "deleted (null keeps them all).",
+    )
+    maintenance_interval: Optional[float] = Field(
+        3600.0,
+        gt=0,
+        description="Seconds between database maintenance runs: pruning, "
+        "vacuum, ANALYZE and WAL checkpoint (null disables).",
+    )
+    metrics_feed_labels: bool = Field(
+        False, description="Label per-feed metrics with the feed URL."
+    )
+    metrics_max_feed_labels: int = Field(
+        50,
+        ge=1,
+        description="Feeds labelled individually, the rest share 'other'.",
+    )
     feeds: List[FeedConfig] = Field(
         ..., description="List of configured RSS feeds."
     )
+
+    @property
+    def needs_gateway(self) -> bool:
+        """Whether any feed posts to a channel rather than a webhook."""
+        return any(
+            target.channel_id is not None
+            for feed in self.feeds
+            for target in feed.targets
+        )
+
+    @model_validator(mode="after")
+    def check_shard(self) -> "ConfigFile":
+        """Ensures the shard index is within the shard count."""
+        if self.shard_index >= self.shard_count:
+            raise ValueError("shard_index must be lower than shard_count")
+        return self
@@ -0,0 +1,175 @@
+"""
+Outbox: Durable queue of formatted Discord messages.
+
+Formatted messages are stored in an `outbox` table of the reader database
+before they are sent, in the same transaction that marks their entries as
+read. Each message is removed from the outbox once Discord accepted it:
+
+  - A crash or restart never loses entries and never posts a whole batch
+    again: pending messages are sent from the outbox, without fetching
+    or formatting their entries again.
+  - A failed send stays in the outbox and is retried with exponential
+    backoff. Messages that failed `outbox_max_attempts` times, that
+    Discord rejected (a 4xx answer other than 429), or whose channel is no
+    longer configured are moved to a `dead_letters` table instead, so
+    they neither pile up nor hold back the next checks.
+  - Each message is acknowledged on its own, so at most the messages
+    in flight during a crash can be posted twice.
+  - Messages whose stories were already posted to the channel are
+    dropped in the same transaction (see `dedup.SeenIndex`).
+  - The messages of all channels a feed is posted to are stored at once,
+    so every channel keeps its own delivery state: a failing channel is
+    retried on its own and never holds back or duplicates the others.
+"""
+
+import json
+import time
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence
+
+import discord
+
+from discord_rss_bot import storage
+from discord_rss_bot.rss import ReaderTaskExecutor
+from discord_rss_bot.storage import DeliveryEntry
+
+# Delay before the first retry of a failed message, doubled on every retry
+RETRY_BASE_DELAY = 30.0
+RETRY_MAX_DELAY = 3600.0
+# Messages loaded from the outbox at once
+DRAIN_PAGE_SIZE = 500
+
+
+class PendingMessage(NamedTuple):
+    """A formatted message for one channel, not stored yet."""
+
+    channel_id: str
+    entries: Sequence[DeliveryEntry]
+    embeds: Sequence[discord.Embed]
+    # Story keys recorded for the channel, see `dedup.SeenIndex`
+    seen: Sequence[bytes] = ()
+
+
+class OutboxMessage(NamedTuple):
+    """A message stored in the outbox."""
+
+    id: int
+    feed_url: str
+    channel_id: str
+    entry_ids: List[str]
+    embeds: List[discord.Embed]
+    attempts: int = 0
+
+
+def retry_delay(attempts: int) -> float:
+    """Seconds to wait before retrying a message that failed `attempts` times."""
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** max(0, attempts - 1))
+
+
+class Outbox:
+    """Stores, loads and acknowledges outbox messages on the writer thread."""
+
+    def __init__(self, executor: ReaderTaskExecutor, max_attempts: int) -> None:
+        self.executor = executor
+        self.max_attempts = max_attempts
+
+    async def _call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Runs a storage function on the writer thread."""
+        return await self.executor.run_db(func, *args)
+
+    async def enqueue(
+        self,
+        feed_url: str,
+        messages: List[PendingMessage],
+        read: Sequence[DeliveryEntry],
+        seen_after: float = 0.0,
+    ) -> Optional[List[OutboxMessage]]:
+        """
+        Stores messages and marks the `read` entries as read. Messages
+        whose stories were all posted to their channel since `seen_after`
+        are dropped. Returns the stored messages, or None if storing failed
+        and the entries stay unread.
+        """
+        rows = [
+            (
+                feed_url,
+                message.channel_id,
+                json.dumps([entry.id for entry in message.entries]),
+                json.dumps([embed.to_dict() for embed in message.embeds]),
+            )
+            for message in messages
+        ]
+        ids = await self._call(
+            storage.enqueue_messages,
+            rows,
+            [message.seen for message in messages],
+            [(entry.feed_url, entry.id) for entry in read],
+            time.time(),
+            seen_after,
+        )
+        if ids is None or len(ids) != len(messages):
+            return None
+        return [
+            OutboxMessage(
+                message_id,
+                feed_url,
+                message.channel_id,
+                [entry.id for entry in message.entries],
+                list(message.embeds),
+            )
+            for message_id, message in zip(ids, messages)
+            if message_id is not None
+        ]
+
+    async def ack(self, message: OutboxMessage) -> None:
+        """Removes a delivered message."""
+        await self._call(storage.ack_message, message.id)
+
+    async def retry(self, message: OutboxMessage) -> Optional[float]:
+        """
+        Schedules the next attempt of a failed message and returns its
+        delay, or gives the message up and returns None once it failed
+        `max_attempts` times.
+        """
+        attempts = message.attempts + 1
+        if attempts >= self.max_attempts:
+            await self.dead_letter(message, "too many attempts")
+            return None
+        delay = retry_delay(attempts)
+        await self._call(
+            storage.retry_message, message.id, attempts, time.time() + delay
+        )
+        return delay
+
+    async def dead_letter(self, message: OutboxMessage, reason: str) -> None:
+        """Gives up an undeliverable message, keeping it for inspection."""
+        await self._call(
+            storage.dead_letter_message,
+            message.id,
+            message.attempts + 1,
+            reason,
+            time.time(),
+        )
+
+    async def due(self, limit: int = DRAIN_PAGE_SIZE) -> List[OutboxMessage]:
+        """Loads the oldest messages due for a delivery attempt."""
+        rows = await self._call(storage.due_messages, time.time(), limit)
+        return [
+            OutboxMessage(
+                message_id,
+                feed_url,
+                channel_id,
+                json.loads(entry_ids),
+                [
+                    discord.Embed.from_dict(embed)
+                    for embed in json.loads(embeds)
+                ],
+                attempts,
+            )
+            for message_id, feed_url, channel_id, entry_ids, embeds, attempts in (
+                rows or []
+            )
+        ]
+
+    async def next_attempt(self) -> Optional[float]:
+        """Returns when the next message is due, if the outbox is not empty."""
+        return await self._call(storage.next_outbox_attempt)
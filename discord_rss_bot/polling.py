@@ -0,0 +1,148 @@
+"""
+PollScheduler: Adaptive per-feed polling.
+
+Instead of checking every feed on a fixed tick, the bot sleeps until the
+next feed is due and only updates the feeds that are due. This module
+decides when that is and how often each feed is polled:
+
+  - Feeds are kept in a min-heap keyed on the time `reader` will next
+    consider them due (`Feed.update_after`), so the bot wakes exactly
+    when the earliest feed is due.
+  - Each feed's interval follows its observed publish rate: feeds that
+    keep publishing are polled about once per expected new entry, while
+    feeds that don't change back off gradually.
+  - Feeds that fail to update back off exponentially.
+  - Intervals stay within the bounds of the feed's `FeedConfig`, and are
+    applied through the `.reader.update` tag, so `reader` keeps honouring
+    them (including `Retry-After` responses) across restarts.
+"""
+
+import heapq
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from reader.types import UpdateResult
+
+from discord_rss_bot.models import FeedConfig
+from discord_rss_bot.reload import group_feeds
+
+# reader's interval when a feed has no update_interval
+DEFAULT_INTERVAL = 60
+# Interval growth after an update without new entries
+UNCHANGED_BACKOFF = 1.5
+# Weight of the latest publish gap in the moving average
+GAP_SMOOTHING = 0.5
+
+
+class FeedSchedule:  # pylint: disable=too-few-public-methods
+    """Polling state of a single feed; intervals are in minutes."""
+
+    def __init__(self, feeds: List[FeedConfig]) -> None:
+        # The most eager configuration wins if a feed is listed twice
+        self.base = min(
+            feed.update_interval or DEFAULT_INTERVAL for feed in feeds
+        )
+        self.min_interval = min(
+            feed.min_update_interval or self.base for feed in feeds
+        )
+        self.max_interval = max(
+            self.min_interval,
+            min(feed.max_update_interval or self.base * 4 for feed in feeds),
+        )
+        self.interval = float(self.base)
+        self.failures = 0
+        self.last_new: Optional[float] = None
+        self.publish_gap: Optional[float] = None
+
+    def record(self, result: UpdateResult, now: float) -> None:
+        """Adapts the interval to the outcome of an update."""
+        value = result.value
+        if isinstance(value, Exception):
+            self.failures += 1
+            self.interval = self.base * 2**self.failures
+        elif value is None or not value.new:
+            self.failures = 0
+            self.interval *= UNCHANGED_BACKOFF
+        else:
+            self.failures = 0
+            if self.last_new is not None:
+                gap = (now - self.last_new) / 60 / value.new
+                self.publish_gap = (
+                    gap
+                    if self.publish_gap is None
+                    else GAP_SMOOTHING * gap
+                    + (1 - GAP_SMOOTHING) * self.publish_gap
+                )
+                self.interval = self.publish_gap
+            self.last_new = now
+        self.interval = max(
+            self.min_interval, min(self.max_interval, self.interval)
+        )
+
+
+class PollScheduler:
+    """Tracks when each feed is due and adapts polling intervals."""
+
+    def __init__(self, feeds: Iterable[FeedConfig]) -> None:
+        self.schedules: Dict[str, FeedSchedule] = {}
+        self.heap: List[Tuple[float, str]] = []
+        self.reconfigure(feeds)
+
+    def reconfigure(
+        self, feeds: Iterable[FeedConfig], keep: Iterable[str] = ()
+    ) -> None:
+        """
+        Replaces the configured feeds. The adapted state of the feeds in
+        `keep` is preserved, all other feeds start from their configuration.
+        """
+        configs = group_feeds(feeds)
+        kept = set(keep)
+        self.schedules = {
+            url: (
+                self.schedules[url]
+                if url in kept and url in self.schedules
+                else FeedSchedule(feeds)
+            )
+            for url, feeds in configs.items()
+        }
+
+    def record(self, results: Iterable[UpdateResult]) -> Dict[str, int]:
+        """
+        Adapts intervals to a round of updates and returns the feeds whose
+        interval changed, with the new interval in minutes.
+        """
+        now = time.time()
+        changed = {}
+        for result in results:
+            schedule = self.schedules.get(result.url)
+            if schedule is None:
+                continue
+            before = round(schedule.interval)
+            schedule.record(result, now)
+            if round(schedule.interval) != before:
+                changed[result.url] = round(schedule.interval)
+        if changed:
+            logging.debug("Adapted polling intervals: %s", changed)
+        return changed
+
+    def load(self, update_after: Dict[str, Optional[datetime]]) -> None:
+        """Rebuilds the heap from the feeds' next update times."""
+        self.heap = [
+            (due.timestamp() if due is not None else 0.0, url)
+            for url, due in update_after.items()
+            if url in self.schedules
+        ]
+        heapq.heapify(self.heap)
+
+    def next_due(self) -> Optional[float]:
+        """Returns the timestamp of the earliest due feed, if any."""
+        return self.heap[0][0] if self.heap else None
+
+    def delay(self, idle: float) -> float:
+        """Seconds until the earliest feed is due, or `idle` without feeds."""
+        due = self.next_due()
+        if due is None:
+            return idle
+        return max(0.0, due - time.time())
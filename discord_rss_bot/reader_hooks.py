@@ -0,0 +1,39 @@
+"""
+Reader hooks: the private parts of `reader` this package relies on.
+
+`reader` has no public hook for the entries a feed lists on each parse,
+which retention needs to know which entries must not be deleted yet. This
+module is the only one touching reader's parser, so a reader upgrade that
+changes it breaks in one place:
+
+  - `Parser.process_entry_pairs` sees every entry of each parse, as
+    `EntryPair`s of the parsed entry and the stored one.
+"""
+
+from typing import Callable, Iterable, List, Optional
+
+from reader import Reader
+from reader._parser import EntryPair
+
+# Called with a feed's URL and the ids of the entries it lists
+ListingCallback = Callable[[str, List[str]], None]
+
+
+def on_feed_listing(rss_reader: Reader, callback: ListingCallback) -> None:
+    """
+    Calls `callback` after every parse of a feed with the ids of all the
+    entries the feed lists, new, changed or not. The callback runs on the
+    thread that updates the feed.
+    """
+    # pylint: disable-next=protected-access
+    parser = rss_reader._parser
+    process_entry_pairs = parser.process_entry_pairs
+
+    def record(
+        url: str, mime_type: Optional[str], pairs: Iterable[EntryPair]
+    ) -> Iterable[EntryPair]:
+        pairs = list(process_entry_pairs(url, mime_type, pairs))
+        callback(url, [new.id for new, _ in pairs])
+        return pairs
+
+    parser.process_entry_pairs = record
@@ -0,0 +1,153 @@
+"""
+Configuration hot-reload.
+
+Applying a configuration change used to require a restart, which re-added
+every feed and refreshed all of them at once. This module reloads the
+configuration file while the bot keeps running:
+
+  - A reload is triggered by SIGHUP, or by a change of the file's
+    modification time when `config_reload_interval` is set.
+  - The new configuration is diffed against the current one by feed URL,
+    so only added, removed and changed feeds are touched.
+  - An invalid file is logged and ignored; the bot keeps the current
+    configuration.
+"""
+
+import asyncio
+import logging
+import os
+import signal
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+)
+
+import yaml
+from pydantic import ValidationError
+
+from discord_rss_bot.models import ConfigFile, FeedConfig
+from discord_rss_bot.utils import cancel_task, read_config
+
+
+class FeedChanges(NamedTuple):
+    """Feed URLs that differ between two configurations."""
+
+    added: Set[str]
+    removed: Set[str]
+    changed: Set[str]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def group_feeds(feeds: Iterable[FeedConfig]) -> Dict[str, List[FeedConfig]]:
+    """Groups feed configurations by feed URL."""
+    configs: Dict[str, List[FeedConfig]] = {}
+    for feed in feeds:
+        configs.setdefault(feed.feed_url, []).append(feed)
+    return configs
+
+
+def destinations(feeds: Iterable[FeedConfig]) -> Set[str]:
+    """Channels and webhooks the feeds are posted to, as outbox keys."""
+    return {target.destination for feed in feeds for target in feed.targets}
+
+
+def diff_config(old: ConfigFile, new: ConfigFile) -> FeedChanges:
+    """Compares the feeds of two configurations."""
+    old_feeds = group_feeds(old.feeds)
+    new_feeds = group_feeds(new.feeds)
+    return FeedChanges(
+        added=new_feeds.keys() - old_feeds.keys(),
+        removed=old_feeds.keys() - new_feeds.keys(),
+        changed={
+            url
+            for url in new_feeds.keys() & old_feeds.keys()
+            if new_feeds[url] != old_feeds[url]
+        },
+    )
+
+
+def restart_settings(old: ConfigFile, new: ConfigFile) -> List[str]:
+    """Returns the settings that changed but only apply after a restart."""
+    old_settings = old.model_dump(exclude={"feeds"})
+    new_settings = new.model_dump(exclude={"feeds"})
+    return sorted(
+        name
+        for name, value in new_settings.items()
+        if old_settings.get(name) != value
+    )
+
+
+class ConfigWatcher:
+    """Reloads the configuration file on SIGHUP or when it changes."""
+
+    def __init__(
+        self,
+        path: str,
+        on_reload: Callable[[ConfigFile], Awaitable[None]],
+        interval: Optional[float] = None,
+    ) -> None:
+        self.path = path
+        self.on_reload = on_reload
+        self.interval = interval
+        self.mtime = self._mtime()
+        self._lock = asyncio.Lock()
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._reloads: Set["asyncio.Task[None]"] = set()
+
+    def start(self) -> None:
+        """Installs the SIGHUP handler and starts watching the file."""
+        try:
+            asyncio.get_running_loop().add_signal_handler(
+                signal.SIGHUP, self._on_signal
+            )
+        except (AttributeError, NotImplementedError, RuntimeError):
+            logging.warning("SIGHUP reload is not supported on this platform")
+        if self.interval is not None and self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    def _on_signal(self) -> None:
+        """Schedules a reload from the signal handler."""
+        logging.info("Received SIGHUP, reloading configuration")
+        task = asyncio.create_task(self.reload())
+        self._reloads.add(task)
+        task.add_done_callback(self._reloads.discard)
+
+    def _mtime(self) -> Optional[float]:
+        """Modification time of the configuration file, if it exists."""
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    async def _watch(self) -> None:
+        """Reloads the configuration whenever its modification time changes."""
+        while True:
+            await asyncio.sleep(self.interval or 0)
+            mtime = self._mtime()
+            if mtime is not None and mtime != self.mtime:
+                logging.info("Configuration file %s changed", self.path)
+                await self.reload()
+
+    async def reload(self) -> None:
+        """Reads the configuration file and applies it if valid."""
+        async with self._lock:
+            self.mtime = self._mtime()
+            try:
+                config = await asyncio.to_thread(read_config, self.path)
+            except (OSError, TypeError, ValidationError, yaml.YAMLError) as e:
+                logging.error("Configuration reload failed: %s", e)
+                return
+            await self.on_reload(config)
+
+    async def stop(self) -> None:
+        """Stops watching the configuration file."""
+        await cancel_task(self._task)
+        self._task = None
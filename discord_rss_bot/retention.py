@@ -0,0 +1,210 @@
+"""
+Retention: keeps the reader database small and fast.
+
+`reader` keeps every entry forever, with its full summary and content.
+This module deletes old read entries and maintains the database file:
+
+  - Read entries older than `retention_days`, or beyond the newest
+    `retention_max_entries` of their feed, are deleted in batches, each in
+    a short transaction on the writer thread. Unread entries are never
+    deleted. Both limits can be set globally and overridden per feed.
+  - Once any feed has a retention limit, every parse of a feed records
+    the ids of the entries it lists, and entries still listed are never
+    deleted, so reader does not add them again on its next update. A feed
+    is pruned only once a listing of it was recorded.
+  - A deleted entry leaves a tombstone. Should its feed list it again,
+    reader adds it again, and a trigger marks it as read at once, so it is
+    never posted twice. Tombstones are dropped once their feed was updated
+    without the entry.
+  - Maintenance runs while the bot is idle between two feed checks, every
+    `maintenance_interval` seconds, and stops when the next check is due;
+    unfinished pruning continues in the next idle period.
+  - Once pruning caught up, free pages are returned to the file system
+    with incremental vacuum, planner statistics are refreshed with ANALYZE
+    and the write-ahead log is checkpointed and truncated. Switching the
+    database to incremental vacuum rewrites the whole file, so it is done
+    offline by the `vacuum` command, never by the running bot.
+  - The size of the database, its free pages and its WAL, and the pruned
+    entries are reported as metrics and in the logs.
+"""
+
+import logging
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional
+
+from discord_rss_bot import storage
+from discord_rss_bot.metrics import (
+    DATABASE_BYTES,
+    ENTRIES_PRUNED,
+    FEED_LABELS,
+    MAINTENANCE_SECONDS,
+)
+from discord_rss_bot.models import ConfigFile
+from discord_rss_bot.reader_hooks import on_feed_listing
+from discord_rss_bot.rss import ReaderTaskExecutor
+
+# Entries deleted per transaction
+PRUNE_BATCH_SIZE = 500
+
+
+class RetentionLimits(NamedTuple):
+    """How long, and how many, entries of a feed are kept."""
+
+    days: Optional[float]
+    max_entries: Optional[int]
+
+
+def feed_limits(config: ConfigFile) -> Dict[str, RetentionLimits]:
+    """
+    Returns the retention limits of every feed that has any, from the
+    first listing of its URL, falling back to the global limits.
+    """
+    limits: Dict[str, RetentionLimits] = {}
+    for feed in config.feeds:
+        if feed.feed_url in limits:
+            continue
+        feed_limit = RetentionLimits(
+            feed.retention_days or config.retention_days,
+            feed.retention_max_entries or config.retention_max_entries,
+        )
+        if feed_limit.days or feed_limit.max_entries:
+            limits[feed.feed_url] = feed_limit
+    return limits
+
+
+class ListingRecorder:
+    """Records the entries listed by every feed reader parses."""
+
+    def __init__(self, executor: ReaderTaskExecutor) -> None:
+        self.executor = executor
+        self.installed = False
+
+    def install(self) -> None:
+        """Starts recording the listings of the executor's reader."""
+        if not self.installed:
+            on_feed_listing(self.executor.rss_reader, self.record)
+            self.installed = True
+
+    def record(self, feed_url: str, entry_ids: Iterable[str]) -> None:
+        """Stores a listing from the update thread, on the writer."""
+        try:
+            self.executor.call_db(storage.record_listing, feed_url, entry_ids)
+        except sqlite3.Error as error:
+            logging.error("Error recording entries of %s: %s", feed_url, error)
+
+
+class Maintenance:
+    """Prunes old entries and maintains the database in idle periods."""
+
+    def __init__(
+        self,
+        executor: ReaderTaskExecutor,
+        db_path: str,
+        interval: Optional[float],
+    ) -> None:
+        self.executor = executor
+        self.db_path = db_path
+        self.interval = interval
+        self.last_run: Optional[float] = None
+        self.listings = ListingRecorder(executor)
+
+    def configure(self, config: ConfigFile) -> None:
+        """
+        Starts recording feed listings once any feed has a retention limit;
+        without one, nothing is pruned and nothing needs recording. Called
+        at startup and with each reloaded configuration.
+        """
+        if feed_limits(config):
+            self.listings.install()
+
+    def due(self) -> bool:
+        """Whether maintenance should run in the current idle period."""
+        if self.interval is None:
+            return False
+        return (
+            self.last_run is None
+            or time.monotonic() - self.last_run >= self.interval
+        )
+
+    async def run(self, config: ConfigFile, deadline: float) -> None:
+        """
+        Prunes entries, then maintains the database, until done or until
+        `deadline` (a `time.monotonic` value) passes.
+        """
+        if not await self._prune(config, deadline):
+            logging.info("Pruning paused until the next idle period")
+            return
+        await self._call(storage.prune_tombstones)
+        with MAINTENANCE_SECONDS.time(step="vacuum"):
+            await self._vacuum(deadline)
+        with MAINTENANCE_SECONDS.time(step="analyze"):
+            await self._call(storage.analyze)
+        with MAINTENANCE_SECONDS.time(step="checkpoint"):
+            completed = await self._call(storage.checkpoint)
+        if completed is False:
+            logging.info("WAL checkpoint incomplete, readers were active")
+        size = await self._call(storage.database_size, self.db_path)
+        if size is not None:
+            for part, value in size._asdict().items():
+                DATABASE_BYTES.set(value, part=part)
+            logging.info(
+                "Database size: %.1f MB (%.1f MB free), WAL %.1f MB",
+                size.file / 1e6,
+                size.free / 1e6,
+                size.wal / 1e6,
+            )
+        self.last_run = time.monotonic()
+
+    async def _prune(self, config: ConfigFile, deadline: float) -> bool:
+        """Deletes entries beyond the retention limits; False if unfinished."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        start = time.perf_counter()
+        pruned = 0
+        finished = True
+        with MAINTENANCE_SECONDS.time(step="prune"):
+            for feed_url, limits in feed_limits(config).items():
+                added_before = (
+                    (now - timedelta(days=limits.days)).isoformat(" ")
+                    if limits.days
+                    else None
+                )
+                count = PRUNE_BATCH_SIZE
+                while count == PRUNE_BATCH_SIZE:
+                    if time.monotonic() >= deadline:
+                        finished = False
+                        break
+                    count = await self._call(
+                        storage.prune_entries,
+                        feed_url,
+                        added_before,
+                        limits.max_entries,
+                        PRUNE_BATCH_SIZE,
+                    )
+                    count = count or 0
+                    pruned += count
+                    ENTRIES_PRUNED.inc(count, feed=FEED_LABELS(feed_url))
+                if not finished:
+                    break
+        if pruned:
+            elapsed = time.perf_counter() - start
+            logging.info(
+                "Pruned %d entries in %.1f seconds (%.0f entries/s)",
+                pruned,
+                elapsed,
+                pruned / elapsed if elapsed else 0.0,
+            )
+        return finished
+
+    async def _vacuum(self, deadline: float) -> None:
+        """Returns free pages to the file system, a few at a time."""
+        if not await self._call(storage.incremental_vacuum_enabled):
+            return
+        free = await self._call(storage.incremental_vacuum)
+        while free and time.monotonic() < deadline:
+            free = await self._call(storage.incremental_vacuum)
+
+    async def _call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Runs a storage function on the writer thread."""
+        return await self.executor.run_db(func, *args)
@@ -6,13 +6,19 @@ designed specifically to manage RSS feeds efficiently in a non-blocking
 manner for Discord bots.
 
 Key responsibilities include:
-  - Feed Management: Adding new feeds, updating existing feeds, and
-    removing feeds that are no longer in the configuration.
+  - Feed Management: Adding new feeds, updating existing feeds in
+    parallel, and removing feeds that are no longer in the configuration.
+  - Fetch Statistics: Recording status, bytes and latency of every fetch.
   - Entry Processing: Retrieving unread entries from feeds and marking
-    them as read after processing.
-  - Asynchronous Execution: Offloading blocking operations to a separate
-    thread using `asyncio.to_thread()`, ensuring that feed operations do not
-    block the main event loop.
+    them as read after processing, one write transaction per batch.
+    Entries are loaded as slim records, paged straight from SQLite with
+    their summaries cut to the rendered length. Large backlogs are loaded
+    in capped slices and skipped in bulk.
+  - Asynchronous Execution: Offloading blocking operations to dedicated
+    threads (a single writer, a small query pool and an update thread),
+    ensuring that feed operations do not block the main event loop or the
+    default executor. Feed updates retrieve feeds on the update thread
+    and only send their writes to the writer.
   - Separation of Concerns: Delegating asynchronous task execution and
     feed-specific helper functions to dedicated classes for improved
     maintainability and testability.
@@ -24,23 +30,163 @@ the application.
 """
 
 import asyncio
+import functools
 import logging
-from typing import Any, Callable, List, Optional, Set, TypeVar
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from contextlib import closing
+from datetime import datetime, timedelta, timezone
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+)
 
 from reader import Reader, ReaderError, make_reader
-from reader.types import Entry
+from reader.types import UpdatedFeed, UpdateResult
 
+from discord_rss_bot.message import SUMMARY_RENDER_CHARS
 from discord_rss_bot.models import ConfigFile
+from discord_rss_bot import sharding, storage
+from discord_rss_bot.storage import DeliveryEntry
+from discord_rss_bot.fetch_stats import FetchRecorder
+from discord_rss_bot.reload import FeedChanges
+from discord_rss_bot.metrics import (
+    FEED_LABELS,
+    FEED_UPDATES,
+    READER_TASK_SECONDS,
+)
 
 T = TypeVar("T")
 
+# Summary characters loaded per entry: one more than is rendered, so that
+# formatting still sees whether the summary was truncated
+SUMMARY_CHARS = SUMMARY_RENDER_CHARS + 1
+
+
+# pylint: disable-next=too-many-instance-attributes
+class ExecutorLane:
+    """
+    A dedicated thread pool that records how long tasks wait in its queue.
+    Queue depth counts tasks that were submitted but have not started yet.
+    """
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=f"reader-{name}"
+        )
+        self.queue_depth = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.threads: Set[int] = set()
+        self._lock = threading.Lock()
+
+    async def submit(self, func: Callable[[], T]) -> T:
+        """Runs `func` on the lane and waits for its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._task(func))
+
+    def call(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Runs `func` on the lane from another thread, blocking until done.
+        Called from one of the lane's own threads, runs it right away.
+        """
+        if threading.get_ident() in self.threads:
+            return func(*args)
+        return self.executor.submit(
+            self._task(functools.partial(func, *args))
+        ).result()
+
+    def _task(self, func: Callable[[], T]) -> Callable[[], T]:
+        """Wraps `func` to record its wait in the lane's queue."""
+        submitted = time.monotonic()
+        with self._lock:
+            self.queue_depth += 1
+
+        def task() -> T:
+            wait = time.monotonic() - submitted
+            with self._lock:
+                self.queue_depth -= 1
+                self.total_wait += wait
+                self.max_wait = max(self.max_wait, wait)
+                self.threads.add(threading.get_ident())
+            try:
+                return func()
+            finally:
+                with self._lock:
+                    self.completed += 1
+
+        return task
+
+    def stats(self) -> Dict[str, float]:
+        """Returns a snapshot of the lane's queue metrics."""
+        return {
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "avg_wait": (
+                self.total_wait / self.completed if self.completed else 0
+            ),
+            "max_wait": self.max_wait,
+        }
+
+    def shutdown(self) -> None:
+        """Stops the lane's threads once queued tasks are done."""
+        self.executor.shutdown(wait=True)
+
 
-# pylint: disable=too-few-public-methods
 class ReaderTaskExecutor:
-    """Helper class that runs blocking reader tasks in a separate thread."""
+    """
+    Helper class that runs blocking reader tasks on dedicated threads.
 
-    def __init__(self, rss_reader: Reader) -> None:
+    Mutations go through a single writer thread so that SQLite writes are
+    serialized and never contend for the write lock. Queries run on a small
+    pool of their own; reader keeps one connection per thread, and in WAL
+    mode those readers never block the writer. Storage functions run with
+    a connection of their thread, kept open between tasks.
+
+    Feed updates run on an update thread of their own: retrieving and
+    parsing feeds never holds the writer, and only the writes of reader's
+    update pipeline are sent to the writer thread.
+    """
+
+    def __init__(
+        self, rss_reader: Reader, db_path: str, query_workers: int = 4
+    ) -> None:
         self.rss_reader = rss_reader
+        self.connections = storage.ThreadConnections(db_path)
+        self.writer = ExecutorLane("writer", max_workers=1)
+        self.readers = ExecutorLane("query", max_workers=query_workers)
+        self.updater = ExecutorLane("update", max_workers=1)
+        self._route_update_writes()
+
+    def _route_update_writes(self) -> None:
+        """Sends the writes of reader's update pipeline to the writer."""
+        # The update pipeline only writes through these two methods
+        # pylint: disable-next=protected-access
+        reader_storage = self.rss_reader._storage
+        for name in ("add_or_update_entries", "update_feed"):
+            method = getattr(reader_storage, name)
+            setattr(
+                reader_storage,
+                name,
+                functools.update_wrapper(
+                    functools.partial(self.writer.call, method), method
+                ),
+            )
 
     async def run(
         self,
@@ -49,22 +195,116 @@ class ReaderTaskExecutor:
         default: Optional[T] = None,
         **kwargs: Any,
     ) -> Optional[T]:
-        """Runs a blocking reader task in a separate thread."""
+        """Runs a blocking reader task on the writer thread."""
+        return await self._submit(self.writer, func, args, kwargs, default)
+
+    async def query(
+        self,
+        func: Callable[..., T],
+        *args: Any,
+        default: Optional[T] = None,
+        **kwargs: Any,
+    ) -> Optional[T]:
+        """Runs a read-only blocking reader task on the query pool."""
+        return await self._submit(self.readers, func, args, kwargs, default)
+
+    async def update(self, func: Callable[..., T], *args: Any) -> Optional[T]:
+        """Runs a feed update task on the update thread."""
+        return await self._submit(self.updater, func, args, {}, None)
+
+    def call_db(self, func: Callable[..., T], *args: Any) -> T:
+        """
+        Runs a storage function on the writer thread from another thread,
+        blocking until done; see run_db.
+        """
+        return self.writer.call(self._db_task(func), *args)
+
+    async def run_db(
+        self, func: Callable[..., T], *args: Any, default: Optional[T] = None
+    ) -> Optional[T]:
+        """
+        Runs a storage function on the writer thread, passing the thread's
+        connection as its first argument.
+        """
+        return await self._submit(
+            self.writer, self._db_task(func), args, {}, default
+        )
+
+    async def query_db(
+        self, func: Callable[..., T], *args: Any, default: Optional[T] = None
+    ) -> Optional[T]:
+        """Runs a read-only storage function on the query pool, see run_db."""
+        return await self._submit(
+            self.readers, self._db_task(func), args, {}, default
+        )
+
+    def _db_task(self, func: Callable[..., T]) -> Callable[..., T]:
+        """Wraps a storage function in a task named after it."""
+        return functools.update_wrapper(
+            functools.partial(self._with_db, func), func
+        )
+
+    def _with_db(self, func: Callable[..., T], *args: Any) -> T:
+        """Blocking part of run_db and query_db."""
+        db = self.connections.get()
+        try:
+            return func(db, *args)
+        finally:
+            # Never leave a failed transaction open on a reused connection
+            if db.in_transaction:
+                db.rollback()
+
+    async def _submit(
+        self,
+        lane: ExecutorLane,
+        func: Callable[..., T],
+        args: Tuple[Any, ...],
+        kwargs: Dict[str, Any],
+        default: Optional[T],
+    ) -> Optional[T]:
+        """Submits a task to the given lane, logging database errors."""
+        task = getattr(func, "__name__", type(func).__name__)
         try:
-            return await asyncio.to_thread(func, *args, **kwargs)
-        except ReaderError as error:
-            logging.error("Error executing task: %s", error)
+            with READER_TASK_SECONDS.time(lane=lane.name, task=task):
+                return await lane.submit(
+                    functools.partial(func, *args, **kwargs)
+                )
+        except (ReaderError, sqlite3.Error) as error:
+            logging.error("Error executing task %s: %s", task, error)
             return default
 
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Returns queue metrics for every lane."""
+        return {lane.name: lane.stats() for lane in self.lanes}
+
+    @property
+    def lanes(self) -> Tuple[ExecutorLane, ...]:
+        """Every lane of the executor."""
+        return (self.writer, self.readers, self.updater)
+
+    def shutdown(self) -> None:
+        """Stops the executor threads and closes their connections."""
+        # Updates still running need the writer, so they stop first
+        self.updater.shutdown()
+        self.writer.shutdown()
+        self.readers.shutdown()
+        self.connections.close()
+
 
 class FeedManager:
     """Encapsulates feed operations and manages RSS feed interactions using the reader"""
 
     def __init__(
-        self, rss_reader: Reader, executor: ReaderTaskExecutor
+        self,
+        rss_reader: Reader,
+        executor: ReaderTaskExecutor,
+        fetches: Optional[FetchRecorder] = None,
     ) -> None:
         self.rss_reader = rss_reader
         self.executor = executor
+        self.fetches = fetches
+        # Feeds taken over from another shard, see `adopt_feeds`
+        self.adopted: Set[str] = set()
 
     async def add_feed(
         self, feed_url: str, update_interval: Optional[int]
@@ -76,26 +316,140 @@ class FeedManager:
                 self.rss_reader.add_feed, feed_url, exist_ok=True
             )
             if update_interval is not None:
-                self.rss_reader.set_tag(
-                    feed_url, ".reader.update", {"interval": update_interval}
+                await self.executor.run(
+                    self.rss_reader.set_tag,
+                    feed_url,
+                    ".reader.update",
+                    {"interval": update_interval},
                 )
         except ReaderError as error:
             logging.error("Error adding feed %s: %s", feed_url, error)
 
-    async def update_feeds(self, scheduled: bool = True) -> None:
+    async def set_update_intervals(
+        self, intervals: Dict[str, Optional[int]]
+    ) -> None:
+        """
+        Sets the update interval (in minutes) of several feeds; None
+        restores reader's default interval.
+        """
+        await self.executor.run(self._set_update_intervals, intervals)
+
+    def _set_update_intervals(
+        self, intervals: Dict[str, Optional[int]]
+    ) -> None:
+        """Blocking part of set_update_intervals, runs on the writer thread."""
+        for feed_url, interval in intervals.items():
+            try:
+                if interval is None:
+                    self.rss_reader.delete_tag(
+                        feed_url, ".reader.update", missing_ok=True
+                    )
+                else:
+                    self.rss_reader.set_tag(
+                        feed_url, ".reader.update", {"interval": interval}
+                    )
+            except ReaderError as error:
+                logging.error(
+                    "Error setting interval of feed %s: %s", feed_url, error
+                )
+
+    async def get_update_after(self) -> Dict[str, Optional[datetime]]:
+        """Retrieves the time each feed is next due for an update."""
+        due = await self.executor.query(self._get_update_after)
+        return due if due is not None else {}
+
+    def _get_update_after(self) -> Dict[str, Optional[datetime]]:
+        """Blocking part of get_update_after, runs in a worker thread."""
+        return {
+            feed.url: feed.update_after for feed in self.rss_reader.get_feeds()
+        }
+
+    async def update_feeds(
+        self, scheduled: bool = True, workers: int = 1
+    ) -> None:
         """Updates all RSS feeds."""
-        logging.info("Updating RSS feeds (scheduled=%s)", scheduled)
-        await self.executor.run(
-            self.rss_reader.update_feeds, scheduled=scheduled
+        async for _ in self.update_feeds_iter(scheduled, workers):
+            pass
+
+    async def update_feeds_iter(
+        self, scheduled: bool = True, workers: int = 1
+    ) -> AsyncIterator[UpdateResult]:
+        """
+        Updates all RSS feeds, yielding each feed's result as soon as that
+        feed is done. Feeds are retrieved by `workers` threads in parallel,
+        driven from the update thread; each feed's entries are stored in
+        one task on the writer thread, so other writes run while feeds are
+        retrieved. Fetch statistics of the round are stored in one
+        transaction at the end.
+        """
+        logging.info(
+            "Updating RSS feeds (scheduled=%s, workers=%d)", scheduled, workers
+        )
+        results = self.rss_reader.update_feeds_iter(
+            scheduled=scheduled, workers=workers
         )
+        updated = failed = 0
+        records: List[storage.FetchRecord] = []
+        try:
+            while True:
+                result = await self.executor.update(self._update_next, results)
+                if result is None:
+                    break
+                self._log_update_result(result)
+                if self.fetches is not None:
+                    records.append(self.fetches.collect(result))
+                if result.url in self.adopted and isinstance(
+                    result.value, UpdatedFeed
+                ):
+                    await self.executor.run_db(
+                        self._release_adopted, result.url
+                    )
+                updated += 1
+                failed += isinstance(result.value, Exception)
+                yield result
+        finally:
+            await self.executor.update(results.close)
+            logging.info("Updated %d feeds (%d failed)", updated, failed)
+            if records:
+                await self.executor.run_db(storage.record_fetches, records)
+
+    @staticmethod
+    def _update_next(
+        results: Iterator[UpdateResult],
+    ) -> Optional[UpdateResult]:
+        """Retrieves and stores the next feed, runs on the update thread."""
+        return next(results, None)
+
+    @staticmethod
+    def _log_update_result(result: UpdateResult) -> None:
+        """Logs and counts the outcome of a single feed update."""
+        if isinstance(result.value, Exception):
+            outcome = "error"
+            logging.error(
+                "Error updating feed %s: %s", result.url, result.value
+            )
+        elif result.value is None:
+            outcome = "not_modified"
+            logging.debug("Feed %s was not modified", result.url)
+        else:
+            outcome = "new" if result.value.new else "unchanged"
+            logging.info(
+                "Updated feed %s: %d new, %d modified entries",
+                result.url,
+                result.value.new,
+                result.value.modified,
+            )
+        FEED_UPDATES.inc(feed=FEED_LABELS(result.url), result=outcome)
 
     async def get_existing_feeds(self) -> Set[str]:
         """Retrieves the set of feed URLs currently registered in the reader."""
-        feeds = await self.executor.run(
-            lambda: {feed.url for feed in self.rss_reader.get_feeds()}
-        )
+        feeds = await self.executor.query(self._get_feed_urls)
         return feeds if feeds is not None else set()
 
+    def _get_feed_urls(self) -> Set[str]:
+        """Blocking part of get_existing_feeds, runs in a worker thread."""
+        return {feed.url for feed in self.rss_reader.get_feeds()}
+
     async def delete_feed(self, feed_url: str) -> None:
         """Deletes a feed from the reader."""
         try:
@@ -104,34 +458,181 @@ class FeedManager:
         except ReaderError as error:
             logging.error("Error removing feed %s: %s", feed_url, error)
 
-    async def get_unread_entries(self, feed_url: str) -> List[Entry]:
+    async def get_unread_entries(self, feed_url: str) -> List[DeliveryEntry]:
         """Retrieves unread entries for a given feed."""
         logging.info("Fetching unread entries for %s", feed_url)
-        entries = await self.executor.run(
-            lambda: list(
-                self.rss_reader.get_entries(feed=feed_url, read=False)
-            ),
-            default=[],
+        entries = await self.executor.query_db(
+            self._get_unread_entries, feed_url, default=[]
         )
         return entries if entries is not None else []
 
-    async def mark_entry_as_read(self, entry: Entry) -> None:
-        """Marks a single entry as read."""
-        try:
-            await self.executor.run(self.rss_reader.mark_entry_as_read, entry)
-        except ReaderError as error:
-            logging.error(
-                "Error marking entry '%s' as read: %s", entry.title, error
+    @staticmethod
+    def _get_unread_entries(
+        db: sqlite3.Connection, feed_url: str
+    ) -> List[DeliveryEntry]:
+        """Blocking part of get_unread_entries, runs in a worker thread."""
+        return list(storage.unread_entries(db, SUMMARY_CHARS, feed_url))
+
+    async def get_unread_slice(
+        self, feed_url: str, limit: int, oldest: bool = False
+    ) -> Tuple[List[DeliveryEntry], int]:
+        """
+        Retrieves at most `limit` unread entries of a feed (newest first),
+        the newest ones or the `oldest` ones, and the number of unread
+        entries of the feed. Only the slice is kept in memory.
+        """
+        loaded = await self.executor.query_db(
+            self._get_unread_slice, feed_url, limit, oldest
+        )
+        return loaded if loaded is not None else ([], 0)
+
+    @staticmethod
+    def _get_unread_slice(
+        db: sqlite3.Connection, feed_url: str, limit: int, oldest: bool
+    ) -> Tuple[List[DeliveryEntry], int]:
+        """Blocking part of get_unread_slice, runs in a worker thread."""
+        total = storage.count_unread(db, feed_url)
+        entries = list(
+            storage.unread_entries(db, SUMMARY_CHARS, feed_url, limit, oldest)
+        )
+        if oldest:
+            # Loaded oldest first, returned newest first like the others
+            entries.reverse()
+        return entries, total
+
+    async def skip_unread_entries(
+        self, feed_url: str, added_until: datetime
+    ) -> int:
+        """
+        Marks the unread entries of a feed added no later than
+        `added_until` as read in one transaction, without loading them.
+        Returns the number of entries skipped.
+        """
+        until = added_until.astimezone(timezone.utc).replace(tzinfo=None)
+        skipped = await self.executor.run_db(
+            storage.mark_feed_read, feed_url, until.isoformat(" ")
+        )
+        return skipped or 0
+
+    async def get_all_unread_entries(
+        self,
+        per_feed_limit: Optional[int] = None,
+        exclude: Iterable[str] = (),
+    ) -> Dict[str, List[DeliveryEntry]]:
+        """
+        Retrieves unread entries of all feeds with a single query,
+        grouped by feed URL. See `_group_unread_entries` for the limit.
+        """
+        logging.info("Fetching unread entries for all feeds")
+        grouped = await self.executor.query_db(
+            self._group_unread_entries, per_feed_limit, set(exclude), default={}
+        )
+        return grouped if grouped is not None else {}
+
+    @staticmethod
+    def _group_unread_entries(
+        db: sqlite3.Connection,
+        per_feed_limit: Optional[int],
+        exclude: Set[str],
+    ) -> Dict[str, List[DeliveryEntry]]:
+        """
+        Streams unread entries (newest first) and groups them by feed.
+        With a limit, only the oldest `per_feed_limit` entries of each feed
+        are kept in memory, so a backlog is delivered in order over
+        several runs. Entries of `exclude` feeds are not kept at all.
+        """
+        grouped: Dict[str, Deque[DeliveryEntry]] = {}
+        for entry in storage.unread_entries(db, SUMMARY_CHARS):
+            if entry.feed_url in exclude:
+                continue
+            if entry.feed_url not in grouped:
+                grouped[entry.feed_url] = deque(maxlen=per_feed_limit)
+            grouped[entry.feed_url].append(entry)
+        return {url: list(entries) for url, entries in grouped.items()}
+
+    async def adopt_feeds(self, shard_index: int, shard_count: int) -> None:
+        """
+        Records the shard layout the database is used with. Feeds this shard
+        did not own under the previous layout were posted by another shard,
+        so their entries are marked as read on their first update instead of
+        being posted again. A database without a layout that starts sharded
+        adopts all its feeds.
+        """
+        await self.executor.run(self._adopt_feeds, shard_index, shard_count)
+        self.adopted = await self.executor.query(self._get_adopted) or set()
+        if self.adopted:
+            logging.info(
+                "Adopted %d feeds from other shards", len(self.adopted)
             )
 
-    async def mark_entries_as_read(self, entries: List[Entry]) -> None:
-        """Marks the provided list of entries as read."""
-        if not entries:
+    def _adopt_feeds(self, shard_index: int, shard_count: int) -> None:
+        """Blocking part of adopt_feeds, runs on the writer thread."""
+        layout = {"index": shard_index, "count": shard_count}
+        previous = self.rss_reader.get_tag((), sharding.LAYOUT_TAG, None)
+        if previous == layout:
             return
 
-        logging.info("Marking %d entries as read", len(entries))
-        tasks = [self.mark_entry_as_read(entry) for entry in entries]
-        await asyncio.gather(*tasks)
+        for feed in self.rss_reader.get_feeds():
+            if isinstance(previous, dict):
+                owned = previous.get("index") == sharding.shard_of(
+                    feed.url, previous.get("count", 1)
+                )
+            else:
+                # Without a layout, feeds already updated were owned by a
+                # single instance; a new database starting out sharded
+                # adopts its feeds from the other shards
+                owned = feed.last_updated is not None or shard_count == 1
+            owner = sharding.shard_of(feed.url, shard_count)
+            if owned and owner != shard_index:
+                logging.warning(
+                    "Feed %s moves to shard %d, its unread entries in this"
+                    " database are not posted",
+                    feed.url,
+                    owner,
+                )
+            elif not owned and owner == shard_index:
+                logging.info(
+                    "Feed %s is taken over from another shard, its current"
+                    " entries are skipped on its first update",
+                    feed.url,
+                )
+                self.rss_reader.set_tag(feed, sharding.ADOPTED_TAG)
+        self.rss_reader.set_tag((), sharding.LAYOUT_TAG, layout)
+
+    def _get_adopted(self) -> Set[str]:
+        """Retrieves the adopted feeds that were not updated yet."""
+        return {
+            feed.url
+            for feed in self.rss_reader.get_feeds(tags=[sharding.ADOPTED_TAG])
+        }
+
+    def _release_adopted(self, db: sqlite3.Connection, feed_url: str) -> None:
+        """Marks an adopted feed's entries as read after its first update."""
+        try:
+            count = storage.mark_feed_read(db, feed_url)
+            self.rss_reader.delete_tag(
+                feed_url, sharding.ADOPTED_TAG, missing_ok=True
+            )
+            self.adopted.discard(feed_url)
+            logging.info(
+                "Skipped %d entries of adopted feed %s", count, feed_url
+            )
+        except (sqlite3.Error, ReaderError) as error:
+            logging.error(
+                "Error releasing adopted feed %s: %s", feed_url, error
+            )
+
+    async def stagger_updates(self, window: float) -> None:
+        """Spreads the next update of all due feeds over `window` seconds."""
+        count = await self.executor.run_db(
+            storage.stagger_updates, timedelta(seconds=window)
+        )
+        if count is not None:
+            logging.info(
+                "Spreading the first update of %d feeds over %.0f seconds",
+                count,
+                window,
+            )
 
     async def cleanup_removed_feeds(self, config_feeds: Set[str]) -> None:
         """Removes feeds from the reader that are not in the provided configuration."""
@@ -152,17 +653,32 @@ class RSSReader:
 
     def __init__(self, config: ConfigFile) -> None:
         self.config = config
+        self.fetches = FetchRecorder()
         self._init_reader()
 
-        self.task_executor = ReaderTaskExecutor(self.reader)
-        self.feed_manager = FeedManager(self.reader, self.task_executor)
+        self.task_executor = ReaderTaskExecutor(
+            self.reader,
+            self.config.db_path,
+            query_workers=self.config.reader_workers,
+        )
+        self.feed_manager = FeedManager(
+            self.reader, self.task_executor, self.fetches
+        )
 
     def _init_reader(self) -> None:
         """Initializes the underlying reader instance."""
         logging.info("Initializing RSS reader")
         try:
-            self.reader = make_reader(self.config.db_path)
-        except ReaderError as error:
+            self.reader = make_reader(
+                self.config.db_path, session_timeout=self.config.update_timeout
+            )
+            self.fetches.install(self.reader)
+            with closing(storage.connect(self.config.db_path)) as db:
+                storage.create_fetch_stats(db)
+                storage.create_outbox(db)
+                storage.create_seen(db)
+                storage.create_pruned(db)
+        except (ReaderError, sqlite3.Error) as error:
             logging.error("Error initializing reader: %s", error)
             raise
 
@@ -176,28 +692,115 @@ class RSSReader:
 
     async def update_feeds(self, scheduled: bool = True) -> None:
         """Updates the RSS feeds."""
-        await self.feed_manager.update_feeds(scheduled=scheduled)
+        await self.feed_manager.update_feeds(
+            scheduled=scheduled, workers=self.config.update_workers
+        )
+
+    async def update_feeds_iter(
+        self, scheduled: bool = True
+    ) -> AsyncIterator[UpdateResult]:
+        """Updates the RSS feeds, yielding per-feed results as they finish."""
+        async for result in self.feed_manager.update_feeds_iter(
+            scheduled=scheduled, workers=self.config.update_workers
+        ):
+            yield result
+
+    async def set_update_intervals(
+        self, intervals: Dict[str, Optional[int]]
+    ) -> None:
+        """Sets the update interval (in minutes) of several feeds."""
+        await self.feed_manager.set_update_intervals(intervals)
+
+    async def apply_config(
+        self, config: ConfigFile, changes: FeedChanges
+    ) -> None:
+        """
+        Switches to a new configuration, adding, removing and updating only
+        the feeds that differ. Added feeds are due for an update at once.
+        """
+        self.config = config
+        intervals: Dict[str, Optional[int]] = {}
+        for feed_url in changes.changed:
+            configured = [
+                feed.update_interval
+                for feed in config.feeds
+                if feed.feed_url == feed_url and feed.update_interval
+            ]
+            intervals[feed_url] = min(configured) if configured else None
+
+        await asyncio.gather(
+            *(
+                self.feed_manager.add_feed(feed.feed_url, feed.update_interval)
+                for feed in config.feeds
+                if feed.feed_url in changes.added
+            ),
+            *(self.feed_manager.delete_feed(url) for url in changes.removed),
+        )
+        if intervals:
+            await self.feed_manager.set_update_intervals(intervals)
+
+    async def get_update_after(self) -> Dict[str, Optional[datetime]]:
+        """Retrieves the time each feed is next due for an update."""
+        return await self.feed_manager.get_update_after()
 
     async def cleanup_removed_feeds(self) -> None:
         """Removes feeds that are no longer in the configuration."""
         config_feeds = {feed.feed_url for feed in self.config.feeds}
         await self.feed_manager.cleanup_removed_feeds(config_feeds)
 
-    async def get_unread_entries(self, feed_url: str) -> List[Entry]:
+    async def get_unread_entries(self, feed_url: str) -> List[DeliveryEntry]:
         """Retrieves unread entries for a specified feed."""
         return await self.feed_manager.get_unread_entries(feed_url)
 
-    async def mark_entries_as_read(self, entries: List[Entry]) -> None:
-        """Marks specified entries as read."""
-        await self.feed_manager.mark_entries_as_read(entries)
+    async def get_unread_slice(
+        self, feed_url: str, limit: int, oldest: bool = False
+    ) -> Tuple[List[DeliveryEntry], int]:
+        """Retrieves a capped slice of a feed's unread entries and their count."""
+        return await self.feed_manager.get_unread_slice(feed_url, limit, oldest)
+
+    async def skip_unread_entries(
+        self, feed_url: str, added_until: datetime
+    ) -> int:
+        """Marks a feed's unread entries added until a time as read."""
+        return await self.feed_manager.skip_unread_entries(
+            feed_url, added_until
+        )
+
+    async def get_all_unread_entries(
+        self,
+        per_feed_limit: Optional[int] = None,
+        exclude: Iterable[str] = (),
+    ) -> Dict[str, List[DeliveryEntry]]:
+        """Retrieves unread entries of all feeds, grouped by feed URL."""
+        return await self.feed_manager.get_all_unread_entries(
+            per_feed_limit, exclude
+        )
+
+    def executor_stats(self) -> Dict[str, Dict[str, float]]:
+        """Returns queue depth and wait-time metrics of the reader threads."""
+        return self.task_executor.stats()
+
+    async def close(self) -> None:
+        """Waits for pending reader tasks and closes the database."""
+        await asyncio.to_thread(self.task_executor.shutdown)
+        self.reader.close()
 
     async def setup(self) -> None:
         """
         Asynchronously sets up the RSS feeds by:
         1. Adding new feeds
-        2. Cleaning up removed feeds
-        3. Performing an initial update.
+        2. Marking feeds adopted from another shard
+        3. Cleaning up removed feeds, including those moved to another shard
+        4. Performing an initial update, or with `startup_window` set,
+           spreading the first update of due feeds over that window.
         """
-        await asyncio.gather(self.add_feeds(), self.cleanup_removed_feeds())
+        await self.add_feeds()
+        await self.feed_manager.adopt_feeds(
+            self.config.shard_index, self.config.shard_count
+        )
+        await self.cleanup_removed_feeds()
+        if self.config.startup_window is not None:
+            await self.feed_manager.stagger_updates(self.config.startup_window)
+            return
         # Immediate update after setup
         await self.update_feeds(scheduled=False)
@@ -0,0 +1,233 @@
+"""
+SendScheduler: Rate-limit-aware delivery of Discord messages.
+
+Messages are queued per channel and sent in order by one worker per
+channel. Each send waits for a token from the channel's bucket and from a
+global bucket, matched to Discord's documented limits, so a large backlog
+is paced instead of bursting into 429 responses. A semaphore bounds the
+number of requests in flight across all channels. Sends Discord rejects
+for good (a 4xx answer other than 429) are reported apart from failures
+worth retrying, which include network errors and timeouts.
+
+Rate limits are handled in layers. The buckets keep sends under Discord's
+limits, so 429 answers should be rare. discord.py waits out a rate limit of
+up to the client's `max_ratelimit_timeout` itself; a longer one is raised
+as `RateLimited` and retried here after its `retry_after`. Webhook sends
+have no such setting: discord.py retries their 429 answers internally, and
+only a 429 it gives up on reaches this module as an HTTP error.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Literal,
+    Optional,
+    Tuple,
+)
+
+import aiohttp
+import discord
+
+from discord_rss_bot.metrics import SEND_RATE_LIMITED, SEND_SECONDS
+
+# Discord allows 5 messages per 5 seconds per channel
+CHANNEL_RATE = (5, 5.0)
+# and 50 requests per second per bot
+GLOBAL_RATE = (50, 1.0)
+# Attempts per message when Discord answers with 429
+MAX_ATTEMPTS = 3
+# Errors of the connection rather than of Discord, worth retrying later
+NETWORK_ERRORS = (OSError, aiohttp.ClientError, asyncio.TimeoutError)
+
+# Outcome of a send: delivered, failed for now, or rejected for good
+SendResult = Literal["sent", "failed", "rejected"]
+
+
+# pylint: disable=too-few-public-methods
+class TokenBucket:
+    """
+    Token bucket allowing `capacity` acquisitions per `period` seconds.
+    `clock` and `sleep` measure and wait for time, replaceable in tests.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        period: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.capacity = capacity
+        self.rate = capacity / period
+        self.tokens = float(capacity)
+        self.clock = clock
+        self.sleep = sleep
+        self.updated = clock()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Waits until a token is available and takes it."""
+        async with self._lock:
+            while True:
+                now = self.clock()
+                self.tokens = min(
+                    self.capacity,
+                    self.tokens + (now - self.updated) * self.rate,
+                )
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await self.sleep((1 - self.tokens) / self.rate)
+
+
+# Message waiting in a channel queue: send() kwargs and the result future
+QueuedMessage = Tuple[Dict[str, Any], "asyncio.Future[SendResult]"]
+
+
+# pylint: disable=too-few-public-methods
+class ChannelQueue:
+    """Ordered queue of messages for a single channel."""
+
+    def __init__(self, channel: discord.abc.Messageable) -> None:
+        self.channel = channel
+        self.messages: Deque[QueuedMessage] = deque()
+        self.bucket = TokenBucket(*CHANNEL_RATE)
+        self.worker: Optional["asyncio.Task[None]"] = None
+
+
+class SendScheduler:
+    """Paces and orders message sends across Discord channels."""
+
+    def __init__(self, max_in_flight: int = 8) -> None:
+        self.global_bucket = TokenBucket(*GLOBAL_RATE)
+        self.in_flight = asyncio.Semaphore(max_in_flight)
+        self.channels: Dict[int, ChannelQueue] = {}
+        self.sent = 0
+        self.failed = 0
+        self.rate_limited = 0
+
+    def submit(
+        self, channel: discord.abc.Messageable, **kwargs: Any
+    ) -> "asyncio.Future[SendResult]":
+        """
+        Queues a message for the channel. The returned future resolves to
+        "sent" once the message is sent, "rejected" if Discord refused it
+        for good (bad request, missing access, unknown channel), or
+        "failed" if sending failed otherwise.
+        """
+        channel_id = getattr(channel, "id", id(channel))
+        queue = self.channels.get(channel_id)
+        if queue is None:
+            queue = self.channels[channel_id] = ChannelQueue(channel)
+
+        future = asyncio.get_running_loop().create_future()
+        queue.messages.append((kwargs, future))
+        if queue.worker is None or queue.worker.done():
+            queue.worker = asyncio.create_task(self._drain(queue))
+        return future
+
+    async def _drain(self, queue: ChannelQueue) -> None:
+        """Sends a channel's messages in order until its queue is empty."""
+        while queue.messages:
+            kwargs, future = queue.messages.popleft()
+            result: SendResult = "failed"
+            try:
+                result = await self._send(queue, kwargs)
+            except asyncio.CancelledError:
+                future.cancel()
+                raise
+            except Exception:  # pylint: disable=broad-exception-caught
+                logging.exception("Unexpected error sending message")
+                self.failed += 1
+            finally:
+                if not future.done():
+                    future.set_result(result)
+
+    async def _send(
+        self, queue: ChannelQueue, kwargs: Dict[str, Any]
+    ) -> SendResult:
+        """Sends one message, retrying when Discord rate limits us."""
+        result: SendResult = "failed"
+        for attempt in range(1, MAX_ATTEMPTS + 1):
+            await queue.bucket.acquire()
+            await self.global_bucket.acquire()
+            retry_after = float(attempt)
+            start = time.perf_counter()
+            try:
+                async with self.in_flight:
+                    await queue.channel.send(**kwargs)
+                SEND_SECONDS.observe(time.perf_counter() - start, result="ok")
+                self.sent += 1
+                return "sent"
+
+            except discord.RateLimited as e:
+                retry_after = e.retry_after
+            except discord.HTTPException as e:
+                if e.status != 429:
+                    self._record_error(start, e)
+                    if 400 <= e.status < 500:
+                        result = "rejected"
+                    break
+            except discord.DiscordException as e:
+                self._record_error(start, e)
+                break
+            except NETWORK_ERRORS as e:
+                self._record_error(start, e)
+                break
+
+            SEND_SECONDS.observe(
+                time.perf_counter() - start, result="rate_limited"
+            )
+            SEND_RATE_LIMITED.inc()
+            self.rate_limited += 1
+
+            logging.warning(
+                "Rate limited on channel %s, retrying in %.1fs",
+                getattr(queue.channel, "id", "?"),
+                retry_after,
+            )
+            await asyncio.sleep(retry_after)
+
+        self.failed += 1
+        return result
+
+    @staticmethod
+    def _record_error(start: float, error: Exception) -> None:
+        """Logs and times a send that failed for good."""
+        SEND_SECONDS.observe(time.perf_counter() - start, result="error")
+        logging.error("Error sending message: %s", error)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns queue depth and delivery counters."""
+        return {
+            "queue_depth": sum(
+                len(queue.messages) for queue in self.channels.values()
+            ),
+            "channels": len(self.channels),
+            "sent": self.sent,
+            "failed": self.failed,
+            "rate_limited": self.rate_limited,
+        }
+
+    async def close(self) -> None:
+        """Cancels the channel workers, failing any queued messages."""
+        workers = [
+            queue.worker
+            for queue in self.channels.values()
+            if queue.worker is not None
+        ]
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        for queue in self.channels.values():
+            for _, future in queue.messages:
+                future.cancel()
+            queue.messages.clear()
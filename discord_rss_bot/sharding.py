@@ -0,0 +1,76 @@
+"""
+Sharding of feeds across several bot replicas.
+
+Each replica runs with a shard index and a shard count, owns a stable
+subset of the configured feeds and keeps its own `reader` database:
+
+  - Feeds are assigned with rendezvous (highest random weight) hashing:
+    a feed belongs to the shard with the highest hash of (shard, URL).
+    When the shard count changes, only the feeds whose highest-weight
+    shard was added or removed move, about 1/count of them.
+  - Shard 0 keeps `db_path` as is, other shards store their database
+    next to it (`rss.sqlite3` becomes `rss.shard-2.sqlite3`), so a single
+    instance can be scaled out without moving its database.
+  - The layout a database was last used with is stored in it. Feeds that
+    a shard adopts from another shard after a resize have their existing
+    entries marked as read on their first update instead of being posted
+    again (see `RSSReader.setup`). The database of a single instance that
+    becomes shard 0 keeps the feeds it still owns as they are.
+"""
+
+import hashlib
+import os
+from typing import Iterable, List
+
+from discord_rss_bot.models import ConfigFile, FeedConfig
+
+# Global reader tag holding the layout the database was last used with
+LAYOUT_TAG = "discord_rss_bot.shard"
+# Feed tag of feeds adopted from another shard, not updated since
+ADOPTED_TAG = "discord_rss_bot.adopted"
+
+
+def _weight(shard: int, feed_url: str) -> int:
+    """Rendezvous weight of a feed on a shard."""
+    digest = hashlib.sha256(f"{shard}\0{feed_url}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def shard_of(feed_url: str, shard_count: int) -> int:
+    """Returns the index of the shard owning a feed."""
+    return max(range(shard_count), key=lambda shard: _weight(shard, feed_url))
+
+
+def owned_feeds(
+    feeds: Iterable[FeedConfig], shard_index: int, shard_count: int
+) -> List[FeedConfig]:
+    """Returns the feeds owned by a shard."""
+    return [
+        feed
+        for feed in feeds
+        if shard_of(feed.feed_url, shard_count) == shard_index
+    ]
+
+
+def shard_db_path(db_path: str, shard_index: int) -> str:
+    """Returns the database path of a shard."""
+    if shard_index == 0:
+        return db_path
+    root, ext = os.path.splitext(db_path)
+    return f"{root}.shard-{shard_index}{ext}"
+
+
+def shard_config(
+    config: ConfigFile, shard_index: int, shard_count: int
+) -> ConfigFile:
+    """Restricts a configuration to the feeds and database of a shard."""
+    if shard_count == 1:
+        return config.model_copy(update={"shard_index": 0, "shard_count": 1})
+    return config.model_copy(
+        update={
+            "shard_index": shard_index,
+            "shard_count": shard_count,
+            "db_path": shard_db_path(config.db_path, shard_index),
+            "feeds": owned_feeds(config.feeds, shard_index, shard_count),
+        }
+    )
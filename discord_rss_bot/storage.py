@@ -0,0 +1,682 @@
+"""
+Direct SQLite access to the reader database.
+
+The `reader` library only exposes per-entry writes, each committed in its
+own transaction. This module provides the bulk operations the bot needs,
+executed on a plain `sqlite3` connection to the same database file so that
+a whole batch commits in a single write transaction. It also keeps the
+bot's own tables (fetch statistics, the outbox, the seen-set of posted
+links, tombstones of pruned entries, the entries each feed lists) next to
+reader's, and the database maintenance commands. Each executor thread
+keeps one connection open (see `ThreadConnections`). Unread entries are
+read back as slim records, paged from SQLite, instead of full `reader`
+entries.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import (
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+# Seconds to wait for the SQLite write lock before giving up
+BUSY_TIMEOUT = 30.0
+# Maximum number of bound parameters per IN (...) lookup
+LOOKUP_CHUNK = 500
+
+# Fetch statistics older than this are dropped when new ones are stored
+FETCH_STATS_RETENTION = timedelta(days=30)
+# Undeliverable messages are kept this long for inspection
+DEAD_LETTER_RETENTION = timedelta(days=30)
+
+# Unread entries fetched from SQLite at a time when streaming them
+UNREAD_PAGE_SIZE = 256
+# Sort keys of reader's "recent" order, newest first (see its
+# entries_by_recent index)
+RECENT_ORDER = (
+    "recent_sort",
+    "coalesce(published, updated, first_updated)",
+    "feed",
+    "last_updated",
+    "- feed_order",
+    "id",
+)
+
+# Pages returned to the file system per incremental vacuum step
+VACUUM_PAGES = 2000
+# Rows sampled per index by ANALYZE, bounding its cost on large tables
+ANALYSIS_LIMIT = 1000
+
+EntryKey = Tuple[str, str]
+# Outbox row: feed URL, channel ID, entry IDs and embeds (both JSON)
+OutboxRow = Tuple[str, str, str, str]
+
+
+class FetchRecord(NamedTuple):
+    """Outcome of retrieving a single feed."""
+
+    feed_url: str
+    fetched_at: str
+    status: Optional[int]  # None if no HTTP response was received
+    bytes: int
+    latency: float  # Seconds until the response headers arrived
+    conditional: bool  # Sent with If-None-Match or If-Modified-Since
+    new_entries: int
+    error: bool
+
+
+class FeedFetchReport(NamedTuple):
+    """Fetch statistics of a single feed, aggregated over a period."""
+
+    feed_url: str
+    fetches: int
+    not_modified: int
+    conditional: int
+    errors: int
+    bytes: int
+    avg_latency: float
+    max_latency: float
+    new_entries: int
+
+
+class DeliveryEntry(NamedTuple):
+    """
+    The fields of an unread entry that formatting, filtering and marking
+    as read need. The content is not loaded, and the summary only as far
+    as it is rendered.
+    """
+
+    id: str
+    feed_url: str
+    title: Optional[str]
+    link: Optional[str]
+    author: Optional[str]
+    published: Optional[datetime]
+    added: datetime
+    summary: Optional[str]
+
+
+class DatabaseSize(NamedTuple):
+    """Size of the database files, in bytes."""
+
+    file: int
+    free: int  # Unused pages inside the file
+    wal: int
+
+
+def connect(db_path: str, check_same_thread: bool = True) -> sqlite3.Connection:
+    """Opens a connection to the reader database."""
+    return sqlite3.connect(
+        db_path, timeout=BUSY_TIMEOUT, check_same_thread=check_same_thread
+    )
+
+
+class ThreadConnections:
+    """
+    One connection to the reader database per thread, opened on first use
+    and kept open, so the executor threads do not open one per task.
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self._local = threading.local()
+        self._opened: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        """Returns the calling thread's connection."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            # Only used by its thread, but closed by the one shutting down
+            db = self._local.db = connect(self.db_path, check_same_thread=False)
+            with self._lock:
+                self._opened.append(db)
+        return db
+
+    def close(self) -> None:
+        """Closes every connection, once their threads are done."""
+        with self._lock:
+            for db in self._opened:
+                db.close()
+            self._opened.clear()
+        self._local = threading.local()
+
+
+def utcnow() -> str:
+    """Returns the current time in the format reader stores timestamps."""
+    return datetime.now(timezone.utc).replace(tzinfo=None).isoformat(" ")
+
+
+def _timestamp(value: str) -> datetime:
+    """Converts a reader timestamp to an aware UTC datetime."""
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc)
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def unread_entries(
+    db: sqlite3.Connection,
+    summary_chars: int,
+    feed_url: Optional[str] = None,
+    limit: Optional[int] = None,
+    oldest: bool = False,
+) -> Iterator[DeliveryEntry]:
+    """
+    Streams the unread entries of a feed, or of all feeds, in reader's
+    "recent" order: newest first, or the `oldest` first. Rows are fetched
+    a page at a time and summaries are cut to `summary_chars` by SQLite,
+    so only one page of slim records is held at once.
+    """
+    direction = "ASC" if oldest else "DESC"
+    order = ", ".join(f"{key} {direction}" for key in RECENT_ORDER)
+    params: List[object] = [summary_chars]
+    where = "NOT read"
+    if feed_url is not None:
+        where += " AND feed = ?"
+        params.append(feed_url)
+    cursor = db.execute(
+        "SELECT id, feed, title, link, author, published, first_updated, "
+        f"substr(summary, 1, ?) FROM entries WHERE {where} "
+        f"ORDER BY {order} LIMIT ?;",
+        (*params, -1 if limit is None else limit),
+    )
+    while True:
+        rows = cursor.fetchmany(UNREAD_PAGE_SIZE)
+        if not rows:
+            return
+        for row in rows:
+            published, added = row[5], row[6]
+            yield DeliveryEntry(
+                *row[:5],
+                _timestamp(published) if published else None,
+                _timestamp(added),
+                row[7],
+            )
+
+
+def count_unread(db: sqlite3.Connection, feed_url: str) -> int:
+    """Returns the number of unread entries of a feed."""
+    return db.execute(
+        "SELECT COUNT(*) FROM entries WHERE feed = ? AND NOT read;",
+        (feed_url,),
+    ).fetchone()[0]
+
+
+def mark_entries_read(
+    db: sqlite3.Connection, entries: Iterable[EntryKey]
+) -> List[EntryKey]:
+    """
+    Marks (feed URL, entry id) pairs as read in one transaction.
+    Returns the pairs that did not match any stored entry.
+    """
+    with db:
+        return _mark_read(db, entries)
+
+
+def _mark_read(
+    db: sqlite3.Connection, entries: Iterable[EntryKey]
+) -> List[EntryKey]:
+    """Marks entries as read within the caller's transaction."""
+    modified = utcnow()
+    missing = []
+    for feed_url, entry_id in entries:
+        cursor = db.execute(
+            "UPDATE entries SET read = 1, read_modified = ? "
+            "WHERE feed = ? AND id = ?;",
+            (modified, feed_url, entry_id),
+        )
+        if cursor.rowcount != 1:
+            missing.append((feed_url, entry_id))
+    return missing
+
+
+def mark_feed_read(
+    db: sqlite3.Connection, feed_url: str, added_until: Optional[str] = None
+) -> int:
+    """
+    Marks all unread entries of a feed as read in one transaction, or only
+    those added no later than `added_until` (a reader timestamp).
+    """
+    with db:
+        cursor = db.execute(
+            "UPDATE entries SET read = 1, read_modified = ? "
+            "WHERE feed = ? AND read = 0 "
+            "AND (? IS NULL OR first_updated <= ?);",
+            (utcnow(), feed_url, added_until, added_until),
+        )
+    return cursor.rowcount
+
+
+def stagger_updates(db: sqlite3.Connection, window: timedelta) -> int:
+    """
+    Spreads the next update of every feed that is due (or was never
+    updated) evenly over the window, in one transaction. Feeds are ordered
+    by a hash of their URL, so feeds of the same site are not clustered.
+    Returns the number of feeds rescheduled.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = db.execute(
+        "SELECT url FROM feeds WHERE updates_enabled = 1 "
+        "AND (update_after IS NULL OR update_after <= ?);",
+        (now.isoformat(" "),),
+    )
+    urls = sorted(
+        (url for (url,) in rows),
+        key=lambda url: hashlib.sha1(url.encode()).digest(),
+    )
+    with db:
+        db.executemany(
+            "UPDATE feeds SET update_after = ? WHERE url = ?;",
+            (
+                ((now + window * index / len(urls)).isoformat(" "), url)
+                for index, url in enumerate(urls)
+            ),
+        )
+    return len(urls)
+
+
+def create_fetch_stats(db: sqlite3.Connection) -> None:
+    """Creates the fetch statistics table if needed."""
+    with db:
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS fetch_stats ("
+            "feed_url TEXT NOT NULL, fetched_at TEXT NOT NULL, "
+            "status INTEGER, bytes INTEGER NOT NULL, latency REAL NOT NULL, "
+            "conditional INTEGER NOT NULL, new_entries INTEGER NOT NULL, "
+            "error INTEGER NOT NULL);"
+        )
+        db.execute(
+            "CREATE INDEX IF NOT EXISTS fetch_stats_by_time "
+            "ON fetch_stats (fetched_at);"
+        )
+
+
+def record_fetches(
+    db: sqlite3.Connection, records: Iterable[FetchRecord]
+) -> None:
+    """Stores fetch records and drops expired ones in one transaction."""
+    expired = (
+        datetime.now(timezone.utc).replace(tzinfo=None) - FETCH_STATS_RETENTION
+    ).isoformat(" ")
+    with db:
+        db.executemany(
+            "INSERT INTO fetch_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?);", records
+        )
+        db.execute("DELETE FROM fetch_stats WHERE fetched_at < ?;", (expired,))
+
+
+def fetch_report(
+    db: sqlite3.Connection, since: timedelta
+) -> List[FeedFetchReport]:
+    """Aggregates the fetch statistics of each feed over a period."""
+    start = (datetime.now(timezone.utc).replace(tzinfo=None) - since).isoformat(
+        " "
+    )
+    rows = db.execute(
+        "SELECT feed_url, COUNT(*), SUM(status = 304), SUM(conditional), "
+        "SUM(error), SUM(bytes), AVG(latency), MAX(latency), "
+        "SUM(new_entries) FROM fetch_stats WHERE fetched_at >= ? "
+        "GROUP BY feed_url;",
+        (start,),
+    )
+    return [FeedFetchReport(*row) for row in rows]
+
+
+def create_outbox(db: sqlite3.Connection) -> None:
+    """Creates the outbox table if needed."""
+    with db:
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS outbox ("
+            "id INTEGER PRIMARY KEY, feed_url TEXT NOT NULL, "
+            "channel_id TEXT NOT NULL, entry_ids TEXT NOT NULL, "
+            "embeds TEXT NOT NULL, attempts INTEGER NOT NULL DEFAULT 0, "
+            "next_attempt REAL NOT NULL);"
+        )
+        db.execute(
+            "CREATE INDEX IF NOT EXISTS outbox_by_next_attempt "
+            "ON outbox (next_attempt);"
+        )
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS dead_letters ("
+            "id INTEGER PRIMARY KEY, feed_url TEXT NOT NULL, "
+            "channel_id TEXT NOT NULL, entry_ids TEXT NOT NULL, "
+            "embeds TEXT NOT NULL, attempts INTEGER NOT NULL, "
+            "reason TEXT NOT NULL, failed_at REAL NOT NULL);"
+        )
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def enqueue_messages(
+    db: sqlite3.Connection,
+    rows: Sequence[OutboxRow],
+    seen: Sequence[Sequence[bytes]],
+    entries: Iterable[EntryKey],
+    now: float,
+    seen_after: float = 0.0,
+) -> List[Optional[int]]:
+    """
+    Stores messages in the outbox and marks their entries as read, in one
+    transaction. The `seen` keys of each message are added to the seen-set
+    of its channel, held by the message until it is delivered; a message
+    whose keys were all seen since `seen_after` is not stored. Returns the
+    ID of each stored message, None if suppressed.
+    """
+    ids: List[Optional[int]] = []
+    with db:
+        for row, keys in zip(rows, seen):
+            message_id = db.execute(
+                "INSERT INTO outbox (feed_url, channel_id, entry_ids, "
+                "embeds, next_attempt) VALUES (?, ?, ?, ?, ?);",
+                (*row, now),
+            ).lastrowid
+            added = sum(
+                db.execute(
+                    "INSERT INTO seen (channel_id, key, seen_at, message_id) "
+                    "VALUES (?, ?, ?, ?) ON CONFLICT DO UPDATE SET "
+                    "seen_at = excluded.seen_at, "
+                    "message_id = excluded.message_id WHERE seen_at < ?;",
+                    (row[1], key, now, message_id, seen_after),
+                ).rowcount
+                for key in keys
+            )
+            if keys and not added:
+                db.execute("DELETE FROM outbox WHERE id = ?;", (message_id,))
+                ids.append(None)
+                continue
+            ids.append(message_id)
+        _mark_read(db, entries)
+    return ids
+
+
+def ack_message(db: sqlite3.Connection, message_id: int) -> None:
+    """Removes a delivered message from the outbox."""
+    with db:
+        db.execute("DELETE FROM outbox WHERE id = ?;", (message_id,))
+        # Its seen keys are kept for good, outbox IDs may be reused
+        db.execute(
+            "UPDATE seen SET message_id = NULL WHERE message_id = ?;",
+            (message_id,),
+        )
+
+
+def retry_message(
+    db: sqlite3.Connection, message_id: int, attempts: int, next_attempt: float
+) -> None:
+    """Records a failed delivery attempt and when to try again."""
+    with db:
+        db.execute(
+            "UPDATE outbox SET attempts = ?, next_attempt = ? WHERE id = ?;",
+            (attempts, next_attempt, message_id),
+        )
+
+
+def dead_letter_message(
+    db: sqlite3.Connection,
+    message_id: int,
+    attempts: int,
+    reason: str,
+    now: float,
+) -> None:
+    """
+    Moves an undeliverable message from the outbox to the dead letters,
+    forgets the seen keys it held, so its entries can still be posted by
+    another feed, and drops expired dead letters, in one transaction.
+    """
+    with db:
+        db.execute(
+            "INSERT OR REPLACE INTO dead_letters SELECT id, feed_url, "
+            "channel_id, entry_ids, embeds, ?, ?, ? FROM outbox WHERE id = ?;",
+            (attempts, reason, now, message_id),
+        )
+        db.execute("DELETE FROM outbox WHERE id = ?;", (message_id,))
+        db.execute("DELETE FROM seen WHERE message_id = ?;", (message_id,))
+        db.execute(
+            "DELETE FROM dead_letters WHERE failed_at < ?;",
+            (now - DEAD_LETTER_RETENTION.total_seconds(),),
+        )
+
+
+def due_messages(
+    db: sqlite3.Connection, now: float, limit: int
+) -> List[Tuple[int, str, str, str, str, int]]:
+    """Returns the oldest messages due for a delivery attempt."""
+    return db.execute(
+        "SELECT id, feed_url, channel_id, entry_ids, embeds, attempts "
+        "FROM outbox WHERE next_attempt <= ? ORDER BY id LIMIT ?;",
+        (now, limit),
+    ).fetchall()
+
+
+def next_outbox_attempt(db: sqlite3.Connection) -> Optional[float]:
+    """Returns when the next message in the outbox is due, if any."""
+    return db.execute("SELECT MIN(next_attempt) FROM outbox;").fetchone()[0]
+
+
+def create_seen(db: sqlite3.Connection) -> None:
+    """
+    Creates the seen-set table if needed. `message_id` is the outbox
+    message holding a key until it is delivered.
+    """
+    with db:
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS seen ("
+            "channel_id TEXT NOT NULL, key BLOB NOT NULL, "
+            "seen_at REAL NOT NULL, message_id INTEGER, "
+            "PRIMARY KEY (channel_id, key)) WITHOUT ROWID;"
+        )
+        columns = {row[1] for row in db.execute("PRAGMA table_info(seen);")}
+        if "message_id" not in columns:
+            db.execute("ALTER TABLE seen ADD COLUMN message_id INTEGER;")
+        db.execute("CREATE INDEX IF NOT EXISTS seen_by_time ON seen (seen_at);")
+        db.execute(
+            "CREATE INDEX IF NOT EXISTS seen_by_message ON seen (message_id) "
+            "WHERE message_id IS NOT NULL;"
+        )
+
+
+def seen_keys(
+    db: sqlite3.Connection,
+    channel_id: str,
+    keys: Sequence[bytes],
+    seen_after: float,
+) -> Set[bytes]:
+    """Returns the keys posted to a channel since `seen_after`."""
+    found: Set[bytes] = set()
+    for start in range(0, len(keys), LOOKUP_CHUNK):
+        chunk = keys[start : start + LOOKUP_CHUNK]
+        found.update(
+            key
+            for (key,) in db.execute(
+                "SELECT key FROM seen WHERE channel_id = ? AND seen_at >= ? "
+                f"AND key IN ({', '.join('?' * len(chunk))});",
+                (channel_id, seen_after, *chunk),
+            )
+        )
+    return found
+
+
+def prune_seen(db: sqlite3.Connection, seen_before: float) -> int:
+    """Forgets keys posted before `seen_before`; returns how many."""
+    with db:
+        return db.execute(
+            "DELETE FROM seen WHERE seen_at < ?;", (seen_before,)
+        ).rowcount
+
+
+def create_pruned(db: sqlite3.Connection) -> None:
+    """
+    Creates the tombstone table of pruned entries if needed, with a trigger
+    marking a pruned entry as read if its feed adds it again.
+    """
+    with db:
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS pruned_entries ("
+            "feed TEXT NOT NULL, id TEXT NOT NULL, pruned_at TEXT NOT NULL, "
+            "PRIMARY KEY (feed, id)) WITHOUT ROWID;"
+        )
+        db.execute(
+            "CREATE TRIGGER IF NOT EXISTS pruned_entry_added "
+            "AFTER INSERT ON entries WHEN EXISTS ("
+            "SELECT 1 FROM pruned_entries WHERE feed = NEW.feed AND id = NEW.id"
+            ") BEGIN "
+            "UPDATE entries SET read = 1, read_modified = NEW.last_updated "
+            "WHERE feed = NEW.feed AND id = NEW.id; "
+            "DELETE FROM pruned_entries WHERE feed = NEW.feed AND id = NEW.id; "
+            "END;"
+        )
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS feed_listings ("
+            "feed TEXT PRIMARY KEY NOT NULL, entry_ids TEXT NOT NULL);"
+        )
+
+
+def record_listing(
+    db: sqlite3.Connection, feed_url: str, entry_ids: Iterable[str]
+) -> None:
+    """
+    Stores the ids of the entries a feed lists in its latest parse, as a
+    JSON array replacing the previous listing.
+    """
+    with db:
+        db.execute(
+            "INSERT OR REPLACE INTO feed_listings VALUES (?, ?);",
+            (feed_url, json.dumps(list(entry_ids))),
+        )
+
+
+# pylint: disable-next=too-many-arguments,too-many-positional-arguments
+def prune_entries(
+    db: sqlite3.Connection,
+    feed_url: str,
+    added_before: Optional[str],
+    keep: Optional[int],
+    limit: int,
+) -> int:
+    """
+    Deletes up to `limit` read entries of a feed, in one transaction: those
+    added before `added_before` (a reader timestamp) and those beyond the
+    newest `keep` entries. Entries the feed still lists are kept, and
+    nothing is deleted before a listing of the feed was recorded (see
+    `record_listing`). A tombstone is kept for each. Returns how many
+    entries were deleted.
+    """
+    conditions = []
+    params: List[object] = [feed_url]
+    if added_before is not None:
+        conditions.append("first_updated < ?")
+        params.append(added_before)
+    if keep is not None:
+        conditions.append(
+            "rowid NOT IN (SELECT rowid FROM entries WHERE feed = ? "
+            "ORDER BY recent_sort DESC LIMIT ?)"
+        )
+        params += [feed_url, keep]
+    if not conditions:
+        return 0
+    pruned_at = utcnow()
+    # Deleting an entry deletes its tags
+    db.execute("PRAGMA foreign_keys = ON;")
+    with db:
+        rows = db.execute(
+            "SELECT rowid, id FROM entries WHERE feed = ? AND read = 1 "
+            f"AND ({' OR '.join(conditions)}) "
+            "AND EXISTS (SELECT 1 FROM feed_listings WHERE feed = ?) "
+            "AND id NOT IN (SELECT value FROM feed_listings, "
+            "json_each(feed_listings.entry_ids) WHERE feed = ?) "
+            "LIMIT ?;",
+            (*params, feed_url, feed_url, limit),
+        ).fetchall()
+        db.executemany(
+            "INSERT OR REPLACE INTO pruned_entries VALUES (?, ?, ?);",
+            ((feed_url, entry_id, pruned_at) for _, entry_id in rows),
+        )
+        db.executemany(
+            "DELETE FROM entries WHERE rowid = ?;",
+            ((rowid,) for rowid, _ in rows),
+        )
+    return len(rows)
+
+
+def prune_tombstones(db: sqlite3.Connection) -> int:
+    """
+    Drops the tombstones of entries their feed no longer lists: the feed
+    was updated since they were pruned without adding them again, or it
+    was removed. Drops the listings of removed feeds too. Returns how many
+    tombstones were dropped.
+    """
+    with db:
+        db.execute(
+            "DELETE FROM feed_listings WHERE feed NOT IN (SELECT url FROM feeds);"
+        )
+        return db.execute(
+            "DELETE FROM pruned_entries "
+            "WHERE feed NOT IN (SELECT url FROM feeds) OR pruned_at < ("
+            "SELECT last_updated FROM feeds WHERE url = pruned_entries.feed);"
+        ).rowcount
+
+
+def incremental_vacuum_enabled(db: sqlite3.Connection) -> bool:
+    """Whether the database returns free pages with incremental vacuum."""
+    (mode,) = db.execute("PRAGMA auto_vacuum;").fetchone()
+    return mode == 2
+
+
+def enable_incremental_vacuum(db: sqlite3.Connection) -> bool:
+    """
+    Switches the database to incremental vacuum if needed, which rewrites
+    the whole file once and blocks every other connection meanwhile; meant
+    to be run while the bot is stopped. Returns whether it was switched.
+    """
+    if incremental_vacuum_enabled(db):
+        return False
+    db.execute("PRAGMA auto_vacuum = INCREMENTAL;")
+    db.execute("VACUUM;")
+    return True
+
+
+def incremental_vacuum(
+    db: sqlite3.Connection, pages: int = VACUUM_PAGES
+) -> int:
+    """
+    Returns up to `pages` free pages to the file system. Returns how many
+    free pages are left.
+    """
+    db.execute(f"PRAGMA incremental_vacuum({int(pages)});").fetchall()
+    return db.execute("PRAGMA freelist_count;").fetchone()[0]
+
+
+def analyze(db: sqlite3.Connection) -> None:
+    """Refreshes the statistics the query planner uses."""
+    db.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT};")
+    db.execute("ANALYZE;")
+
+
+def checkpoint(db: sqlite3.Connection) -> bool:
+    """
+    Copies the write-ahead log into the database and truncates it.
+    Returns False if readers kept it from completing.
+    """
+    busy, _, _ = db.execute("PRAGMA wal_checkpoint(TRUNCATE);").fetchone()
+    return not busy
+
+
+def database_size(db: sqlite3.Connection, db_path: str) -> DatabaseSize:
+    """Returns the size of the database file, its free pages and its WAL."""
+    (page_size,) = db.execute("PRAGMA page_size;").fetchone()
+    (pages,) = db.execute("PRAGMA page_count;").fetchone()
+    (free,) = db.execute("PRAGMA freelist_count;").fetchone()
+    try:
+        wal = os.path.getsize(f"{db_path}-wal")
+    except OSError:
+        wal = 0
+    return DatabaseSize(pages * page_size, free * page_size, wal)
@@ -4,17 +4,26 @@ Utility functions for the bot application.
 This module provides:
 - Configuration loading and validation.
 - Argument parsing for command-line execution.
-- Environment variable handling for the bot token.
+- Environment variable handling for the bot token and shard.
+- The fetch statistics report command.
+- Cancellation of background tasks.
 """
 
 import argparse
+import asyncio
 import os
 import logging
+import sqlite3
 import sys
+from contextlib import closing
+from datetime import timedelta
+from typing import Any, Callable, List, Optional
 
 import yaml
 from pydantic import ValidationError
+from discord_rss_bot import storage
 from discord_rss_bot.models import ConfigFile
+from discord_rss_bot.sharding import shard_config
 
 
 def get_bot_token(args: argparse.Namespace) -> str:
@@ -31,14 +40,60 @@ def get_bot_token(args: argparse.Namespace) -> str:
     raise ValueError("Bot token was not provided.")
 
 
+def get_shard(args: argparse.Namespace, config: ConfigFile) -> ConfigFile:
+    """
+    Restricts the configuration to this replica's shard, taken from the
+    arguments, the environment or the config file, in that order.
+    """
+    index_sources = [args.shard_index, os.getenv("SHARD_INDEX")]
+    count_sources = [args.shard_count, os.getenv("SHARD_COUNT")]
+    index = next(
+        (int(i) for i in index_sources if i not in (None, "")),
+        config.shard_index,
+    )
+    count = next(
+        (int(c) for c in count_sources if c not in (None, "")),
+        config.shard_count,
+    )
+    if not 0 <= index < count:
+        raise ValueError(f"Invalid shard {index} of {count}.")
+
+    config = shard_config(config, index, count)
+    if count > 1:
+        logging.info(
+            "Running shard %d of %d with %d feeds (%s)",
+            index,
+            count,
+            len(config.feeds),
+            config.db_path,
+        )
+    return config
+
+
+async def cancel_task(task: Optional["asyncio.Task[Any]"]) -> None:
+    """Cancels a background task and waits for it to finish."""
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def read_config(config_path: str) -> ConfigFile:
+    """Read and validate the config file, raising on errors."""
+    with open(config_path, "r", encoding="utf-8") as f:
+        config_data = yaml.safe_load(f)
+        return ConfigFile(**config_data)
+
+
 def load_config(config_path: str) -> ConfigFile:
     """Load the config file."""
     logging.info("Loading configuration from %s", config_path)
 
     try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            config_data = yaml.safe_load(f)
-            return ConfigFile(**config_data)
+        return read_config(config_path)
 
     except FileNotFoundError:
         logging.error("Configuration file not found at: %s", config_path)
@@ -71,10 +126,98 @@ def get_arguments() -> argparse.Namespace:
         required=False,
         default="config.yaml",
     )
+    parser.add_argument(
+        "--shard-index",
+        type=int,
+        help="Index of this replica's shard (overrides env. variable).",
+        required=False,
+    )
+    parser.add_argument(
+        "--shard-count",
+        type=int,
+        help="Number of shards (overrides env. variable).",
+        required=False,
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
         help="Should we run the bot in debug mode?",
         required=False,
     )
+    subparsers = parser.add_subparsers(dest="command")
+    report = subparsers.add_parser(
+        "report",
+        help="Print the feeds costing the most bandwidth and latency.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    report.add_argument(
+        "--days",
+        type=int,
+        default=7,
+        help="Number of days of fetch statistics to include.",
+    )
+    report.add_argument(
+        "--limit",
+        type=int,
+        default=10,
+        help="Number of feeds listed per ranking.",
+    )
+    subparsers.add_parser(
+        "vacuum",
+        help="Switch the database to incremental vacuum, with the bot stopped.",
+    )
     return parser.parse_args()
+
+
+def print_fetch_report(args: argparse.Namespace) -> None:
+    """Prints the feeds with the highest bandwidth and latency."""
+    config = get_shard(args, load_config(args.config))
+    try:
+        with closing(storage.connect(config.db_path)) as db:
+            storage.create_fetch_stats(db)
+            feeds = storage.fetch_report(db, timedelta(days=args.days))
+    except sqlite3.Error as e:
+        logging.error("Error reading fetch statistics: %s", e)
+        sys.exit(1)
+
+    print(f"Fetch statistics of {len(feeds)} feeds, last {args.days} days")
+    _print_ranking("Bandwidth", feeds, lambda feed: feed.bytes, args.limit)
+    _print_ranking("Latency", feeds, lambda feed: feed.avg_latency, args.limit)
+
+
+def vacuum_database(args: argparse.Namespace) -> None:
+    """
+    Switches the database to incremental vacuum, so that maintenance can
+    return the space of pruned entries to the file system.
+    """
+    config = get_shard(args, load_config(args.config))
+    try:
+        with closing(storage.connect(config.db_path)) as db:
+            switched = storage.enable_incremental_vacuum(db)
+    except sqlite3.Error as e:
+        logging.error("Error vacuuming the database: %s", e)
+        sys.exit(1)
+    if switched:
+        print(f"Switched {config.db_path} to incremental vacuum")
+    else:
+        print(f"{config.db_path} already uses incremental vacuum")
+
+
+def _print_ranking(
+    title: str,
+    feeds: List[storage.FeedFetchReport],
+    key: Callable[[storage.FeedFetchReport], float],
+    limit: int,
+) -> None:
+    """Prints the top feeds by the given key as a table."""
+    print(
+        f"\n{title}\n{'fetches':>8} {'cond':>5} {'304':>5} {'errors':>6} "
+        f"{'KiB':>10} {'avg s':>7} {'max s':>7} {'new':>6}  feed"
+    )
+    for feed in sorted(feeds, key=key, reverse=True)[:limit]:
+        print(
+            f"{feed.fetches:>8} {feed.conditional:>5} {feed.not_modified:>5} "
+            f"{feed.errors:>6} {feed.bytes / 1024:>10.1f} "
+            f"{feed.avg_latency:>7.2f} {feed.max_latency:>7.2f} "
+            f"{feed.new_entries:>6}  {feed.feed_url}"
+        )
@@ -0,0 +1,82 @@
+"""
+Webhook delivery: posting to Discord webhooks instead of channels.
+
+Destinations that only need write access can be configured with a
+webhook URL instead of a channel ID, which needs no bot permissions:
+
+  - All webhooks post over one shared aiohttp session. Its connections
+    are pooled, kept alive between messages and limited in total and per
+    host, so a busy backlog reuses a handful of TLS connections.
+  - Webhooks are addressed as `webhook:<id>` in the outbox, the seen-set
+    and the logs; the URL, which holds the webhook's token, only lives
+    in the configuration.
+  - Webhook messages go through the same send scheduler as channel
+    messages, paced and retried the same way.
+  - A deployment whose feeds only post to webhooks never connects to the
+    Discord gateway (see `ConfigFile.needs_gateway`).
+"""
+
+from typing import Dict, Iterable, Optional
+
+import aiohttp
+import discord
+
+from discord_rss_bot.models import FeedConfig
+
+# Seconds an idle pooled connection is kept open
+KEEPALIVE_TIMEOUT = 60.0
+
+
+class WebhookPool:
+    """Webhooks of the configured feeds, sharing one HTTP session."""
+
+    def __init__(self, connections: int, connections_per_host: int) -> None:
+        self.connections = connections
+        self.connections_per_host = connections_per_host
+        self.urls: Dict[str, str] = {}
+        self.webhooks: Dict[str, discord.Webhook] = {}
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    def configure(self, feeds: Iterable[FeedConfig]) -> None:
+        """Registers the webhooks of the configured feeds."""
+        urls = {
+            target.destination: target.webhook_url
+            for feed in feeds
+            for target in feed.targets
+            if target.webhook_url is not None
+        }
+        # Webhooks whose URL changed are created again
+        self.webhooks = {
+            destination: webhook
+            for destination, webhook in self.webhooks.items()
+            if urls.get(destination) == self.urls.get(destination)
+        }
+        self.urls = urls
+
+    def get(self, destination: str) -> Optional[discord.Webhook]:
+        """Returns a configured webhook, None if it is not configured."""
+        webhook = self.webhooks.get(destination)
+        if webhook is not None:
+            return webhook
+        url = self.urls.get(destination)
+        if url is None:
+            return None
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.connections,
+                    limit_per_host=self.connections_per_host,
+                    keepalive_timeout=KEEPALIVE_TIMEOUT,
+                )
+            )
+        webhook = self.webhooks[destination] = discord.Webhook.from_url(
+            url, session=self.session
+        )
+        return webhook
+
+    async def close(self) -> None:
+        """Closes the shared session and its connections."""
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+        self.webhooks.clear()
@@ -0,0 +1,62 @@
+"""Shared fixtures of the unit tests."""
+
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timezone
+from typing import Callable, Iterator, Optional
+
+import pytest
+from reader import Reader, make_reader
+
+from discord_rss_bot import storage
+from discord_rss_bot.storage import DeliveryEntry
+
+FEED_URL = "http://example.com/feed.xml"
+
+
+def _make_entry(
+    entry_id: str = "entry",
+    title: Optional[str] = "Title",
+    link: Optional[str] = "https://example.com/post",
+    summary: Optional[str] = None,
+    author: Optional[str] = None,
+    feed_url: str = FEED_URL,
+) -> DeliveryEntry:
+    """Builds a delivery entry with sensible defaults."""
+    return DeliveryEntry(
+        entry_id,
+        feed_url,
+        title,
+        link,
+        author,
+        None,
+        datetime(2024, 1, 1, tzinfo=timezone.utc),
+        summary,
+    )
+
+
+@pytest.fixture
+def make_entry() -> Callable[..., DeliveryEntry]:
+    """Factory of delivery entries."""
+    return _make_entry
+
+
+@pytest.fixture
+def rss_reader(tmp_path) -> Iterator[Reader]:
+    """A real reader database holding one feed without entries."""
+    reader = make_reader(str(tmp_path / "db.sqlite"))
+    reader.add_feed(FEED_URL)
+    yield reader
+    reader.close()
+
+
+@pytest.fixture
+def db(rss_reader: Reader, tmp_path) -> Iterator[sqlite3.Connection]:
+    """A connection to the reader database, with the bot's tables."""
+    del rss_reader  # Only needed to create the database first
+    with closing(storage.connect(str(tmp_path / "db.sqlite"))) as connection:
+        storage.create_fetch_stats(connection)
+        storage.create_outbox(connection)
+        storage.create_seen(connection)
+        storage.create_pruned(connection)
+        yield connection
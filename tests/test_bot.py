@@ -0,0 +1,257 @@
+"""Tests of the bot's feed checks, outbox delivery and configuration reload."""
+
+import asyncio
+import contextlib
+from contextlib import closing
+from types import SimpleNamespace
+from typing import AsyncIterator, Dict, List, Tuple
+
+import discord
+import pytest
+from reader.types import UpdatedFeed, UpdateResult
+
+from discord_rss_bot import storage
+from discord_rss_bot.bot import DiscordBot
+from discord_rss_bot.models import ConfigFile, FeedConfig
+from discord_rss_bot.outbox import PendingMessage
+from discord_rss_bot.rss import RSSReader
+
+UPDATED = "http://example.com/updated.xml"
+UNCHANGED = "http://example.com/unchanged.xml"
+ADDED = "http://example.com/added.xml"
+
+
+class FakeChannel:
+    """Channel whose sends raise the given errors in turn, then succeed."""
+
+    def __init__(self, *errors: BaseException) -> None:
+        self.errors = list(errors)
+        self.sent: list = []
+
+    async def send(self, **kwargs) -> None:
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(kwargs)
+
+    @property
+    def links(self) -> List[str]:
+        """Links of the entries posted to the channel."""
+        return [
+            embed.url
+            for message in self.sent
+            for embed in message.get("embeds", [message.get("embed")])
+        ]
+
+
+def http_error(status: int) -> discord.HTTPException:
+    """An error answer of Discord with the given status."""
+    response = SimpleNamespace(status=status, reason="Error")
+    return discord.HTTPException(response, "error")  # type: ignore[arg-type]
+
+
+def feeds(*channels: Tuple[str, int]) -> List[FeedConfig]:
+    """Feed configurations posting each feed URL to a channel."""
+    return [
+        FeedConfig(feed_url=feed_url, channel_id=channel_id)
+        for feed_url, channel_id in channels
+    ]
+
+
+@contextlib.asynccontextmanager
+async def running_bot(
+    tmp_path, **settings
+) -> AsyncIterator[Tuple[DiscordBot, Dict[int, FakeChannel]]]:
+    """A bot of two feeds posting to channels 100 and 101, without Discord."""
+    config = ConfigFile(
+        db_path=str(tmp_path / "db.sqlite"),
+        feeds=feeds((UPDATED, 100), (UNCHANGED, 101)),
+        **settings,
+    )
+    bot = DiscordBot(RSSReader(config), intents=discord.Intents.default())
+    channels = {100: FakeChannel(), 101: FakeChannel()}
+    setattr(
+        bot, "_get_channel", lambda channel_id: channels.get(int(channel_id))
+    )
+    await bot.rss_reader.add_feeds()
+    try:
+        yield bot, channels
+    finally:
+        await bot.close()
+
+
+def add_entries(bot: DiscordBot, feed_url: str, *entry_ids: str) -> None:
+    """Stores unread entries of a feed, linking to their ids."""
+    for entry_id in entry_ids:
+        bot.rss_reader.reader.add_entry(
+            {
+                "feed_url": feed_url,
+                "id": entry_id,
+                "title": entry_id,
+                "link": f"https://example.com/{entry_id}",
+            }
+        )
+
+
+def link(entry_id: str) -> str:
+    """Link of an entry added by `add_entries`."""
+    return f"https://example.com/{entry_id}"
+
+
+def query(bot: DiscordBot, sql: str) -> List[tuple]:
+    """Runs a query on the bot's database."""
+    with closing(storage.connect(bot.rss_reader.config.db_path)) as db:
+        return db.execute(sql).fetchall()
+
+
+def fake_updates(*results: UpdateResult):
+    """Replaces the feed updates with the given results."""
+
+    async def update_feeds_iter(scheduled: bool = True):
+        del scheduled
+        for result in results:
+            yield result
+
+    return update_feeds_iter
+
+
+def test_check_delivers_only_updated_feeds(tmp_path):
+    async def check() -> None:
+        async with running_bot(tmp_path) as (bot, channels):
+            add_entries(bot, UPDATED, "a", "b")
+            add_entries(bot, UNCHANGED, "c")
+            setattr(
+                bot.rss_reader,
+                "update_feeds_iter",
+                fake_updates(
+                    UpdateResult(UPDATED, UpdatedFeed(UPDATED, new=2)),
+                    UpdateResult(UNCHANGED, None),
+                ),
+            )
+            bot.backlog_pending = False
+            await bot.check_feeds()
+            assert sorted(channels[100].links) == [link("a"), link("b")]
+            assert not channels[101].links
+
+            # The backlog scan finds the unread entries of other feeds
+            bot.backlog_pending = True
+            await bot.check_feeds()
+            assert len(channels[100].links) == 2
+            assert channels[101].links == [link("c")]
+            assert not bot.backlog_pending
+
+    asyncio.run(check())
+
+
+def test_check_sends_the_messages_left_in_the_outbox(tmp_path, make_entry):
+    async def check() -> None:
+        async with running_bot(tmp_path) as (bot, channels):
+            embed = discord.Embed(url=link("left"))
+            await bot.outbox.enqueue(
+                UPDATED,
+                [PendingMessage("100", [make_entry("left")], [embed])],
+                [],
+            )
+            setattr(bot.rss_reader, "update_feeds_iter", fake_updates())
+            bot.backlog_pending = False
+            await bot.check_feeds()
+            assert channels[100].links == [link("left")]
+            assert not query(bot, "SELECT * FROM outbox;")
+
+    asyncio.run(check())
+
+
+async def enqueue(bot: DiscordBot, channel_id: str, entry):
+    """Stores a message of one entry in the outbox."""
+    [message] = await bot.outbox.enqueue(
+        UPDATED,
+        [PendingMessage(channel_id, [entry], [discord.Embed(url=link("x"))])],
+        [],
+    )
+    return message
+
+
+def test_failed_sends_are_retried_until_dead_lettered(tmp_path, make_entry):
+    async def send() -> None:
+        async with running_bot(tmp_path, outbox_max_attempts=2) as (
+            bot,
+            channels,
+        ):
+            channels[100] = FakeChannel(OSError("down"), OSError("down"))
+            message = await enqueue(bot, "100", make_entry())
+
+            assert not await bot._send_message(message)
+            assert query(bot, "SELECT attempts FROM outbox;") == [(1,)]
+            assert not query(bot, "SELECT * FROM dead_letters;")
+
+            assert not await bot._send_message(message._replace(attempts=1))
+            assert not query(bot, "SELECT * FROM outbox;")
+            assert query(bot, "SELECT reason, attempts FROM dead_letters;") == [
+                ("too many attempts", 2)
+            ]
+            assert not channels[100].sent
+
+    asyncio.run(send())
+
+
+@pytest.mark.parametrize(
+    "channel_id, errors, reason",
+    [("100", [http_error(403)], "rejected"), ("999", [], "not configured")],
+)
+def test_undeliverable_messages_are_dead_lettered_at_once(
+    tmp_path, make_entry, channel_id, errors, reason
+):
+    async def send() -> None:
+        async with running_bot(tmp_path) as (bot, channels):
+            channels[int(channel_id)] = FakeChannel(*errors)
+            message = await enqueue(bot, channel_id, make_entry())
+
+            assert not await bot._send_message(message)
+            assert not query(bot, "SELECT * FROM outbox;")
+            assert query(bot, "SELECT reason FROM dead_letters;") == [(reason,)]
+            assert not channels[int(channel_id)].sent
+
+    asyncio.run(send())
+
+
+def test_delivered_messages_are_acknowledged(tmp_path, make_entry):
+    async def send() -> None:
+        async with running_bot(tmp_path) as (bot, channels):
+            message = await enqueue(bot, "100", make_entry())
+            assert await bot._send_message(message)
+            assert channels[100].links == [link("x")]
+            assert not query(bot, "SELECT * FROM outbox;")
+
+    asyncio.run(send())
+
+
+def test_reload_applies_only_the_feed_changes(tmp_path):
+    async def reload() -> None:
+        async with running_bot(tmp_path) as (bot, _):
+            config = bot.rss_reader.config.model_copy(
+                update={"feeds": feeds((UPDATED, 102), (ADDED, 101))}
+            )
+            await bot.reload_config(config)
+
+            assert await bot.rss_reader.feed_manager.get_existing_feeds() == {
+                UPDATED,
+                ADDED,
+            }
+            assert bot.destinations == {"101", "102"}
+            assert bot.rss_reader.config.feeds == config.feeds
+            # Added feeds are due at once
+            update_after = await bot.rss_reader.get_update_after()
+            assert update_after[ADDED] is None
+
+    asyncio.run(reload())
+
+
+def test_reload_without_feed_changes_keeps_the_config(tmp_path):
+    async def reload() -> None:
+        async with running_bot(tmp_path) as (bot, _):
+            current = bot.rss_reader.config
+            await bot.reload_config(
+                current.model_copy(update={"delivery_workers": 8})
+            )
+            assert bot.rss_reader.config is current
+
+    asyncio.run(reload())
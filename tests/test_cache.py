@@ -0,0 +1,49 @@
+"""Tests of the rendered summary cache."""
+
+import threading
+
+from discord_rss_bot.cache import SummaryCache
+
+
+def in_thread(func, *args):
+    """Runs a function in another thread, as the bot's executor does."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(func(*args)))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_memory_tier_evicts_the_oldest_values():
+    cache = SummaryCache(max_bytes=10)
+    cache.put("a", ("aaaaa", []))
+    cache.put("b", ("bbbbb", []))
+    cache.put("c", ("ccccc", []))
+
+    assert cache.get("a") is None
+    assert cache.get("c") == ("ccccc", [])
+
+
+def test_disk_tier_is_read_in_batches_off_the_loop(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = SummaryCache(1000, path)
+    cache.put("a", ("A", ["http://example.com/a.png"]))
+    cache.put("b", ("B", []))
+    in_thread(cache.store, cache.take_pending())
+    cache.close()
+
+    reopened = SummaryCache(1000, path)
+    keys = reopened.missing(["a", "b", "c", "a"])
+    assert keys == ["a", "b", "c"]
+    loaded = in_thread(reopened.get_many, keys)
+    assert loaded == {"a": ("A", ["http://example.com/a.png"]), "b": ("B", [])}
+
+    reopened.add_loaded(loaded)
+    assert reopened.missing(["a", "b", "c"]) == ["c"]
+    assert reopened.get("a") == ("A", ["http://example.com/a.png"])
+    assert reopened.stats()["disk_hits"] == 2
+    reopened.close()
+
+
+def test_without_disk_tier_nothing_is_looked_up():
+    assert not SummaryCache(1000).missing(["a"])
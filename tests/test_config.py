@@ -0,0 +1,49 @@
+"""Tests of the configuration models."""
+
+import re
+from pathlib import Path
+
+import pytest
+import yaml
+from pydantic import ValidationError
+
+from discord_rss_bot.models import ConfigFile, FeedConfig
+
+README = Path(__file__).parent.parent / "README.md"
+WEBHOOK_URL = "https://discord.com/api/webhooks/123456789012345678/" + "t" * 68
+
+
+def test_readme_example_is_valid():
+    example = re.search(r"```yaml\n(.*?)```", README.read_text(), re.DOTALL)
+    assert example is not None
+    # Channel IDs are partly redacted in the README
+    text = example.group(1).replace("<redacted>", "000000000")
+
+    config = ConfigFile(**yaml.safe_load(text))
+
+    assert config.feeds
+    for feed in config.feeds:
+        destinations = [target.destination for target in feed.targets]
+        assert len(destinations) == len(set(destinations))
+
+
+@pytest.mark.parametrize(
+    "feed",
+    [
+        {"channel_id": 1, "channels": [{"channel_id": 1}]},
+        {"channels": [{"channel_id": 1}, {"channel_id": 1}]},
+        {
+            "webhook_url": WEBHOOK_URL,
+            "channels": [{"webhook_url": WEBHOOK_URL}],
+        },
+    ],
+)
+def test_duplicate_destinations_are_rejected(feed):
+    with pytest.raises(ValidationError, match="more than once"):
+        FeedConfig(feed_url="http://example.com/feed.xml", **feed)
+
+
+@pytest.mark.parametrize("timeout", [None, 0, -1])
+def test_update_timeout_must_be_positive(timeout):
+    with pytest.raises(ValidationError):
+        ConfigFile(db_path="rss.sqlite3", feeds=[], update_timeout=timeout)
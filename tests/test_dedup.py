@@ -0,0 +1,55 @@
+"""Tests of the keys used for cross-feed duplicate suppression."""
+
+import pytest
+
+from discord_rss_bot.dedup import entry_key, normalize_link
+
+
+@pytest.mark.parametrize(
+    "link",
+    [
+        "https://example.com/post",
+        "http://example.com/post",
+        "https://www.example.com/post",
+        "https://EXAMPLE.com/post/",
+        "https://example.com/post#comments",
+        "https://example.com/post?utm_source=rss&utm_medium=feed",
+        "https://example.com/post?fbclid=abc",
+        "  https://example.com/post  ",
+    ],
+)
+def test_normalize_link_ignores_presentation(link):
+    assert normalize_link(link) == "example.com/post"
+
+
+def test_normalize_link_keeps_identifying_parts():
+    assert normalize_link("https://example.com/post?id=2&page=1") == (
+        "example.com/post?id=2&page=1"
+    )
+    assert normalize_link("https://example.com/post?page=1&id=2") == (
+        normalize_link("https://example.com/post?id=2&page=1")
+    )
+    assert normalize_link("https://example.com:8080/post") == (
+        "example.com:8080/post"
+    )
+    assert normalize_link("https://example.com/a") != normalize_link(
+        "https://example.com/b"
+    )
+
+
+def test_entry_key_matches_same_story_across_feeds(make_entry):
+    first = make_entry("a", link="https://example.com/post?utm_source=x")
+    second = make_entry(
+        "b", link="http://www.example.com/post/", feed_url="http://other/"
+    )
+    assert entry_key(first) == entry_key(second)
+    assert len(entry_key(first)) == 8
+
+
+def test_entry_key_without_link_uses_feed_and_id(make_entry):
+    entry = make_entry("a", link=None)
+    assert entry_key(entry) == entry_key(make_entry("a", link=None))
+    assert entry_key(entry) != entry_key(make_entry("b", link=None))
+    assert entry_key(entry) != entry_key(
+        make_entry("a", link=None, feed_url="http://other/")
+    )
@@ -0,0 +1,78 @@
+"""Tests of include and exclude rule matching."""
+
+import pytest
+
+from discord_rss_bot.filters import NOT_INCLUDED, EntryFilter, RuleMatcher
+from discord_rss_bot.models import FilterRule
+
+
+def rules(*values):
+    """Builds filter rules from config values."""
+    return [FilterRule.model_validate(value) for value in values]
+
+
+@pytest.mark.parametrize(
+    "title, expected",
+    [
+        ("Python 3.13 released", "python"),
+        ("PYTHON news", "python"),
+        ("Pythonic code", None),
+        ("He said so", None),
+        ("New AI model", "ai"),
+        ("", None),
+    ],
+)
+def test_keywords_match_whole_words(title, expected, make_entry):
+    matcher = RuleMatcher(rules("python", "ai"))
+    rule = matcher.match(make_entry(title=title))
+    assert (rule.keyword if rule else None) == expected
+
+
+def test_phrases_match_whole_words(make_entry):
+    matcher = RuleMatcher(rules("machine learning", "c++"))
+    assert matcher.match(make_entry(title="Machine  Learning")) is None
+    assert matcher.match(make_entry(title="Intro to machine learning"))
+    assert matcher.match(make_entry(title="machine learnings")) is None
+    assert matcher.match(make_entry(title="Modern C++ tips")).keyword == "c++"
+
+
+def test_keywords_sharing_a_prefix(make_entry):
+    matcher = RuleMatcher(rules("rust lang", "rust language"))
+    rule = matcher.match(make_entry(title="The Rust language book"))
+    assert rule.keyword == "rust language"
+    rule = matcher.match(make_entry(title="rust lang news"))
+    assert rule.keyword == "rust lang"
+
+
+def test_regexes_are_compiled_separately(make_entry):
+    # Backreferences and groups must not shift when rules are combined
+    matcher = RuleMatcher(
+        rules(
+            {"regex": r"(\w)\1", "field": "title"},
+            {"regex": r"^v(\d+)$", "field": "title"},
+        )
+    )
+    assert matcher.match(make_entry(title="v12")).regex == r"^v(\d+)$"
+    assert matcher.match(make_entry(title="book")).regex == r"(\w)\1"
+    assert matcher.match(make_entry(title="abc")) is None
+
+
+def test_rules_only_match_their_field(make_entry):
+    matcher = RuleMatcher(
+        rules({"keyword": "alice", "field": "author"}, {"keyword": "news"})
+    )
+    entry = make_entry(title="alice", author="bob")
+    assert matcher.match(entry) is None
+    assert matcher.match(make_entry(title="x", author="Alice")).field == (
+        "author"
+    )
+    assert matcher.match(make_entry(title="x", summary="<p>news</p>"))
+
+
+def test_entry_filter_labels(make_entry):
+    entry_filter = EntryFilter(
+        rules("python"), rules({"keyword": "hiring", "name": "jobs"})
+    )
+    assert entry_filter.check(make_entry(title="Python jobs")) is None
+    assert entry_filter.check(make_entry(title="Python hiring")) == "jobs"
+    assert entry_filter.check(make_entry(title="Go news")) == NOT_INCLUDED
@@ -0,0 +1,44 @@
+"""Tests of packing embeds into Discord messages."""
+
+import discord
+
+from discord_rss_bot.message import (
+    MAX_EMBED_CHARS_PER_MESSAGE,
+    MAX_EMBEDS_PER_MESSAGE,
+    pack_embeds,
+)
+
+
+def embed(chars: int) -> discord.Embed:
+    """An embed counting `chars` characters."""
+    return discord.Embed(description="x" * chars)
+
+
+def test_pack_embeds_empty():
+    assert not pack_embeds([])
+
+
+def test_pack_embeds_by_count():
+    embeds = [embed(10) for _ in range(MAX_EMBEDS_PER_MESSAGE * 2 + 1)]
+    batches = pack_embeds(embeds)
+    assert [len(batch) for batch in batches] == [
+        MAX_EMBEDS_PER_MESSAGE,
+        MAX_EMBEDS_PER_MESSAGE,
+        1,
+    ]
+    assert [index for batch in batches for index in batch] == list(
+        range(len(embeds))
+    )
+
+
+def test_pack_embeds_by_size():
+    third = MAX_EMBED_CHARS_PER_MESSAGE // 3
+    batches = pack_embeds([embed(third)] * 3 + [embed(1)] + [embed(third)])
+    assert batches == [[0, 1, 2], [3, 4]]
+
+
+def test_pack_embeds_oversized_embed_gets_its_own_message():
+    batches = pack_embeds(
+        [embed(10), embed(MAX_EMBED_CHARS_PER_MESSAGE), embed(10)]
+    )
+    assert batches == [[0], [1], [2]]
@@ -0,0 +1,95 @@
+"""Tests of adaptive per-feed polling."""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+from reader import UpdateError
+from reader.types import UpdatedFeed, UpdateResult
+
+from discord_rss_bot.models import FeedConfig
+from discord_rss_bot.polling import UNCHANGED_BACKOFF, PollScheduler
+
+URL = "http://example.com/feed.xml"
+
+
+def scheduler(**config) -> PollScheduler:
+    """A scheduler of a single feed."""
+    return PollScheduler([FeedConfig(feed_url=URL, channel_id=1, **config)])
+
+
+def updated(new: int) -> UpdateResult:
+    """Result of an update that found `new` entries."""
+    return UpdateResult(URL, UpdatedFeed(URL, new=new, modified=0))
+
+
+def test_unchanged_feeds_back_off_up_to_the_maximum():
+    poller = scheduler(update_interval=10, max_update_interval=20)
+    assert poller.record([UpdateResult(URL, None)]) == {
+        URL: round(10 * UNCHANGED_BACKOFF)
+    }
+    for _ in range(5):
+        poller.record([updated(0)])
+    assert poller.schedules[URL].interval == 20
+    assert poller.record([updated(0)]) == {}
+
+
+def test_failures_back_off_exponentially():
+    poller = scheduler(update_interval=10, max_update_interval=100)
+    error = UpdateResult(URL, UpdateError("boom"))
+    assert poller.record([error]) == {URL: 20}
+    assert poller.record([error]) == {URL: 40}
+    assert poller.record([updated(0)]) == {URL: 60}
+    assert poller.schedules[URL].failures == 0
+
+
+def test_busy_feeds_follow_their_publish_rate(monkeypatch):
+    poller = scheduler(
+        update_interval=30, min_update_interval=5, max_update_interval=60
+    )
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now)
+    poller.record([updated(1)])
+    # Two new entries in 20 minutes: one every 10 minutes
+    monkeypatch.setattr(time, "time", lambda: now + 20 * 60)
+    assert poller.record([updated(2)]) == {URL: 10}
+    # Never below the minimum
+    monkeypatch.setattr(time, "time", lambda: now + 21 * 60)
+    assert poller.record([updated(10)]) == {URL: 5}
+
+
+def test_unknown_feeds_are_ignored():
+    poller = scheduler()
+    other = "http://other/feed.xml"
+    assert poller.record([UpdateResult(other, None)]) == {}
+
+
+def test_delay_until_earliest_due_feed():
+    poller = PollScheduler(
+        [
+            FeedConfig(feed_url=URL, channel_id=1),
+            FeedConfig(feed_url="http://other/", channel_id=1),
+        ]
+    )
+    assert poller.delay(42.0) == 42.0
+    now = datetime.now(timezone.utc)
+    poller.load(
+        {
+            URL: now + timedelta(seconds=100),
+            "http://other/": now + timedelta(seconds=30),
+            "http://removed/": now,
+        }
+    )
+    assert 25 < poller.delay(42.0) <= 30
+    assert len(poller.heap) == 2
+    poller.load({URL: None})
+    assert poller.next_due() == 0.0
+    assert poller.delay(42.0) == 0.0
+
+
+def test_reconfigure_keeps_adapted_state():
+    poller = scheduler(update_interval=10, max_update_interval=100)
+    poller.record([UpdateResult(URL, UpdateError("boom"))])
+    poller.reconfigure([FeedConfig(feed_url=URL, channel_id=1)], keep=[URL])
+    assert poller.schedules[URL].failures == 1
+    poller.reconfigure([FeedConfig(feed_url=URL, channel_id=1)])
+    assert poller.schedules[URL].failures == 0
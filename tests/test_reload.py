@@ -0,0 +1,90 @@
+"""Tests of configuration diffs and the reload of the configuration file."""
+
+import asyncio
+from typing import List
+
+from discord_rss_bot.models import ConfigFile, FeedConfig
+from discord_rss_bot.reload import (
+    ConfigWatcher,
+    FeedChanges,
+    diff_config,
+    restart_settings,
+)
+
+CONFIG = """
+db_path: {db_path}
+feeds:
+  - feed_url: http://example.com/a.xml
+    channel_id: 100
+"""
+
+
+def config(tmp_path, *feeds: FeedConfig, **settings) -> ConfigFile:
+    """A configuration of the feeds."""
+    return ConfigFile(
+        db_path=str(tmp_path / "db.sqlite"), feeds=list(feeds), **settings
+    )
+
+
+def feed(name: str, channel_id: int = 100, **settings) -> FeedConfig:
+    """Configuration of the feed with the given name."""
+    return FeedConfig(
+        feed_url=f"http://example.com/{name}.xml",
+        channel_id=channel_id,
+        **settings,
+    )
+
+
+def test_diff_config_compares_feeds_by_url(tmp_path):
+    old = config(tmp_path, feed("kept"), feed("changed"), feed("removed"))
+    new = config(tmp_path, feed("kept"), feed("changed", 101), feed("added"))
+    assert diff_config(old, new) == FeedChanges(
+        added={"http://example.com/added.xml"},
+        removed={"http://example.com/removed.xml"},
+        changed={"http://example.com/changed.xml"},
+    )
+
+
+def test_diff_config_sees_a_channel_added_to_a_feed(tmp_path):
+    old = config(tmp_path, feed("a"))
+    new = config(tmp_path, feed("a"), feed("a", 101))
+    assert diff_config(old, new).changed == {"http://example.com/a.xml"}
+
+
+def test_identical_configs_have_no_changes(tmp_path):
+    old = config(tmp_path, feed("a", update_interval=10))
+    new = config(tmp_path, feed("a", update_interval=10))
+    assert not diff_config(old, new)
+
+
+def test_restart_settings_lists_changed_settings(tmp_path):
+    old = config(tmp_path, feed("a"))
+    new = config(tmp_path, feed("b"), delivery_workers=8)
+    assert restart_settings(old, new) == ["delivery_workers"]
+
+
+def reload(path) -> List[ConfigFile]:
+    """Reloads the configuration file once, returning what was applied."""
+    applied: List[ConfigFile] = []
+
+    async def on_reload(new: ConfigFile) -> None:
+        applied.append(new)
+
+    asyncio.run(ConfigWatcher(str(path), on_reload).reload())
+    return applied
+
+
+def test_reload_applies_a_valid_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(CONFIG.format(db_path=tmp_path / "db.sqlite"))
+    [applied] = reload(path)
+    assert [f.feed_url for f in applied.feeds] == ["http://example.com/a.xml"]
+
+
+def test_reload_ignores_an_invalid_file(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(CONFIG.format(db_path=tmp_path) + "update_timeout: 0\n")
+    assert not reload(path)
+    path.write_text("feeds: [")
+    assert not reload(path)
+    assert not reload(tmp_path / "missing.yaml")
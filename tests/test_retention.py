@@ -0,0 +1,99 @@
+"""Tests of pruning and tombstones through reader's real update pipeline."""
+
+import asyncio
+import itertools
+import os
+import time
+from contextlib import closing
+
+import pytest
+from reader import make_reader
+
+from discord_rss_bot import storage
+from discord_rss_bot.models import ConfigFile, FeedConfig
+from discord_rss_bot.retention import Maintenance
+from discord_rss_bot.rss import ReaderTaskExecutor
+
+FEED = "feed.xml"
+# Modification times of the feed file, one per publication
+MTIMES = itertools.count(1_000_000)
+
+
+def publish(path, *entry_ids):
+    """Writes the feed file listing the entries, newest first."""
+    items = "".join(
+        f"<item><title>{entry_id}</title><guid>{entry_id}</guid>"
+        f"<link>https://example.com/{entry_id}</link></item>"
+        for entry_id in entry_ids
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            '<?xml version="1.0"?><rss version="2.0"><channel>'
+            f"<title>Feed</title><link>https://example.com</link>{items}"
+            "</channel></rss>"
+        )
+    # reader skips a file whose modification time did not change
+    mtime = next(MTIMES)
+    os.utime(path, (mtime, mtime))
+
+
+@pytest.fixture
+def pipeline(tmp_path):
+    """Factory of a reader of a local feed, maintained with the config."""
+    db_path = str(tmp_path / "db.sqlite")
+    rss_reader = make_reader(db_path, feed_root=str(tmp_path))
+    with closing(storage.connect(db_path)) as db:
+        storage.create_pruned(db)
+    rss_reader.add_feed(FEED)
+    executor = ReaderTaskExecutor(rss_reader, db_path, query_workers=1)
+
+    def start(**settings):
+        config = ConfigFile(
+            db_path=db_path,
+            feeds=[FeedConfig(feed_url=FEED, channel_id=1)],
+            **settings,
+        )
+        maintenance = Maintenance(executor, db_path, 3600)
+        maintenance.configure(config)
+        return rss_reader, maintenance, config, tmp_path / FEED
+
+    yield start
+    executor.shutdown()
+    rss_reader.close()
+
+
+def entries(rss_reader, **kwargs):
+    """Ids of the feed's entries."""
+    return {entry.id for entry in rss_reader.get_entries(**kwargs)}
+
+
+def test_pruned_entry_published_again_is_not_posted(pipeline):
+    rss_reader, maintenance, config, path = pipeline(retention_max_entries=1)
+    publish(path, "c", "b", "a")
+    rss_reader.update_feeds()
+    rss_reader.mark_entry_as_read((FEED, "a"))
+    rss_reader.mark_entry_as_read((FEED, "b"))
+    rss_reader.mark_entry_as_read((FEED, "c"))
+
+    # Entries the feed still lists are kept
+    asyncio.run(maintenance.run(config, time.monotonic() + 60))
+    assert entries(rss_reader) == {"a", "b", "c"}
+
+    publish(path, "c")
+    rss_reader.update_feeds()
+    asyncio.run(maintenance.run(config, time.monotonic() + 60))
+    assert entries(rss_reader) == {"c"}
+
+    # Published again: added again by reader, but already read
+    publish(path, "c", "a")
+    rss_reader.update_feeds()
+    assert entries(rss_reader) == {"a", "c"}
+    assert not entries(rss_reader, read=False)
+
+
+def test_without_retention_listings_are_not_recorded(pipeline):
+    rss_reader, _, config, path = pipeline()
+    publish(path, "a")
+    rss_reader.update_feeds()
+    with closing(storage.connect(config.db_path)) as db:
+        assert not db.execute("SELECT * FROM feed_listings;").fetchall()
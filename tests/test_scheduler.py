@@ -0,0 +1,184 @@
+"""Tests of the send rate limiter."""
+
+import asyncio
+from types import SimpleNamespace
+from typing import List, Optional
+
+import aiohttp
+import discord
+import pytest
+
+from discord_rss_bot.scheduler import (
+    MAX_ATTEMPTS,
+    SendResult,
+    SendScheduler,
+    TokenBucket,
+)
+
+
+class FakeChannel:
+    """Channel whose sends raise the given errors in turn, then succeed."""
+
+    def __init__(self, *errors: BaseException) -> None:
+        self.id = 1  # pylint: disable=invalid-name
+        self.errors = list(errors)
+        self.sent: list = []
+
+    async def send(self, **kwargs) -> None:
+        if self.errors:
+            raise self.errors.pop(0)
+        self.sent.append(kwargs)
+
+
+def http_error(status: int) -> discord.HTTPException:
+    """An error answer of Discord with the given status."""
+    response = SimpleNamespace(status=status, reason="Error")
+    return discord.HTTPException(response, "error")  # type: ignore[arg-type]
+
+
+def send_once(
+    channel: FakeChannel, scheduler: Optional[SendScheduler] = None
+) -> SendResult:
+    """Sends one message through a new scheduler and returns its outcome."""
+
+    async def send() -> SendResult:
+        sender = scheduler or SendScheduler()
+        try:
+            return await asyncio.wait_for(
+                sender.submit(channel, content="hello"), timeout=1.0
+            )
+        finally:
+            await sender.close()
+
+    return asyncio.run(send())
+
+
+class FakeClock:
+    """Clock that only moves when a waiter sleeps, recording the waits."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.waits: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    async def sleep(self, delay: float) -> None:
+        self.waits.append(delay)
+        self.now += delay
+        await asyncio.sleep(0)
+
+
+def bucket(capacity: int, period: float, clock: FakeClock) -> TokenBucket:
+    """A token bucket driven by the fake clock."""
+    return TokenBucket(capacity, period, clock=clock, sleep=clock.sleep)
+
+
+def test_token_bucket_allows_a_burst_of_capacity():
+    async def burst() -> None:
+        tokens = bucket(5, 10.0, clock)
+        for _ in range(5):
+            await tokens.acquire()
+
+    clock = FakeClock()
+    asyncio.run(burst())
+    assert not clock.waits
+
+
+def test_token_bucket_refills_at_its_rate():
+    async def drain() -> None:
+        tokens = bucket(2, 0.2, clock)
+        for _ in range(4):
+            await tokens.acquire()
+
+    clock = FakeClock()
+    asyncio.run(drain())
+    # Two more tokens at one per 0.1 seconds
+    assert clock.now == pytest.approx(0.2)
+
+
+def test_token_bucket_refills_while_idle():
+    async def pause() -> None:
+        tokens = bucket(2, 1.0, clock)
+        await tokens.acquire()
+        await tokens.acquire()
+        clock.now += 10.0
+        # Refilled up to its capacity only
+        for _ in range(3):
+            await tokens.acquire()
+
+    clock = FakeClock()
+    asyncio.run(pause())
+    assert sum(clock.waits) == pytest.approx(0.5)
+
+
+def test_token_bucket_serializes_concurrent_waiters():
+    async def concurrent() -> None:
+        tokens = bucket(1, 0.05, clock)
+        await asyncio.gather(*(tokens.acquire() for _ in range(4)))
+
+    clock = FakeClock()
+    asyncio.run(concurrent())
+    assert clock.now == pytest.approx(0.15)
+
+
+def test_send_reports_sent():
+    channel = FakeChannel()
+    assert send_once(channel) == "sent"
+    assert channel.sent == [{"content": "hello"}]
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        aiohttp.ClientConnectionError("connection reset"),
+        ConnectionResetError(),
+        asyncio.TimeoutError(),
+    ],
+)
+def test_network_errors_fail_for_a_retry(error):
+    assert send_once(FakeChannel(error)) == "failed"
+
+
+def test_client_errors_are_rejected_for_good():
+    scheduler = SendScheduler()
+    assert send_once(FakeChannel(http_error(403)), scheduler) == "rejected"
+    assert scheduler.stats()["failed"] == 1
+
+
+def test_server_errors_fail_for_a_retry():
+    assert send_once(FakeChannel(http_error(503))) == "failed"
+
+
+def test_rate_limited_sends_are_retried():
+    scheduler = SendScheduler()
+    channel = FakeChannel(discord.RateLimited(0.0), discord.RateLimited(0.0))
+    assert send_once(channel, scheduler) == "sent"
+    assert len(channel.sent) == 1
+    assert scheduler.stats()["rate_limited"] == 2
+
+
+def test_sends_give_up_after_repeated_rate_limits():
+    channel = FakeChannel(
+        *(discord.RateLimited(0.0) for _ in range(MAX_ATTEMPTS))
+    )
+    assert send_once(channel) == "failed"
+    assert not channel.sent
+
+
+def test_messages_of_a_channel_are_sent_in_order():
+    async def send_all() -> List[SendResult]:
+        scheduler = SendScheduler()
+        futures = [scheduler.submit(channel, content=i) for i in range(3)]
+        try:
+            return list(await asyncio.gather(*futures))
+        finally:
+            await scheduler.close()
+
+    channel = FakeChannel(http_error(500))
+    assert asyncio.run(send_all()) == ["failed", "sent", "sent"]
+    assert channel.sent == [{"content": 1}, {"content": 2}]
+
+
+def test_unexpected_errors_still_resolve_the_send():
+    assert send_once(FakeChannel(ValueError("bug"))) == "failed"
@@ -0,0 +1,76 @@
+"""Tests of the assignment of feeds to shards."""
+
+import logging
+from collections import Counter
+
+from discord_rss_bot.rss import FeedManager
+from discord_rss_bot.sharding import ADOPTED_TAG, shard_db_path, shard_of
+
+URLS = [f"https://example.com/{i}.xml" for i in range(2000)]
+
+
+def test_shard_of_is_stable_and_in_range():
+    for url in URLS[:100]:
+        shard = shard_of(url, 4)
+        assert 0 <= shard < 4
+        assert shard_of(url, 4) == shard
+    assert {shard_of(url, 1) for url in URLS} == {0}
+
+
+def test_shard_of_spreads_feeds_evenly():
+    counts = Counter(shard_of(url, 4) for url in URLS)
+    assert set(counts) == {0, 1, 2, 3}
+    assert all(400 < count < 600 for count in counts.values())
+
+
+def test_adding_a_shard_only_moves_feeds_to_it():
+    moved = [url for url in URLS if shard_of(url, 4) != shard_of(url, 5)]
+    assert all(shard_of(url, 5) == 4 for url in moved)
+    assert 300 < len(moved) < 500
+
+
+def test_removing_a_shard_only_moves_its_feeds():
+    moved = [url for url in URLS if shard_of(url, 4) != shard_of(url, 3)]
+    assert all(shard_of(url, 4) == 3 for url in moved)
+
+
+def test_shard_db_path():
+    assert shard_db_path("/data/rss.sqlite3", 0) == "/data/rss.sqlite3"
+    assert shard_db_path("/data/rss.sqlite3", 2) == "/data/rss.shard-2.sqlite3"
+
+
+def adopted(rss_reader, shard_index, shard_count):
+    """Records a shard layout and returns the feeds it adopted."""
+    FeedManager(rss_reader, None)._adopt_feeds(shard_index, shard_count)
+    return {feed.url for feed in rss_reader.get_feeds(tags=[ADOPTED_TAG])}
+
+
+def test_single_instance_database_keeps_its_feeds_as_shard_0(
+    rss_reader, db, caplog
+):
+    kept = next(url for url in URLS if shard_of(url, 2) == 0)
+    moved = next(url for url in URLS if shard_of(url, 2) == 1)
+    for url in (kept, moved):
+        rss_reader.add_feed(url)
+    with db:
+        db.execute("UPDATE feeds SET last_updated = '2024-01-01 00:00:00';")
+
+    with caplog.at_level(logging.WARNING):
+        assert not adopted(rss_reader, 0, 2)
+    assert f"Feed {moved} moves to shard 1" in caplog.text
+    assert kept not in caplog.text
+
+
+def test_new_sharded_database_adopts_its_feeds(rss_reader):
+    url = next(url for url in URLS if shard_of(url, 2) == 1)
+    rss_reader.add_feed(url)
+    assert url in adopted(rss_reader, 1, 2)
+
+
+def test_removing_a_shard_adopts_its_feeds(rss_reader):
+    adopted(rss_reader, 1, 3)
+    url = next(
+        url for url in URLS if shard_of(url, 3) == 2 and shard_of(url, 2) == 1
+    )
+    rss_reader.add_feed(url)
+    assert url in adopted(rss_reader, 1, 2)
@@ -0,0 +1,193 @@
+"""
+Tests of the direct SQLite access, run against a real reader database so
+that they catch drift from reader's schema.
+"""
+
+import json
+import time
+
+from discord_rss_bot import storage
+from tests.conftest import FEED_URL
+
+
+def add_entries(rss_reader, count, prefix="entry"):
+    """Adds `count` unread entries to the feed, the last one newest."""
+    for i in range(count):
+        rss_reader.add_entry(
+            {
+                "feed_url": FEED_URL,
+                "id": f"{prefix}-{i}",
+                "title": f"Entry {i}",
+                "link": f"https://example.com/{prefix}/{i}",
+                "summary": f"<p>{'x' * 50}</p>",
+            }
+        )
+
+
+def entry_ids(db, read=None):
+    """Ids of the stored entries of the feed."""
+    rows = db.execute(
+        "SELECT id FROM entries WHERE feed = ? AND (? IS NULL OR read = ?);",
+        (FEED_URL, read, read),
+    )
+    return {entry_id for (entry_id,) in rows}
+
+
+def test_unread_entries_match_reader(rss_reader, db):
+    add_entries(rss_reader, 3)
+    loaded = list(storage.unread_entries(db, 10, FEED_URL))
+    expected = list(rss_reader.get_entries(feed=FEED_URL, read=False))
+    assert [entry.id for entry in loaded] == [entry.id for entry in expected]
+    first, entry = loaded[0], expected[0]
+    assert (first.title, first.link, first.added) == (
+        entry.title,
+        entry.link,
+        entry.added,
+    )
+    assert first.summary == entry.summary[:10]
+    assert storage.count_unread(db, FEED_URL) == 3
+
+
+def test_mark_entries_read_reports_missing(rss_reader, db):
+    add_entries(rss_reader, 2)
+    missing = storage.mark_entries_read(
+        db, [(FEED_URL, "entry-0"), (FEED_URL, "unknown")]
+    )
+    assert missing == [(FEED_URL, "unknown")]
+    assert rss_reader.get_entry((FEED_URL, "entry-0")).read
+    assert not rss_reader.get_entry((FEED_URL, "entry-1")).read
+
+
+def test_mark_feed_read(rss_reader, db):
+    add_entries(rss_reader, 3)
+    assert storage.mark_feed_read(db, FEED_URL, "2000-01-01 00:00:00") == 0
+    assert storage.mark_feed_read(db, FEED_URL) == 3
+    assert storage.mark_feed_read(db, FEED_URL) == 0
+    assert not list(rss_reader.get_entries(read=False))
+
+
+def test_prune_entries_needs_a_listing(rss_reader, db):
+    add_entries(rss_reader, 5)
+    storage.mark_feed_read(db, FEED_URL)
+    assert storage.prune_entries(db, FEED_URL, None, 1, 100) == 0
+
+
+def test_prune_entries_keeps_listed_unread_and_newest(rss_reader, db):
+    add_entries(rss_reader, 6)
+    storage.mark_feed_read(db, FEED_URL)
+    add_entries(rss_reader, 1, prefix="unread")
+    storage.record_listing(db, FEED_URL, ["entry-0"])
+
+    assert storage.prune_entries(db, FEED_URL, None, 3, 100) == 3
+    assert entry_ids(db) == {"unread-0", "entry-5", "entry-4", "entry-0"}
+    tombstones = db.execute("SELECT id FROM pruned_entries;").fetchall()
+    assert sorted(tombstones) == [("entry-1",), ("entry-2",), ("entry-3",)]
+
+
+def test_prune_entries_by_age_in_batches(rss_reader, db):
+    add_entries(rss_reader, 5)
+    storage.mark_feed_read(db, FEED_URL)
+    storage.record_listing(db, FEED_URL, [])
+    assert storage.prune_entries(db, FEED_URL, "2000-01-01", None, 100) == 0
+    assert storage.prune_entries(db, FEED_URL, "9999-01-01", None, 2) == 2
+    assert storage.prune_entries(db, FEED_URL, "9999-01-01", None, 100) == 3
+    assert not entry_ids(db)
+
+
+def test_pruned_entry_added_again_is_read(rss_reader, db):
+    add_entries(rss_reader, 2)
+    storage.mark_feed_read(db, FEED_URL)
+    storage.record_listing(db, FEED_URL, [])
+    assert storage.prune_entries(db, FEED_URL, None, 0, 100) == 2
+
+    add_entries(rss_reader, 1)
+    assert entry_ids(db, read=1) == {"entry-0"}
+    assert db.execute("SELECT id FROM pruned_entries;").fetchall() == [
+        ("entry-1",)
+    ]
+
+
+def test_prune_tombstones_of_removed_feeds(rss_reader, db):
+    add_entries(rss_reader, 1)
+    storage.mark_feed_read(db, FEED_URL)
+    storage.record_listing(db, FEED_URL, [])
+    storage.prune_entries(db, FEED_URL, None, 0, 100)
+    rss_reader.delete_feed(FEED_URL)
+    assert storage.prune_tombstones(db) == 1
+    assert not db.execute("SELECT * FROM feed_listings;").fetchall()
+
+
+def test_outbox_lifecycle(rss_reader, db):
+    add_entries(rss_reader, 2)
+    now = time.time()
+    rows = [
+        (FEED_URL, "100", json.dumps(["entry-0"]), "[]"),
+        (FEED_URL, "101", json.dumps(["entry-1"]), "[]"),
+    ]
+    ids = storage.enqueue_messages(
+        db,
+        rows,
+        [[b"key-0"], [b"key-1"]],
+        [(FEED_URL, "entry-0"), (FEED_URL, "entry-1")],
+        now,
+    )
+    assert None not in ids
+    assert not list(rss_reader.get_entries(read=False))
+    assert [row[0] for row in storage.due_messages(db, now, 10)] == ids
+
+    first, second = ids
+    storage.ack_message(db, first)
+    storage.retry_message(db, second, 1, now + 60)
+    assert not storage.due_messages(db, now, 10)
+    assert storage.next_outbox_attempt(db) == now + 60
+
+    storage.dead_letter_message(db, second, 2, "rejected", now)
+    assert storage.next_outbox_attempt(db) is None
+    assert db.execute(
+        "SELECT channel_id, attempts, reason FROM dead_letters;"
+    ).fetchall() == [("101", 2, "rejected")]
+
+
+def test_enqueue_suppresses_seen_messages(rss_reader, db):
+    add_entries(rss_reader, 1)
+    now = time.time()
+    row = (FEED_URL, "100", json.dumps(["entry-0"]), "[]")
+    assert storage.enqueue_messages(db, [row], [[b"key"]], [], now) != [None]
+    assert storage.enqueue_messages(db, [row], [[b"key"]], [], now) == [None]
+    # Seen before the window: posted again
+    later = now + 10
+    assert storage.enqueue_messages(
+        db, [row], [[b"key"]], [], later, seen_after=now + 1
+    ) != [None]
+
+
+def test_dead_letters_release_their_seen_keys(rss_reader, db):
+    add_entries(rss_reader, 1)
+    now = time.time()
+    row = (FEED_URL, "100", json.dumps(["entry-0"]), "[]")
+    delivered, failed = (
+        storage.enqueue_messages(db, [row], [[key]], [], now)[0]
+        for key in (b"delivered", b"failed")
+    )
+    storage.ack_message(db, delivered)
+    storage.dead_letter_message(db, failed, 10, "too many attempts", now)
+
+    keys = [b"delivered", b"failed"]
+    assert storage.seen_keys(db, "100", keys, 0.0) == {b"delivered"}
+    assert storage.enqueue_messages(db, [row], [[b"failed"]], [], now) != [None]
+
+
+def test_seen_set(db):
+    now = time.time()
+    storage.enqueue_messages(
+        db, [("feed", "100", "[]", "[]")], [[b"old"]], [], now - 100
+    )
+    storage.enqueue_messages(
+        db, [("feed", "100", "[]", "[]")], [[b"new"]], [], now
+    )
+    keys = [b"old", b"new", b"other"]
+    assert storage.seen_keys(db, "100", keys, 0.0) == {b"old", b"new"}
+    assert storage.seen_keys(db, "100", keys, now - 50) == {b"new"}
+    assert storage.seen_keys(db, "101", keys, 0.0) == set()
+    assert storage.prune_seen(db, now - 50) == 1
+    assert storage.seen_keys(db, "100", keys, 0.0) == {b"new"}